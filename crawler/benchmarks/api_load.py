@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Load test for the local catalog read API (`run_crawler.py serve`)
+Drives concurrent keep-alive clients against a running server with a mix of
+product-by-id, filtered list and recently-changed requests, and reports
+throughput and latency percentiles per endpoint. Exits with status 1 when the
+overall p99 exceeds --max-p99, or when more than --max-errors of the requests
+failed (connection errors or statuses other than 2xx and 304).
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import http.client
+from collections import Counter
+from multiprocessing import Pool
+from urllib.parse import quote, urlparse
+
+DEFAULT_MIX = "id=70,list=20,changes=10"
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def discover(url, sample):
+    """Product ids, brands and categories to build requests from, read from the API itself"""
+    parsed = urlparse(url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+    conn.request("GET", f"/products?limit={sample}")
+    response = conn.getresponse()
+    if response.status != 200:
+        raise SystemExit(f"❌ {url}/products answered {response.status}")
+    products = json.loads(response.read())["products"]
+    conn.close()
+    if not products:
+        raise SystemExit("❌ The catalog is empty")
+    return {
+        "ids": [product["product_id"] for product in products],
+        "brands": sorted({product["brand"] for product in products if product.get("brand")}),
+        "categories": sorted({product["category"] for product in products if product.get("category")}),
+    }
+
+
+def make_path(kind, rng, catalog, list_limit):
+    if kind == "id":
+        return f"/products/{quote(rng.choice(catalog['ids']))}"
+    if kind == "list":
+        params = [f"limit={list_limit}"]
+        if catalog["brands"] and rng.random() < 0.8:
+            params.append(f"brand={quote(rng.choice(catalog['brands']))}")
+        if catalog["categories"] and rng.random() < 0.5:
+            params.append(f"category={quote(rng.choice(catalog['categories']))}")
+        if rng.random() < 0.3:
+            params.append(f"offset={rng.randrange(0, 5) * list_limit}")
+        return "/products?" + "&".join(params)
+    return f"/changes?minutes={rng.choice((5, 60, 1440))}&limit={list_limit}"
+
+
+def client(url, catalog, kinds, weights, deadline, list_limit, revalidate, seed, results):
+    """One keep-alive connection sending requests until the deadline"""
+    parsed = urlparse(url)
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+    etags = {}
+    while time.time() < deadline:
+        kind = rng.choices(kinds, weights)[0]
+        path = make_path(kind, rng, catalog, list_limit)
+        headers = {}
+        if path in etags and rng.random() < revalidate:
+            headers["If-None-Match"] = etags[path]
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            results.append((kind, "error", (time.perf_counter() - start) * 1000))
+            conn.close()
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+            continue
+        elapsed = (time.perf_counter() - start) * 1000
+        if response.getheader("ETag"):
+            etags[path] = response.getheader("ETag")
+        results.append((kind, response.status, elapsed))
+    conn.close()
+
+
+def run_process(url, catalog, mix, threads, duration, list_limit, revalidate, seed):
+    kinds, weights = zip(*mix.items())
+    deadline = time.time() + duration
+    results = []
+    workers = [
+        threading.Thread(
+            target=client,
+            args=(url, catalog, kinds, weights, deadline, list_limit, revalidate, seed * 1000 + i, results),
+        )
+        for i in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results
+
+
+def failed(status):
+    return status == "error" or not (200 <= status < 300 or status == 304)
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        if kind.strip() not in ("id", "list", "changes"):
+            raise SystemExit(f"❌ Unknown request kind in --mix: {kind}")
+        mix[kind.strip()] = float(weight)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the local catalog read API")
+    parser.add_argument("--url", default="http://127.0.0.1:8420", help="Server to test")
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="Concurrent connections")
+    parser.add_argument(
+        "--processes", type=int, default=2, help="Client processes the connections are spread over"
+    )
+    parser.add_argument("-d", "--duration", type=float, default=20, help="Seconds to run")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Request kinds and weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--list-limit", type=int, default=50, help="Products per list request")
+    parser.add_argument(
+        "--revalidate", type=float, default=0.0, help="Share of repeated requests sent with If-None-Match"
+    )
+    parser.add_argument("--sample", type=int, default=2000, help="Products sampled for request ids")
+    parser.add_argument("--max-p99", type=float, help="Fail when the overall p99 (ms) exceeds this")
+    parser.add_argument(
+        "--max-errors",
+        type=float,
+        default=0.01,
+        help="Fail when more than this share of requests fail (default: 0.01)",
+    )
+    parser.add_argument("--json", help="Also write the summary to this file")
+    args = parser.parse_args()
+
+    catalog = discover(args.url, args.sample)
+    mix = parse_mix(args.mix)
+    processes = max(1, min(args.processes, args.concurrency))
+    per_process = [args.concurrency // processes + (i < args.concurrency % processes) for i in range(processes)]
+    print(
+        f"🔥 {args.concurrency} connections x {args.duration:g}s against {args.url} "
+        f"({len(catalog['ids'])} ids, {len(catalog['brands'])} brands sampled)"
+    )
+
+    with Pool(processes) as pool:
+        parts = pool.starmap(
+            run_process,
+            [
+                (args.url, catalog, mix, threads, args.duration, args.list_limit, args.revalidate, seed)
+                for seed, threads in enumerate(per_process)
+            ],
+        )
+    results = [result for part in parts for result in part]
+
+    errors = sum(1 for result in results if failed(result[1]))
+    summary = {
+        "requests": len(results),
+        "rps": round(len(results) / args.duration, 1),
+        "errors": errors,
+        "endpoints": {},
+    }
+    print(f"\n{'endpoint':<10} {'requests':>9} {'rps':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}  statuses")
+    print("=" * 90)
+    for kind in list(mix) + ["all"]:
+        rows = [r for r in results if kind == "all" or r[0] == kind]
+        latencies = sorted(r[2] for r in rows)
+        statuses = Counter(str(r[1]) for r in rows)
+        entry = {
+            "requests": len(rows),
+            "rps": round(len(rows) / args.duration, 1),
+            "p50_ms": round(percentile(latencies, 0.5), 3),
+            "p90_ms": round(percentile(latencies, 0.9), 3),
+            "p99_ms": round(percentile(latencies, 0.99), 3),
+            "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+            "statuses": dict(statuses),
+        }
+        summary["endpoints"][kind] = entry
+        print(
+            f"{kind:<10} {entry['requests']:>9} {entry['rps']:>8} {entry['p50_ms']:>8.2f} "
+            f"{entry['p90_ms']:>8.2f} {entry['p99_ms']:>8.2f} {entry['max_ms']:>8.2f}  "
+            + " ".join(f"{status}:{count}" for status, count in sorted(statuses.items()))
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+    status = 0
+    error_share = errors / len(results) if results else 1.0
+    if error_share > args.max_errors:
+        print(f"\n❌ {errors} of {len(results)} requests failed ({error_share:.1%}, limit {args.max_errors:.1%})")
+        status = 1
+    p99 = summary["endpoints"]["all"]["p99_ms"]
+    if args.max_p99 is not None and p99 > args.max_p99:
+        print(f"\n❌ p99 {p99:.2f} ms exceeds {args.max_p99:g} ms")
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
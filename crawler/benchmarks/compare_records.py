@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Items vs typed records
+Compares retained memory per product held as a dict-backed scrapy.Item against
+the same product as a normalized ProductRecord, and end-to-end pipeline
+throughput with and without the NormalizeRecordsPipeline stage.
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import logging
+import argparse
+import tempfile
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CRAWLER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, CRAWLER_DIR)
+
+from myntra_crawler.pipelines import (
+    DuplicatesPipeline,
+    JsonWriterPipeline,
+    NormalizeRecordsPipeline,
+)
+from myntra_crawler.spiders.myntra_api_products import MyntraAPIProductsSpider
+from mock_gateway import Catalog
+
+CATEGORY = "men-clothing"
+
+
+class _BenchSpider:
+    name = "records_benchmark"
+    logger = logging.getLogger("records_benchmark")
+
+
+def make_items(count):
+    """ProductItems shaped exactly like the API spider emits them"""
+    spider = MyntraAPIProductsSpider(category=CATEGORY)
+    catalog = Catalog([CATEGORY], size=count)
+    items = []
+    for product in catalog.page(CATEGORY, 0, count):
+        item = spider.create_product_item_from_api(product, CATEGORY)
+        item["raw_data"] = None  # Same for both layouts, keep it out of the comparison
+        items.append(item)
+    return items
+
+
+def retained_bytes(build):
+    """Bytes still allocated after build() returns, with its result alive"""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    kept = build()
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return after - before, kept
+
+
+def throughput(pipelines, items, rounds):
+    best = float("inf")
+    spider = _BenchSpider()
+    for _ in range(rounds):
+        stages = [cls() for cls in pipelines]
+        for stage in stages:
+            if hasattr(stage, "open_spider"):
+                stage.open_spider(spider)
+        start = time.perf_counter()
+        for item in items:
+            for stage in stages:
+                item = stage.process_item(item, spider)
+        elapsed = time.perf_counter() - start
+        for stage in stages:
+            if hasattr(stage, "close_spider"):
+                stage.close_spider(spider)
+        best = min(best, elapsed)
+    return len(items) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare scrapy Items with typed records")
+    parser.add_argument("--items", type=int, default=100000, help="Products to hold in memory")
+    parser.add_argument("--rounds", type=int, default=3, help="Timed pipeline rounds")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    normalize = NormalizeRecordsPipeline()
+
+    # Items are rebuilt inside each measurement so their own allocations count
+    item_bytes, items = retained_bytes(lambda: make_items(args.items))
+    record_bytes, records = retained_bytes(
+        lambda: [normalize.process_item(item, None) for item in make_items(args.items)]
+    )
+
+    print(f"🧪 {args.items:,} products")
+    print(f"{'layout':<28} {'bytes/item':>11}")
+    print("-" * 40)
+    print(f"{'scrapy.Item (strings)':<28} {item_bytes / args.items:>11,.0f}")
+    print(f"{'ProductRecord (typed)':<28} {record_bytes / args.items:>11,.0f}")
+    print(f"💾 Records use {record_bytes / item_bytes:.0%} of the Item memory")
+
+    sample = json.dumps(
+        {k: v for k, v in dict(items[0]).items() if k != "raw_data"}, default=str
+    )
+    print(f"\n📄 Item:   {sample[:150]}...")
+    print(f"📄 Record: {records[0]!r}"[:160] + "...")
+
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix="myntra_records_"))
+    try:
+        raw = items[: min(len(items), 20000)]
+        plain = throughput([DuplicatesPipeline, JsonWriterPipeline], raw, args.rounds)
+        typed = throughput(
+            [NormalizeRecordsPipeline, DuplicatesPipeline, JsonWriterPipeline],
+            raw,
+            args.rounds,
+        )
+    finally:
+        os.chdir(cwd)
+
+    print(f"\n{'pipelines':<44} {'items/s':>10}")
+    print("-" * 56)
+    print(f"{'Duplicates → JsonWriter (Items)':<44} {plain:>10,.0f}")
+    print(f"{'NormalizeRecords → Duplicates → JsonWriter':<44} {typed:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
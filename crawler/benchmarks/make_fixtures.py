@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Fixture generator for the parser benchmarks
+Writes deterministic responses shaped like Myntra's search API, category, product
+detail and order-history pages into benchmarks/fixtures/. Real recordings (e.g. the
+api_debug_response_page_N.json files saved by the API spider) can be dropped into
+the same directory under the same names to benchmark against live data.
+"""
+
+import os
+import json
+import random
+import argparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+BRANDS = [
+    "Roadster",
+    "HRX by Hrithik Roshan",
+    "WROGN",
+    "Puma",
+    "Nike",
+    "Levis",
+    "U.S. Polo Assn.",
+    "H&M",
+    "HIGHLANDER",
+    "Mast & Harbour",
+]
+ARTICLES = ["Tshirts", "Shirts", "Jeans", "Trousers", "Jackets", "Sweatshirts"]
+COLOURS = ["Black", "White", "Navy Blue", "Olive", "Maroon", "Grey Melange"]
+PATTERNS = ["Printed", "Solid", "Striped", "Checked", "Colourblocked"]
+SIZES = ["XS", "S", "M", "L", "XL", "XXL"]
+
+
+def slugify(text):
+    return "-".join(
+        "".join(c for c in word.lower() if c.isalnum()) for word in text.split()
+    )
+
+
+def make_product(rng, product_id, gender="Men"):
+    """Build one product object in the shape returned by /gateway/v2/search"""
+    brand = rng.choice(BRANDS)
+    article = rng.choice(ARTICLES)
+    colour = rng.choice(COLOURS)
+    name = f"{gender} {colour} {rng.choice(PATTERNS)} {article[:-1]}"
+    mrp = rng.choice([799, 999, 1299, 1499, 1999, 2499, 2999, 3999])
+    discount = rng.choice([0, 10, 20, 30, 40, 50, 60, 70])
+    price = int(mrp * (100 - discount) / 100)
+    sizes = SIZES[rng.randint(0, 2) : rng.randint(3, 6)]
+    image = f"http://assets.myntassets.com/assets/images/{product_id}/2024/1/1/{product_id}_1.jpg"
+
+    return {
+        "landingPageUrl": f"{article.lower()}/{slugify(brand)}/{slugify(brand + ' ' + name)}/{product_id}/buy",
+        "loyaltyPointsEnabled": False,
+        "adId": "",
+        "isPLA": False,
+        "productId": product_id,
+        "product": f"{brand} {name}",
+        "productName": f"{brand} {name}",
+        "rating": round(rng.uniform(3.0, 4.9), 2),
+        "ratingCount": rng.randint(0, 25000),
+        "isFastFashion": True,
+        "futureDiscountedPrice": 0,
+        "futureDiscountStartDate": "",
+        "discount": mrp - price,
+        "brand": brand,
+        "searchImage": image,
+        "effectiveDiscountPercentageAfterTax": 0,
+        "effectiveDiscountAmountAfterTax": 0,
+        "buyButtonWinnerSkuId": product_id * 10,
+        "buyButtonWinnerSellerPartnerId": 4036,
+        "relatedStylesCount": 0,
+        "relatedStylesType": "",
+        "productVideos": [],
+        "inventoryInfo": [
+            {
+                "skuId": product_id * 10 + i,
+                "label": size,
+                "inventory": rng.randint(0, 40),
+                "available": True,
+            }
+            for i, size in enumerate(sizes)
+        ],
+        "sizes": ",".join(sizes),
+        "images": [
+            {"view": view, "src": image.replace("_1.jpg", f"_{i + 1}.jpg")}
+            for i, view in enumerate(["default", "front", "back", "left", "right"])
+        ],
+        "gender": gender,
+        "primaryColour": colour,
+        "discountLabel": "Flat_Search_Percent" if discount else "",
+        "discountDisplayLabel": f"({discount}% OFF)" if discount else "",
+        "additionalInfo": name,
+        "category": article,
+        "mrp": mrp,
+        "price": price,
+        "advanceOrderTag": "",
+        "colorVariantAvailable": rng.random() < 0.3,
+        "productimagetag": "",
+        "listViews": 0,
+        "discountType": "1" if discount else "",
+        "tdBxGyText": "",
+        "catalogDate": "1704067200000",
+        "season": "Summer",
+        "year": "2024",
+        "isPersonalised": False,
+        "eorsPicksTag": "",
+        "personalizedCoupon": "",
+        "personalizedCouponValue": 0,
+        "productMeta": "",
+        "systemAttributes": [],
+        "attributeTagsPriorityList": [],
+        "preferredDeliveryTag": "",
+        "deliveryPromise": "",
+    }
+
+
+def make_search_page(rng, offset=0, rows=50, total=12480):
+    products = [make_product(rng, 10000000 + offset + i) for i in range(rows)]
+    brand_counts = {}
+    for product in products:
+        brand_counts[product["brand"]] = brand_counts.get(product["brand"], 0) + 1
+
+    return {
+        "totalCount": total,
+        "products": products,
+        "filters": {
+            "primaryFilters": [
+                {
+                    "id": "Brand",
+                    "filterValues": [
+                        {"id": brand, "value": brand, "count": count * 240}
+                        for brand, count in sorted(brand_counts.items())
+                    ],
+                }
+            ]
+        },
+        "appliedParams": {"filters": [], "sortOptions": "recommended"},
+        "hasNextPage": offset + rows < total,
+    }
+
+
+def make_category_page(rng, products, category="men-clothing", page=1):
+    """Listing markup plus the embedded page-state JSON Myntra renders into the page"""
+    cards = []
+    for product in products:
+        name = product["productName"][len(product["brand"]) + 1 :]
+        cards.append(
+            f"""<li class="product-base" id="{product['productId']}">
+  <a data-refreshpage="true" target="_blank" href="/buy/{slugify(product['productName'])}/{product['productId']}">
+    <div class="product-imageSliderContainer"><picture class="img-responsive"><img src="{product['searchImage']}" class="img-responsive" alt="{product['productName']}" title="{product['productName']}"></picture></div>
+    <div class="product-ratingsContainer"><span>{product['rating']:.1f}</span><span class="myntraweb-sprite product-starIcon"></span><div class="product-ratingsCount"><span class="product-separator">|</span>{product['ratingCount']}</div></div>
+    <div class="product-productMetaInfo">
+      <h3 class="product-brand">{product['brand']}</h3>
+      <h4 class="product-product">{name}</h4>
+      <h4 class="product-sizes">Sizes: <span class="product-sizeInventoryPresent">{product['sizes'].replace(',', ', ')}</span></h4>
+      <div class="product-price"><span><span class="product-discountedPrice">Rs. {product['price']}</span><span class="product-strike">Rs. {product['mrp']}</span></span><span class="product-discountPercentage">{product['discountDisplayLabel']}</span></div>
+    </div>
+  </a>
+</li>"""
+        )
+
+    state = {"searchData": {"results": {"totalCount": 12480, "products": products}}}
+    return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>Men Clothing - Buy Men Clothing online in India</title>
+<link rel="stylesheet" href="https://constant.myntassets.com/web/assets/css/bundle.css"></head>
+<body><div id="mountRoot"><div class="search-searchProductsContainer"><section><ul class="results-base">
+{chr(10).join(cards)}
+</ul></section>
+<ul class="pagination-container"><li class="pagination-paginationMeta">Page {page} of 250</li>
+<li class="pagination-next"><a aria-label="Next" href="/{category}?p={page + 1}" rel="next">Next</a></li></ul>
+</div></div>
+<script>window.__myx = {json.dumps(state)}</script>
+</body></html>"""
+
+
+def make_product_page(rng, product, with_json_ld=True):
+    name = product["productName"][len(product["brand"]) + 1 :]
+    json_ld = {
+        "@context": "http://schema.org",
+        "@type": "Product",
+        "name": product["productName"],
+        "image": [img["src"] for img in product["images"]],
+        "description": f"{product['additionalInfo']}. Regular fit, machine wash. "
+        * 8,
+        "sku": str(product["productId"]),
+        "mpn": str(product["productId"]),
+        "brand": {"@type": "Brand", "name": product["brand"]},
+        "offers": {
+            "@type": "Offer",
+            "priceCurrency": "INR",
+            "price": str(product["price"]),
+            "availability": "http://schema.org/InStock",
+        },
+        "aggregateRating": {
+            "@type": "AggregateRating",
+            "ratingValue": str(product["rating"]),
+            "reviewCount": str(product["ratingCount"]),
+        },
+    }
+    ld_script = (
+        f'<script type="application/ld+json">{json.dumps(json_ld)}</script>'
+        if with_json_ld
+        else ""
+    )
+    breadcrumbs = '<script type="application/ld+json">{"@context":"http://schema.org","@type":"BreadcrumbList","itemListElement":[]}</script>'
+    size_buttons = "".join(
+        f'<div class="size-buttons-buttonContainer"><button class="size-buttons-size-button size-buttons-size-button-default"><p class="size-buttons-unified-size">{size}</p>{size}</button></div>'
+        for size in product["sizes"].split(",")
+    )
+    images = "".join(
+        f'<div class="image-grid-imageContainer"><div class="image-grid-image" style="background-image: url(&quot;{img["src"]}&quot;);"></div><img class="image-grid-image" src="{img["src"]}"></div>'
+        for img in product["images"]
+    )
+    # Real PDPs ship a large serialized app state; pad to a comparable size
+    filler = json.dumps(
+        {"pdpData": {"style": product, "related": [product] * 12, "seo": "x" * 4000}}
+    )
+
+    return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{product['productName']}</title>
+{breadcrumbs}{ld_script}</head>
+<body><div id="mountRoot"><main class="pdp-pdp-container">
+<div class="image-grid-container">{images}</div>
+<div class="pdp-details common-clearfix">
+<div class="pdp-price-info"><h1 class="pdp-title">{product['brand']}</h1><h1 class="pdp-name">{name}</h1>
+<div class="index-overallRatingContainer"><div class="index-overallRating"><div>{product['rating']:.1f}</div></div><div class="index-ratingsCount">{product['ratingCount']:,} Ratings</div></div>
+<p class="pdp-discount-container"><span class="pdp-price"><strong>₹{product['price']}</strong></span><span class="pdp-mrp"><s>₹{product['mrp']}</s></span><span class="pdp-discount">{product['discountDisplayLabel']}</span></p></div>
+<div class="size-buttons-size-container">{size_buttons}</div>
+<div class="color-buttons-colorContainer"><a class="color-buttons-color" title="{product['primaryColour']}"></a></div>
+<div class="pdp-productDescriptors"><p class="pdp-product-description-content">{product['additionalInfo']}</p></div>
+</div></main></div>
+<script>window.__myx = {filler}</script>
+</body></html>"""
+
+
+def make_order_history_page(rng, products):
+    orders = []
+    for i, product in enumerate(products):
+        orders.append(
+            f"""<div class="orders-orderContainer" data-testid="order">
+  <div class="order-id">ORD{1100000000 + i}</div>
+  <div class="order-date">Delivered on {rng.randint(1, 28)} Mar 2024</div>
+  <a href="https://www.myntra.com/buy/{slugify(product['productName'])}/{product['productId']}">
+    <div class="item-brand brand">{product['brand']}</div>
+    <div class="product-name">{product['productName']}</div>
+  </a>
+  <div class="item-price price">₹{product['price']}</div>
+  <div class="size">Size: {product['sizes'].split(',')[0]}</div>
+  <div class="color">{product['primaryColour']}</div>
+  <div class="rating">{rng.randint(1, 5)}</div>
+  <div class="review-text">Good fit and fabric quality</div>
+</div>"""
+        )
+    return f"""<!DOCTYPE html>
+<html><body><div class="orders-container">
+{chr(10).join(orders)}
+</div></body></html>"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate benchmark fixtures")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    os.makedirs(args.output, exist_ok=True)
+
+    search_page = make_search_page(rng)
+    products = search_page["products"]
+    files = {
+        "search_api_page.json": json.dumps(search_page, indent=2),
+        "category_page.html": make_category_page(rng, products),
+        "product_page.html": make_product_page(rng, products[0]),
+        "product_page_no_jsonld.html": make_product_page(
+            rng, products[1], with_json_ld=False
+        ),
+        "order_history.html": make_order_history_page(rng, products[:20]),
+    }
+
+    for filename, content in files.items():
+        path = os.path.join(args.output, filename)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        print(f"💾 Wrote {path} ({len(content.encode('utf-8')) / 1024:.1f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Offline parser throughput benchmarks
+Feeds recorded fixtures straight into spider callbacks and item pipelines (no
+network, no reactor) and reports items/s, µs per item and allocations per item.
+Results are compared against benchmarks/baseline.json; a slowdown beyond the
+tolerance makes the run exit non-zero.
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CRAWLER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, CRAWLER_DIR)
+
+from scrapy import Request
+from scrapy.http import HtmlResponse, TextResponse
+from selenium.common.exceptions import NoSuchElementException
+from parsel import Selector
+
+from myntra_crawler.alerts import AlertIndex
+from myntra_crawler.items import ProductItem
+from myntra_crawler.pipelines import (
+    DuplicatesPipeline,
+    JsonWriterPipeline,
+    NormalizeRecordsPipeline,
+)
+from myntra_crawler.spiders.myntra_api_products import MyntraAPIProductsSpider
+from myntra_crawler.spiders.myntra_products import MyntraProductsSpider
+from myntra_crawler.spiders.myntra_user_data import MyntraUserDataSpider
+from enhanced_session_spider import EnhancedSessionMyntraSpider
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+class ParselElement:
+    """Minimal stand-in for a Selenium WebElement backed by a parsel selector"""
+
+    def __init__(self, selector):
+        self.selector = selector
+
+    @property
+    def text(self):
+        return " ".join(t.strip() for t in self.selector.css("::text").getall()).strip()
+
+    def find_element(self, by, value):
+        found = self.selector.css(value)
+        if not found:
+            raise NoSuchElementException(value)
+        return ParselElement(found[0])
+
+    def find_elements(self, by, value):
+        return [ParselElement(s) for s in self.selector.css(value)]
+
+    def get_attribute(self, name):
+        if name == "outerHTML":
+            return self.selector.get()
+        return self.selector.attrib.get(name)
+
+
+def consume(outputs):
+    """Drain a callback and count emitted items and requests"""
+    count = 0
+    for output in outputs or ():
+        count += 1
+    return count
+
+
+# Each benchmark factory returns a zero-argument callable processing one unit
+# of work (one response, one batch of items) and returning the output count.
+
+
+def bench_api_parse_search_api():
+    spider = MyntraAPIProductsSpider(category="men-clothing", max_pages=10**9)
+    body = load_fixture("search_api_page.json")
+    url = "https://www.myntra.com/gateway/v2/search/men-clothing?rows=50&o=0"
+    meta = {"page": 1, "category": "men-clothing", "offset": 0}
+
+    def run():
+        response = TextResponse(
+            url=url,
+            body=body,
+            encoding="utf-8",
+            request=Request(url, meta=meta),
+        )
+        return consume(spider.parse_search_api(response)) - 1  # minus next page
+
+    return run
+
+
+def bench_enhanced_parse_search_api():
+    spider = EnhancedSessionMyntraSpider(category="men-clothing", max_pages=10**9)
+    body = load_fixture("search_api_page.json")
+    url = "https://www.myntra.com/gateway/v2/search/men-clothing?rows=50&o=0"
+    meta = {"page": 1, "category": "men-clothing", "offset": 0}
+
+    def run():
+        response = TextResponse(
+            url=url,
+            body=body,
+            encoding="utf-8",
+            request=Request(url, meta=meta),
+        )
+        return consume(spider.parse_search_api(response)) - 1
+
+    return run
+
+
+def bench_products_parse_category_page(listing_only=False):
+    spider = MyntraProductsSpider(
+        category="men-clothing", max_pages=10**9, listing_only=listing_only
+    )
+    spider.pages_scraped["men-clothing"] = 0
+    body = load_fixture("category_page.html")
+    url = "https://www.myntra.com/men-clothing"
+
+    def run():
+        response = HtmlResponse(
+            url=url,
+            body=body,
+            encoding="utf-8",
+            request=Request(url, meta={"category": "men-clothing"}),
+        )
+        return consume(spider.parse_category_page(response)) - 1
+
+    return run
+
+
+def bench_products_parse_category_page_listing():
+    return bench_products_parse_category_page(listing_only=True)
+
+
+def _bench_parse_product(fixture):
+    spider = MyntraProductsSpider(category="men-clothing")
+    body = load_fixture(fixture)
+    url = "https://www.myntra.com/buy/roadster-men-black-printed-tshirt/10000000"
+
+    def run():
+        response = HtmlResponse(
+            url=url,
+            body=body,
+            encoding="utf-8",
+            request=Request(url, meta={"category": "men-clothing"}),
+        )
+        return consume(spider.parse_product(response))
+
+    return run
+
+
+def bench_products_parse_product():
+    return _bench_parse_product("product_page.html")
+
+
+def bench_products_parse_product_css():
+    return _bench_parse_product("product_page_no_jsonld.html")
+
+
+def bench_user_data_extract_orders():
+    spider = MyntraUserDataSpider(email="bench", password="bench", headless="true")
+    body = load_fixture("order_history.html").decode("utf-8")
+
+    def run():
+        page = Selector(text=body)
+        elements = ParselElement(page).find_elements(
+            None, '.orders-orderContainer, .order-item, [data-testid="order"]'
+        )
+        return sum(1 for el in elements if spider.extract_order_data(el))
+
+    return run
+
+
+def _sample_items(count=500):
+    spider = MyntraAPIProductsSpider(category="men-clothing")
+    products = json.loads(load_fixture("search_api_page.json"))["products"]
+    items = []
+    for i in range(count):
+        product = dict(products[i % len(products)])
+        product["productId"] = 20000000 + i
+        items.append(spider.create_product_item_from_api(product, "men-clothing"))
+    return items
+
+
+class _BenchSpider:
+    """Just enough of a spider for pipelines: a name and a logger"""
+
+    name = "benchmark"
+    logger = logging.getLogger("benchmark")
+
+
+def bench_pipeline_json_writer():
+    items = _sample_items()
+    spider = _BenchSpider()
+
+    def run():
+        pipeline = JsonWriterPipeline()
+        pipeline.open_spider(spider)
+        for item in items:
+            pipeline.process_item(ProductItem(item), spider)
+        pipeline.close_spider(spider)
+        return len(items)
+
+    return run
+
+
+def bench_pipeline_json_writer_records():
+    items = [NormalizeRecordsPipeline().process_item(item, None) for item in _sample_items()]
+    spider = _BenchSpider()
+
+    def run():
+        pipeline = JsonWriterPipeline()
+        pipeline.open_spider(spider)
+        for item in items:
+            pipeline.process_item(item, spider)
+        pipeline.close_spider(spider)
+        return len(items)
+
+    return run
+
+
+def bench_pipeline_normalize_records():
+    items = _sample_items()
+    spider = _BenchSpider()
+    pipeline = NormalizeRecordsPipeline()
+
+    def run():
+        for item in items:
+            pipeline.process_item(item, spider)
+        return len(items)
+
+    return run
+
+
+def bench_pipeline_duplicates():
+    items = _sample_items()
+    spider = _BenchSpider()
+
+    def run():
+        pipeline = DuplicatesPipeline()
+        for item in items:
+            pipeline.process_item(item, spider)
+        return len(items)
+
+    return run
+
+
+def bench_alert_index_match(rule_count=1000000):
+    """Candidate rule lookup for a product against a large watchlist"""
+    records = [NormalizeRecordsPipeline().process_item(item, None) for item in _sample_items()]
+    brands = sorted({record.brand for record in records}) + [f"brand{i}" for i in range(2000)]
+    categories = sorted({record.category for record in records}) + ["women-clothing", "men-footwear"]
+    sizes = ["XS", "S", "M", "L", "XL", "XXL"]
+    rng = random.Random(0)
+    index = AlertIndex(
+        {
+            "rule_id": i,
+            "brand": rng.choice(brands),
+            "category": rng.choice(categories) if rng.random() < 0.5 else None,
+            "size": rng.choice(sizes) if rng.random() < 0.7 else None,
+            "max_price": rng.randint(500, 3000),
+        }
+        for i in range(rule_count)
+    )
+
+    def run():
+        for record in records:
+            index.match_record(record)
+        return len(records)
+
+    return run
+
+
+BENCHMARKS = {
+    "api_products.parse_search_api": bench_api_parse_search_api,
+    "enhanced_session.parse_search_api": bench_enhanced_parse_search_api,
+    "products.parse_category_page": bench_products_parse_category_page,
+    "products.parse_category_page[listing]": bench_products_parse_category_page_listing,
+    "products.parse_product[jsonld]": bench_products_parse_product,
+    "products.parse_product[css]": bench_products_parse_product_css,
+    "user_data.extract_order_data": bench_user_data_extract_orders,
+    "pipelines.JsonWriterPipeline": bench_pipeline_json_writer,
+    "pipelines.JsonWriterPipeline[records]": bench_pipeline_json_writer_records,
+    "pipelines.NormalizeRecordsPipeline": bench_pipeline_normalize_records,
+    "pipelines.DuplicatesPipeline": bench_pipeline_duplicates,
+    "alerts.AlertIndex.match[1M rules]": bench_alert_index_match,
+}
+
+
+def calibrate(rounds=5):
+    """Time a fixed pure-Python workload so baselines transfer across machines"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        data = {}
+        for i in range(200000):
+            data[str(i)] = i * 2
+        sum(v for v in data.values() if v % 3)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(run, min_time, repeats):
+    """Return best µs/item over `repeats` timed rounds plus allocation stats"""
+    run()  # Warm up caches, imports and lazy attributes
+
+    best = float("inf")
+    items_per_round = 0
+    for _ in range(repeats):
+        gc.collect()
+        iterations = 0
+        items = 0
+        start = time.perf_counter()
+        while True:
+            items += run()
+            iterations += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        if items:
+            best = min(best, elapsed / items * 1e6)
+        items_per_round = items / iterations
+
+    # Allocation pass, kept separate because tracemalloc slows everything down
+    gc.collect()
+    tracemalloc.start()
+    before_blocks = sum(s.count for s in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.reset_peak()
+    items = run()
+    _, peak = tracemalloc.get_traced_memory()
+    after_blocks = sum(s.count for s in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+
+    items = max(items, 1)
+    return {
+        "us_per_item": best,
+        "items_per_s": 1e6 / best if best else 0.0,
+        "items_per_call": items_per_round,
+        "peak_kib_per_item": peak / 1024 / items,
+        "retained_blocks_per_item": (after_blocks - before_blocks) / items,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run offline parser benchmarks")
+    parser.add_argument("-k", "--filter", help="Only run benchmarks containing this text")
+    parser.add_argument(
+        "--min-time", type=float, default=0.5, help="Seconds per timed round"
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="Timed rounds per benchmark")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown vs baseline before failing (0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Store results as the new baseline"
+    )
+    parser.add_argument("--json", help="Also write raw results to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if not os.path.exists(os.path.join(FIXTURES_DIR, "search_api_page.json")):
+        print("❌ Fixtures missing. Run: python benchmarks/make_fixtures.py")
+        sys.exit(1)
+
+    baseline = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as f:
+            baseline = json.load(f)
+
+    calibration = calibrate()
+    base_calibration = baseline.get("calibration_s") or calibration
+    scale = calibration / base_calibration
+    print(f"⚙️  Calibration: {calibration * 1000:.1f} ms (machine factor {scale:.2f}x)")
+
+    # Spiders and pipelines write debug/output files relative to the cwd
+    workdir = tempfile.mkdtemp(prefix="myntra_bench_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+
+    results = {}
+    regressions = []
+    header = f"{'benchmark':<40} {'items/s':>11} {'µs/item':>10} {'KiB/item':>9} {'blocks/item':>12} {'vs base':>8}"
+    print(header)
+    print("-" * len(header))
+    try:
+        for name, factory in BENCHMARKS.items():
+            if args.filter and args.filter not in name:
+                continue
+
+            result = measure(factory(), args.min_time, args.repeats)
+            results[name] = result
+
+            expected = baseline.get("benchmarks", {}).get(name, {}).get("us_per_item")
+            verdict = ""
+            if expected:
+                ratio = result["us_per_item"] / (expected * scale)
+                verdict = f"{ratio:>7.2f}x"
+                if ratio > 1 + args.tolerance:
+                    regressions.append((name, ratio))
+                    verdict += " ❌"
+
+            print(
+                f"{name:<40} {result['items_per_s']:>11,.0f} {result['us_per_item']:>10.1f} "
+                f"{result['peak_kib_per_item']:>9.2f} {result['retained_blocks_per_item']:>12.1f} {verdict}"
+            )
+    finally:
+        os.chdir(cwd)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"calibration_s": calibration, "benchmarks": results}, f, indent=2)
+
+    if args.save_baseline:
+        merged = dict(baseline.get("benchmarks", {}))
+        merged.update(results)
+        with open(BASELINE_FILE, "w") as f:
+            json.dump({"calibration_s": calibration, "benchmarks": merged}, f, indent=2)
+            f.write("\n")
+        print(f"💾 Saved baseline to {BASELINE_FILE}")
+        return
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} benchmark(s) slower than baseline:")
+        for name, ratio in regressions:
+            print(f"   {name}: {ratio:.2f}x baseline")
+        sys.exit(1)
+
+    print("\n✅ No parse-speed regressions")
+
+
+if __name__ == "__main__":
+    main()
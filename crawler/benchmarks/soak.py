@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Memory soak harness
+Drives a spider's callbacks and the configured item pipelines with synthetic or
+replayed responses for millions of items, sampling tracemalloc and RSS every N
+items. Reports the allocation sites that keep growing and fails when the
+steady-state growth per item exceeds a threshold.
+"""
+
+import os
+import re
+import sys
+import gc
+import glob
+import json
+import time
+import logging
+import argparse
+import tempfile
+import resource
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CRAWLER_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, CRAWLER_DIR)
+
+from scrapy import Request
+from scrapy.exceptions import DropItem
+from scrapy.http import HtmlResponse, TextResponse
+from scrapy.pipelines import ItemPipelineManager
+from scrapy.settings import SETTINGS_PRIORITIES
+from scrapy.utils.project import get_project_settings
+from scrapy.utils.test import get_crawler
+from itemadapter import is_item
+
+from benchmarks.make_fixtures import make_category_page, make_product_page
+from mock_gateway import Catalog
+from myntra_crawler.spiders.myntra_api_products import MyntraAPIProductsSpider
+from myntra_crawler.spiders.myntra_products import MyntraProductsSpider
+from enhanced_session_spider import EnhancedSessionMyntraSpider
+
+SEARCH_URL = "https://www.myntra.com/gateway/v2/search/{category}?rows={rows}&o={offset}"
+CATEGORY = "men-clothing"
+
+# Stores that hold something per product by design (index postings, price
+# series, MinHash signatures) grow with every new product id, so the default
+# pipeline set leaves them out; name them with --pipeline to soak them anyway
+PER_PRODUCT_STORES = {
+    "CATALOG_INDEX_PATH": None,
+    "PRICE_HISTORY_PATH": None,
+    "NEAR_DUPLICATES_ENABLED": False,
+}
+
+
+def read_rss():
+    """Current resident set size in bytes (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class SearchApiSource:
+    """Endless stream of search API responses with unique product ids"""
+
+    def __init__(self, rows=50, replay_dir=None, templates=8):
+        self.rows = rows
+        if replay_dir:
+            pages = []
+            for path in sorted(glob.glob(os.path.join(replay_dir, "*.json"))):
+                with open(path, encoding="utf-8") as f:
+                    pages.append(json.load(f))
+            self.templates = [page.get("products", []) for page in pages if page]
+        else:
+            catalog = Catalog([CATEGORY], size=rows * templates)
+            self.templates = [
+                catalog.page(CATEGORY, i * rows, rows) for i in range(templates)
+            ]
+        if not self.templates:
+            raise SystemExit("❌ No replayable search API pages found")
+
+    def responses(self):
+        page = 0
+        while True:
+            products = []
+            for i, product in enumerate(self.templates[page % len(self.templates)]):
+                product = dict(product)
+                product["productId"] = 30000000 + page * self.rows + i
+                products.append(product)
+
+            offset = page * self.rows
+            url = SEARCH_URL.format(category=CATEGORY, rows=self.rows, offset=offset)
+            body = json.dumps(
+                {"totalCount": 10**9, "products": products, "hasNextPage": True}
+            )
+            # Page 1 keeps the spider's debug dump overwriting a single file
+            meta = {"page": 1, "category": CATEGORY, "offset": offset}
+            yield TextResponse(
+                url=url,
+                body=body,
+                encoding="utf-8",
+                request=Request(url, meta=meta),
+            )
+            page += 1
+
+
+class ProductPagesSource:
+    """Endless stream of one listing page followed by its product detail pages"""
+
+    def __init__(self, rows=50, replay_dir=None):
+        if replay_dir:
+            self.listings = self._read_all(replay_dir, "category_page*.html")
+            self.details = self._read_all(replay_dir, "product_page*.html")
+        else:
+            catalog = Catalog([CATEGORY], size=rows)
+            products = catalog.page(CATEGORY, 0, rows)
+            self.listings = [make_category_page(None, products).encode("utf-8")]
+            self.details = [
+                make_product_page(None, product).encode("utf-8")
+                for product in products[:8]
+            ]
+        if not self.listings or not self.details:
+            raise SystemExit("❌ No replayable listing/product pages found")
+        self.rows = rows
+
+    @staticmethod
+    def _read_all(directory, pattern):
+        bodies = []
+        for path in sorted(glob.glob(os.path.join(directory, pattern))):
+            with open(path, "rb") as f:
+                bodies.append(f.read())
+        return bodies
+
+    def responses(self):
+        page = 0
+        while True:
+            url = f"https://www.myntra.com/{CATEGORY}?p={page + 1}"
+            yield HtmlResponse(
+                url=url,
+                body=self.listings[page % len(self.listings)],
+                encoding="utf-8",
+                request=Request(url, meta={"category": CATEGORY}),
+            )
+            for i in range(self.rows):
+                product_id = 40000000 + page * self.rows + i
+                url = f"https://www.myntra.com/buy/soak-product/{product_id}"
+                yield HtmlResponse(
+                    url=url,
+                    body=self.details[i % len(self.details)],
+                    encoding="utf-8",
+                    request=Request(url, meta={"category": CATEGORY}),
+                )
+            page += 1
+
+
+def build_target(name, rows, replay_dir):
+    """Return (spider, response source, callback picker) for a soak target"""
+    if name == "api":
+        spider = MyntraAPIProductsSpider(category=CATEGORY, max_pages=10**12)
+        source = SearchApiSource(rows, replay_dir)
+        return spider, source, lambda response: spider.parse_search_api
+    if name == "enhanced":
+        spider = EnhancedSessionMyntraSpider(category=CATEGORY, max_pages=10**12)
+        source = SearchApiSource(rows, replay_dir)
+        return spider, source, lambda response: spider.parse_search_api
+    if name == "products":
+        spider = MyntraProductsSpider(category=CATEGORY, max_pages=10**12)
+        spider.pages_scraped[CATEGORY] = 0
+        source = ProductPagesSource(rows, replay_dir)
+        return spider, source, lambda response: (
+            spider.parse_product
+            if "/buy/" in response.url
+            else spider.parse_category_page
+        )
+    raise SystemExit(f"❌ Unknown spider: {name}")
+
+
+def load_pipelines(spider, project, names=None):
+    """Pipelines from ITEM_PIPELINES (or an explicit list of paths), in order
+
+    They are built through a test crawler, with from_crawler as in a real crawl,
+    so pipelines reading settings work and NotConfigured ones are left out. The
+    default set runs without the per-product stores.
+    """
+    # Project values only: the test crawler brings its own reactor-free defaults
+    settings = {
+        name: project[name]
+        for name in project
+        if project.getpriority(name) > SETTINGS_PRIORITIES["default"]
+    }
+    if names is not None:
+        settings["ITEM_PIPELINES"] = {path: order for order, path in enumerate(names)}
+    else:
+        settings.update(PER_PRODUCT_STORES)
+    crawler = get_crawler(type(spider), settings)
+    return list(ItemPipelineManager.from_crawler(crawler).middlewares)
+
+
+def slope(points):
+    """Least-squares slope of (x, y) points"""
+    if len(points) < 2:
+        return 0.0
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+
+
+def soak(spider, source, pick_callback, pipelines, total_items, every, warmup):
+    for pipeline in pipelines:
+        if hasattr(pipeline, "open_spider"):
+            pipeline.open_spider(spider)
+
+    samples = []
+    warm_snapshot = None
+    items = 0
+    dropped = 0
+    requests = 0
+    next_sample = every
+    start = time.perf_counter()
+
+    print(f"{'items':>12} {'traced MiB':>11} {'RSS MiB':>9} {'items/s':>9}")
+    for response in source.responses():
+        for output in pick_callback(response)(response) or ():
+            if isinstance(output, Request):
+                requests += 1
+                continue
+            if not is_item(output):
+                continue
+
+            items += 1
+            try:
+                for pipeline in pipelines:
+                    output = pipeline.process_item(output, spider)
+            except DropItem:
+                dropped += 1
+
+        if items >= next_sample:
+            next_sample += every
+            gc.collect()
+            traced, _ = tracemalloc.get_traced_memory()
+            rss = read_rss()
+            elapsed = time.perf_counter() - start
+            samples.append((items, traced, rss))
+            print(
+                f"{items:>12,} {traced / 2**20:>11.1f} {rss / 2**20:>9.1f} {items / elapsed:>9,.0f}"
+            )
+            if warm_snapshot is None and items >= total_items * warmup:
+                warm_snapshot = tracemalloc.take_snapshot()
+
+        if items >= total_items:
+            break
+
+    final_snapshot = tracemalloc.take_snapshot()
+
+    for pipeline in pipelines:
+        if hasattr(pipeline, "close_spider"):
+            pipeline.close_spider(spider)
+
+    return samples, warm_snapshot, final_snapshot, dropped, requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory soak test for spiders and pipelines")
+    parser.add_argument(
+        "--spider", choices=["api", "enhanced", "products"], default="products"
+    )
+    parser.add_argument("--items", type=int, default=1_000_000, help="Items to push through")
+    parser.add_argument(
+        "--snapshot-every", type=int, default=50_000, help="Sample memory every N items"
+    )
+    parser.add_argument(
+        "--warmup", type=float, default=0.2, help="Fraction of the run ignored as warm-up"
+    )
+    parser.add_argument(
+        "--max-growth",
+        type=float,
+        default=16.0,
+        help="Fail when steady-state traced growth exceeds this many bytes per item",
+    )
+    parser.add_argument("--rows", type=int, default=50, help="Products per page")
+    parser.add_argument(
+        "--replay", help="Directory of recorded responses to replay instead of synthetic ones"
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="append",
+        help="Pipeline class path (repeatable, defaults to ITEM_PIPELINES)",
+    )
+    parser.add_argument("--top", type=int, default=15, help="Growing sites to report")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    spider, source, pick_callback = build_target(args.spider, args.rows, args.replay)
+
+    # Spiders and pipelines write files relative to the cwd (scrapy.cfg is found from it)
+    project = get_project_settings()
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix="myntra_soak_"))
+    try:
+        pipelines = load_pipelines(spider, project, args.pipeline)
+    except Exception:
+        os.chdir(cwd)
+        raise
+    print(
+        f"🧪 Soaking {spider.name} with {args.items:,} items through "
+        f"{[type(p).__name__ for p in pipelines]}"
+    )
+    tracemalloc.start()
+    try:
+        samples, warm, final, dropped, requests = soak(
+            spider,
+            source,
+            pick_callback,
+            pipelines,
+            args.items,
+            args.snapshot_every,
+            args.warmup,
+        )
+    finally:
+        tracemalloc.stop()
+        os.chdir(cwd)
+
+    steady = [s for s in samples if s[0] >= args.items * args.warmup]
+    traced_growth = slope([(items, traced) for items, traced, _ in steady])
+    rss_growth = slope([(items, rss) for items, _, rss in steady])
+
+    print(f"\n📦 {samples[-1][0] if samples else 0:,} items, {dropped:,} dropped, {requests:,} requests")
+    print(f"📈 Steady-state growth: {traced_growth:.1f} B/item traced, {rss_growth:.1f} B/item RSS")
+
+    if warm is not None:
+        print(f"\n🔍 TOP {args.top} GROWING ALLOCATION SITES SINCE WARM-UP")
+        print("=" * 80)
+        for stat in final.compare_to(warm, "lineno")[: args.top]:
+            if stat.size_diff <= 0:
+                break
+            frame = stat.traceback[0]
+            filename = os.path.relpath(frame.filename, CRAWLER_DIR)
+            if filename.startswith(".."):
+                filename = re.sub(r".*site-packages/", "", frame.filename)
+            print(
+                f"{stat.size_diff / 2**20:>+9.2f} MiB {stat.count_diff:>+10,} blocks  {filename}:{frame.lineno}"
+            )
+
+    if traced_growth > args.max_growth:
+        print(
+            f"\n❌ Memory grows {traced_growth:.1f} B/item (threshold {args.max_growth:.1f})"
+        )
+        sys.exit(1)
+
+    print(f"\n✅ Memory is flat (threshold {args.max_growth:.1f} B/item)")
+
+
+if __name__ == "__main__":
+    main()
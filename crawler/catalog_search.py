@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Catalog Search for Myntra crawls
+Builds the persistent product index from crawl output files and runs filtered,
+faceted queries against it
+"""
+
+import os
+import sys
+import glob
+import time
+import re
+import argparse
+
+from myntra_crawler.catalog_index import FACETS, CatalogIndex, effective_price, index_file
+
+DEFAULT_INDEX = "data/catalog_index.sqlite"
+WORKER_PART_RE = re.compile(r"_w\d+\.json$")
+
+
+def parse_price_range(text):
+    """'500-1500', '500-' or '-1500' in rupees to a (low, high) range in paise"""
+    low, _, high = text.partition("-")
+    return (
+        int(float(low) * 100) if low else None,
+        int(float(high) * 100) if high else None,
+    )
+
+
+def format_price(paise):
+    return f"₹{paise / 100:,.0f}" if paise is not None else "-"
+
+
+def build_index(index_path, paths, normalize=False):
+    """Index crawl output files (default: every products file in data/)"""
+    if not paths:
+        paths = sorted(glob.glob("data/myntra_*products_*.json"))
+        # Worker parts are merged into a full output file when a run finishes
+        paths = [path for path in paths if not WORKER_PART_RE.search(path)]
+    if not paths:
+        print("❌ No crawl output files found")
+        return 1
+
+    index = CatalogIndex(index_path)
+    started = time.time()
+    for path in paths:
+        count = index_file(index, path, normalize=normalize)
+        print(f"📦 {path}: {count} products")
+    index.close()
+
+    print(f"🔎 {index_path} holds {len(index)} products ({time.time() - started:.1f}s)")
+    return 0
+
+
+def run_search(index_path, args):
+    if not os.path.exists(index_path):
+        print(f"❌ No index at {index_path}, run `catalog_search.py build` first")
+        return 1
+
+    index = CatalogIndex(index_path)
+    low, high = parse_price_range(args.price) if args.price else (None, None)
+    result = index.search(
+        text=" ".join(args.query),
+        brand=args.brand,
+        category=args.category,
+        size=args.size,
+        color=args.color,
+        price_min=low,
+        price_max=high,
+        sort=args.sort,
+        limit=args.limit,
+        offset=args.offset,
+        facets=args.facets.split(",") if args.facets else (),
+    )
+
+    print(f"\n🔍 {result.total} products ({result.elapsed_ms:.3f} ms)")
+    print("=" * 86)
+    for record in index.records(result.docs):
+        print(
+            f"{record.product_id:<12} {format_price(effective_price(record)):>10}  "
+            f"{record.brand[:18]:<18} {record.name[:42]}"
+        )
+
+    for field, counts in result.facets.items():
+        print(f"\n{field}:")
+        for value, count in counts:
+            print(f"   {value:<30} {count:>8}")
+
+    index.close()
+    return 0
+
+
+def show_stats(index_path):
+    if not os.path.exists(index_path):
+        print(f"❌ No index at {index_path}, run `catalog_search.py build` first")
+        return 1
+
+    index = CatalogIndex(index_path)
+    for name, value in index.stats().items():
+        print(f"{name:<18} {value:>10}")
+    index.close()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the scraped Myntra catalog")
+    parser.add_argument(
+        "--index", default=DEFAULT_INDEX, help=f"Index file (default: {DEFAULT_INDEX})"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Index crawl output JSON files")
+    build.add_argument("files", nargs="*", help="Output files (default: data/*products*.json)")
+    build.add_argument(
+        "--normalize",
+        action="store_true",
+        help="Normalize raw items from dumps written before typed records",
+    )
+
+    search = commands.add_parser("search", help="Query the index")
+    search.add_argument("query", nargs="*", help="Words matched in name/brand/description")
+    search.add_argument("--brand", action="append", help="Brand (repeat to OR values)")
+    search.add_argument("--category", action="append", help="Category (repeatable)")
+    search.add_argument("--size", action="append", help="Size (repeatable)")
+    search.add_argument("--color", action="append", help="Color (repeatable)")
+    search.add_argument("--price", help="Price range in rupees, e.g. 500-1500 or 2000-")
+    search.add_argument("--sort", choices=["price", "-price"], help="Sort order")
+    search.add_argument("--limit", type=int, default=20, help="Results to show")
+    search.add_argument("--offset", type=int, default=0, help="Results to skip")
+    search.add_argument(
+        "--facets",
+        default="brand,size,color,price",
+        help=f"Comma-separated facet counts to show ({','.join(FACETS)})",
+    )
+
+    commands.add_parser("stats", help="Show index size")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        return build_index(args.index, args.files, args.normalize)
+    if args.command == "search":
+        return run_search(args.index, args)
+    return show_stats(args.index)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
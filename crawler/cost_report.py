@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Crawl cost report for Myntra crawls
+Lists the runs recorded by the cost accounting extension, breaks one run down
+per category and request type, and compares efficiency between releases
+"""
+
+import sys
+import argparse
+from collections import defaultdict
+from datetime import datetime
+from myntra_crawler.accounting import group_runs, load_runs
+
+# Efficiency metrics compared between releases, and whether higher is better
+COMPARED = (
+    ("items_per_request", True),
+    ("wire_bytes_per_item", False),
+    ("requests_per_new_item", False),
+)
+
+
+def fmt(value, scale=1.0, digits=2):
+    return "-" if value is None else f"{value / scale:.{digits}f}"
+
+
+def print_runs(runs):
+    print("\n💰 CRAWL RUNS")
+    print("=" * 110)
+    print(
+        f"{'started':<17} {'spider':<22} {'release':<10} {'reqs':>7} {'items':>7} {'new':>7} "
+        f"{'items/req':>10} {'KB/item':>9} {'req/new':>9} {'wall s':>8}"
+    )
+    print("-" * 110)
+    for run in runs:
+        totals = run["totals"]
+        started = datetime.fromtimestamp(run["started_at"]).strftime("%Y-%m-%d %H:%M")
+        print(
+            f"{started:<17} {run['spider'][:22]:<22} {str(run['release'])[:10]:<10} "
+            f"{totals['requests']:>7} {totals['items']:>7} {totals['new_items']:>7} "
+            f"{fmt(totals['items_per_request']):>10} {fmt(totals['wire_bytes_per_item'], 1024, 1):>9} "
+            f"{fmt(totals['requests_per_new_item'], digits=3):>9} {run['wall_seconds']:>8.1f}"
+        )
+
+
+def print_run(run):
+    print(f"\n💰 RUN {run['run_id']} ({run['spider']}, release {run['release']})")
+    print("=" * 104)
+    print(
+        f"{'category':<22} {'hop':<28} {'reqs':>6} {'retry':>6} {'fail':>5} "
+        f"{'wire KB':>10} {'decoded KB':>11} {'items':>7}"
+    )
+    print("-" * 104)
+    for row in run["hops"]:
+        print(
+            f"{row['category'][:22]:<22} {row['hop'][:28]:<28} {row['requests']:>6} "
+            f"{row['retries']:>6} {row['failures']:>5} {row['wire_bytes'] / 1024:>10.1f} "
+            f"{row['decoded_bytes'] / 1024:>11.1f} {row['items']:>7}"
+        )
+
+    print(f"\n{'category':<22} {'items/req':>10} {'KB/item':>9} {'new':>7} {'req/new':>9} {'KB/new':>9}")
+    print("-" * 70)
+    for name, values in run["categories"].items():
+        print(
+            f"{name[:22]:<22} {fmt(values['items_per_request']):>10} "
+            f"{fmt(values['wire_bytes_per_item'], 1024, 1):>9} {values['new_items']:>7} "
+            f"{fmt(values['requests_per_new_item'], digits=3):>9} {fmt(values['wire_bytes_per_new_item'], 1024, 1):>9}"
+        )
+
+
+def release_means(runs):
+    """{spider: [(release, {metric: mean})]} with releases in first-seen order"""
+    values = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+    for run in runs:
+        for metric, _ in COMPARED:
+            value = run["totals"].get(metric)
+            if value is not None:
+                values[run["spider"]][run["release"]][metric].append(value)
+    return {
+        spider: [
+            (release, {metric: sum(v) / len(v) for metric, v in metrics.items()})
+            for release, metrics in releases.items()
+        ]
+        for spider, releases in values.items()
+    }
+
+
+def compare_releases(runs, threshold):
+    """Print the latest release against the one before it; returns the regressions found"""
+    regressions = []
+    print("\n📉 RELEASE COMPARISON (mean per run)")
+    print("=" * 86)
+    for spider, releases in sorted(release_means(runs).items()):
+        if len(releases) < 2:
+            print(f"{spider}: only one release recorded ({releases[0][0]})")
+            continue
+        (old_release, old), (new_release, new) = releases[-2], releases[-1]
+        print(f"{spider}: {old_release} -> {new_release}")
+        for metric, higher_is_better in COMPARED:
+            if metric not in old or metric not in new or not old[metric]:
+                continue
+            change = (new[metric] - old[metric]) / old[metric]
+            worse = -change if higher_is_better else change
+            flag = "❌" if worse > threshold else "✅"
+            print(f"   {flag} {metric:<24} {old[metric]:>12.3f} -> {new[metric]:>12.3f} ({change:+.1%})")
+            if worse > threshold:
+                regressions.append((spider, metric, old[metric], new[metric]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report crawl costs and efficiency across runs")
+    parser.add_argument(
+        "cost_file",
+        nargs="?",
+        default="data/crawl_costs.jsonl",
+        help="JSONL cost log (default: data/crawl_costs.jsonl)",
+    )
+    parser.add_argument("--spider", help="Only runs of this spider")
+    parser.add_argument("--run", help="Per-category breakdown of one run id ('latest' for the newest)")
+    parser.add_argument("--last", type=int, default=20, help="Number of runs to list")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative worsening between releases reported as a regression",
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="Exit with status 1 if a regression is found"
+    )
+    args = parser.parse_args()
+
+    runs = group_runs(load_runs(args.cost_file))
+    if args.spider:
+        runs = [run for run in runs if run["spider"] == args.spider]
+    if not runs:
+        print(f"❌ No crawl costs in {args.cost_file}. Run a crawl with COST_REPORT_PATH set first")
+        return 1
+
+    if args.run:
+        matches = runs[-1:] if args.run == "latest" else [r for r in runs if r["run_id"] == args.run]
+        if not matches:
+            print(f"❌ Run {args.run} not found")
+            return 1
+        for run in matches:
+            print_run(run)
+        return 0
+
+    print_runs(runs[-args.last:])
+    regressions = compare_releases(runs, args.threshold)
+    if regressions and args.check:
+        print(f"\n❌ {len(regressions)} efficiency regression(s)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Long-lived crawl daemon
+Keeps one warm Scrapy process running crawls on a cron-like schedule, so
+interpreter/Scrapy startup, user agent data, dedup state and keep-alive HTTP
+connections are reused between runs. A local control socket triggers and
+inspects runs.
+"""
+
+import os
+import sys
+import json
+import socket
+import argparse
+
+DEFAULT_SOCKET = "data/crawl_daemon.sock"
+
+
+def serve(args):
+    from scrapy.utils.log import configure_logging
+    from scrapy.utils.project import get_project_settings
+    from scrapy.utils.reactor import install_reactor
+
+    settings = get_project_settings()
+    for override in args.set:
+        name, _, value = override.partition("=")
+        settings.set(name.strip(), value, priority="cmdline")
+
+    reactor_path = settings.get("TWISTED_REACTOR")
+    if reactor_path:
+        install_reactor(reactor_path)
+    configure_logging(settings)
+
+    from twisted.internet import reactor
+    from myntra_crawler.daemon import CrawlDaemon, load_jobs
+
+    jobs = load_jobs(args.schedule)
+    if args.base_url:
+        for job in jobs:
+            job.kwargs.setdefault("base_url", args.base_url)
+
+    os.makedirs(os.path.dirname(args.socket) or ".", exist_ok=True)
+    daemon = CrawlDaemon(settings, jobs, args.socket, tick_seconds=args.tick)
+    reactor.callWhenRunning(daemon.start)
+    if args.run_now:
+        for name in args.run_now:
+            reactor.callWhenRunning(daemon.trigger, name, "startup")
+
+    print(f"🚀 Crawl daemon with {len(jobs)} jobs, control socket {args.socket}")
+    reactor.run()
+    if os.path.exists(args.socket):
+        os.remove(args.socket)
+
+
+def send_command(path, command):
+    """Send one JSON command to a running daemon and return its reply"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall(json.dumps(command).encode("utf-8") + b"\n")
+        buffer = b""
+        while not buffer.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            buffer += chunk
+    return json.loads(buffer)
+
+
+def print_status(reply):
+    print(f"⏱️  Uptime {reply['uptime_s']}s, {reply['runs']} runs, {reply['active_crawls']} active")
+    print(f"🔥 Warm state: {reply['warm_state']} ({reply['warm_hits']} reuses)")
+    print(f"🔌 Cached connections: {reply['cached_connections']}")
+    print(f"\n{'job':<16} {'schedule':<16} {'next run':<17} {'runs':>5}  last / running")
+    print("-" * 80)
+    for job in reply["jobs"]:
+        if job["running"]:
+            detail = f"▶️  run {job['running']['id']} since {job['running']['started']}"
+        elif job["last_run"]:
+            last = job["last_run"]
+            detail = f"{last.get('finish_reason')} {last.get('items', 0)} items at {last.get('finished')}"
+        else:
+            detail = "-"
+        print(f"{job['name']:<16} {job['schedule']:<16} {job['next_run']:<17} {job['runs']:>5}  {detail}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run or control the crawl daemon")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Control socket path")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Start the daemon in the foreground")
+    run.add_argument("--schedule", help="JSON file with a list of jobs (default: built-in)")
+    run.add_argument("--tick", type=float, default=15, help="Schedule check interval in seconds")
+    run.add_argument("--run-now", action="append", metavar="JOB", help="Trigger JOB at startup")
+    run.add_argument("--base-url", help="Point every job at another host")
+    run.add_argument(
+        "-s",
+        "--set",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="Override a Scrapy setting for all runs (may be repeated)",
+    )
+
+    commands.add_parser("status", help="Show jobs, schedules and last runs")
+    trigger = commands.add_parser("trigger", help="Start a job now")
+    trigger.add_argument("job")
+    history = commands.add_parser("history", help="Show recent runs of a job")
+    history.add_argument("job")
+    commands.add_parser("stop", help="Stop the daemon after closing running crawls")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        if not os.path.exists("scrapy.cfg"):
+            print("Error: Please run this script from the crawler directory")
+            sys.exit(1)
+        serve(args)
+        return
+
+    command = {"cmd": args.command}
+    if args.command in ("trigger", "history"):
+        command["job"] = args.job
+
+    try:
+        reply = send_command(args.socket, command)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"❌ No daemon listening on {args.socket}")
+        sys.exit(1)
+
+    if not reply.get("ok"):
+        print(f"❌ {reply.get('error')}")
+        sys.exit(1)
+
+    if args.command == "status":
+        print_status(reply)
+    elif args.command == "trigger":
+        print(f"▶️  Run {reply['run']['id']} of {reply['run']['job']} started {reply['run']['started']}")
+    elif args.command == "history":
+        for run in reply["history"]:
+            print(json.dumps(run))
+    else:
+        print("🛑 Daemon stopping")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,9 @@ import scrapy
 import json
 import time
 import uuid
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
 from myntra_crawler.items import ProductItem
+from myntra_crawler.pagesize import DEFAULT_ROWS, PageSizeTuner
 
 
 class EnhancedSessionMyntraSpider(scrapy.Spider):
@@ -11,6 +12,7 @@ class EnhancedSessionMyntraSpider(scrapy.Spider):
 
     name = "myntra_enhanced_session"
     allowed_domains = ["myntra.com"]
+    base_url = "https://www.myntra.com"
 
     # Real API endpoints
     api_endpoints = {
@@ -25,6 +27,7 @@ class EnhancedSessionMyntraSpider(scrapy.Spider):
         "HTTPERROR_ALLOWED_CODES": [401, 403, 429],  # Handle auth errors
         "RETRY_TIMES": 3,
         "RETRY_HTTP_CODES": [401, 403, 429, 500, 502, 503, 504],
+        "TRACING_ENABLED": True,  # Trace homepage → category → API page chains
         "DEFAULT_REQUEST_HEADERS": {
             "Accept": "application/json",
             "Accept-Language": "en-IN,en-GB;q=0.9,en-US;q=0.8,en;q=0.7",
@@ -36,17 +39,33 @@ class EnhancedSessionMyntraSpider(scrapy.Spider):
         },
     }
 
-    def __init__(self, category=None, max_pages=5, *args, **kwargs):
+    def __init__(self, category=None, max_pages=5, base_url=None, *args, **kwargs):
         super(EnhancedSessionMyntraSpider, self).__init__(*args, **kwargs)
         self.max_pages = int(max_pages)
         self.category = category or "men-clothing"
         self.pages_scraped = 0
         self.session_established = False
+        self.tuner = None
+
+        # Point the spider at another host, e.g. the local mock gateway
+        if base_url:
+            self.base_url = base_url.rstrip("/")
+            self.allowed_domains = [urlparse(self.base_url).hostname]
+            self.api_endpoints = {"search": f"{self.base_url}/gateway/v2/search"}
 
         # Generate unique device ID for session
         self.device_id = str(uuid.uuid4())
         self.logger.info(f"🔑 Generated device ID: {self.device_id}")
 
+    @property
+    def page_size(self):
+        """Page size tuner for the search endpoint, created once settings are bound"""
+        if self.tuner is None:
+            self.tuner = PageSizeTuner.from_settings(
+                self.api_endpoints["search"], getattr(self, "settings", None)
+            )
+        return self.tuner
+
     def start_requests(self):
         """Enhanced session initialization"""
 
@@ -55,7 +74,7 @@ class EnhancedSessionMyntraSpider(scrapy.Spider):
             return
 
         # Step 1: Visit main page to establish session
-        main_url = "https://www.myntra.com/"
+        main_url = f"{self.base_url}/"
         yield scrapy.Request(
             url=main_url,
             callback=self.establish_base_session,
@@ -70,7 +89,7 @@ class EnhancedSessionMyntraSpider(scrapy.Spider):
         self.log_session_info(response, "Base Session")
 
         # Step 2: Visit category page for specific session context
-        category_url = f"https://www.myntra.com/{self.category}"
+        category_url = f"{self.base_url}/{self.category}"
         yield scrapy.Request(
             url=category_url,
             callback=self.establish_category_session,
@@ -88,7 +107,7 @@ class EnhancedSessionMyntraSpider(scrapy.Spider):
         self.session_established = True
 
         # Step 3: Now make the API call
-        self.make_api_request(response.meta["category"], 0, 1)
+        yield from self.make_api_request(response.meta["category"], 0, 1)
 
     def make_api_request(self, category, offset, page):
         """Make API request with established session"""
@@ -98,12 +117,20 @@ class EnhancedSessionMyntraSpider(scrapy.Spider):
             return
 
         full_url = f"{search_url}/{category}"
-        url_with_params = f"{full_url}?rows=50&o={offset}&plaEnabled=true&xdEnabled=false&pincode=400018"
+        # max_pages counts pages of the default size, whatever size is requested
+        rows = self.page_size.rows_for(offset, self.max_pages * DEFAULT_ROWS)
+        url_with_params = f"{full_url}?rows={rows}&o={offset}&plaEnabled=true&xdEnabled=false&pincode=400018"
 
         yield scrapy.Request(
             url=url_with_params,
             callback=self.parse_search_api,
-            meta={"page": page, "category": category, "offset": offset},
+            meta={
+                "page": page,
+                "category": category,
+                "offset": offset,
+                "rows": rows,
+                "step": "search_api",
+            },
             headers=self.get_api_headers(),
             dont_filter=True,
             errback=self.handle_api_error,
@@ -121,6 +148,11 @@ class EnhancedSessionMyntraSpider(scrapy.Spider):
                 self.logger.warning("🔄 Session expired, re-establishing...")
                 # Re-establish session and retry
                 return self.start_requests()
+            if status in [400, 413, 422] and self.page_size.reject(request.meta["rows"]):
+                self.logger.info(f"📏 API rejected {request.meta['rows']} rows, retrying smaller")
+                return self.make_api_request(
+                    request.meta["category"], request.meta["offset"], request.meta["page"]
+                )
 
         return []
 
@@ -163,12 +195,15 @@ class EnhancedSessionMyntraSpider(scrapy.Spider):
                 if item:
                     yield item
 
-            # Handle pagination
+            # Handle pagination; the next page starts after the products
+            # actually served, which may be fewer than requested
             self.pages_scraped += 1
-            if self.pages_scraped < self.max_pages and self.has_more_pages(data):
-                current_offset = response.meta.get("offset", 0)
-                next_offset = current_offset + 50
-
+            current_offset = response.meta.get("offset", 0)
+            next_offset = current_offset + len(products)
+            total = data.get("totalCount")
+            more = next_offset < total if isinstance(total, int) else self.has_more_pages(data)
+            self.page_size.observe(response.meta.get("rows", DEFAULT_ROWS), len(products), more)
+            if more and next_offset < self.max_pages * DEFAULT_ROWS:
                 yield from self.make_api_request(category, next_offset, page + 1)
 
         except json.JSONDecodeError as e:
@@ -191,7 +226,7 @@ class EnhancedSessionMyntraSpider(scrapy.Spider):
         """Get headers for API requests with session context"""
         return {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-            "Referer": f"https://www.myntra.com/{self.category}",
+            "Referer": f"{self.base_url}/{self.category}",
             "x-myntra-app": f"deviceID={self.device_id};customerID=;reqChannel=web;appFamily=MyntraRetailWeb;",
             "x-location-context": "pincode=400018;source=IP",
         }
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Product Matching for Myntra crawls
+Groups near-duplicate products (same item under several URLs, categories or
+sites) from the catalog index or crawl output files using MinHash LSH
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+from myntra_crawler.catalog_index import CatalogIndex, stored_record
+from myntra_crawler.matching import THRESHOLD, NearDuplicateIndex
+
+DEFAULT_INDEX = "data/catalog_index.sqlite"
+DEFAULT_OUTPUT = "data/product_groups.json"
+BATCH_SIZE = 10000
+
+
+def iter_file_records(paths):
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            items = json.load(f)
+        for item in items:
+            try:
+                yield stored_record(item)
+            except (ValueError, TypeError):
+                continue
+
+
+def match(records, threshold):
+    """Add records to a fresh index in batches and return it"""
+    index = NearDuplicateIndex(threshold=threshold)
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == BATCH_SIZE:
+            index.add_many(batch)
+            batch = []
+    if batch:
+        index.add_many(batch)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Group near-duplicate Myntra products")
+    parser.add_argument(
+        "files", nargs="*", help="Crawl output files (default: the catalog index)"
+    )
+    parser.add_argument("--index", default=DEFAULT_INDEX, help="Catalog index file")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Groups JSON file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help=f"Estimated Jaccard similarity to merge (default: {THRESHOLD})",
+    )
+    parser.add_argument("--show", type=int, default=5, help="Largest groups to print")
+    args = parser.parse_args()
+
+    started = time.time()
+    if args.files:
+        index = match(iter_file_records(args.files), args.threshold)
+    else:
+        if not os.path.exists(args.index):
+            print(f"❌ No catalog index at {args.index}, run `catalog_search.py build` first")
+            return 1
+        catalog = CatalogIndex(args.index)
+        index = match(catalog.iter_records(), args.threshold)
+        catalog.close()
+
+    groups = index.groups()
+    duplicates = sum(len(members) - 1 for members in groups.values())
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(groups, f, indent=2)
+
+    print(
+        f"🧩 {len(index)} products, {len(groups)} groups, {duplicates} near duplicates "
+        f"({time.time() - started:.1f}s) → {args.output}"
+    )
+    for canonical, members in sorted(groups.items(), key=lambda pair: -len(pair[1]))[: args.show]:
+        print(f"   {canonical:<14} {len(members):>4}  {', '.join(members[:6])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Myntra site used for end-to-end load testing
+Serves the search gateway, category listings, product detail pages and session
+cookies from a deterministic synthetic catalog, with configurable latency and
+error injection. Point the crawlers at it with `run_crawler.py --base-url`.
+"""
+
+import re
+import sys
+import json
+import math
+import time
+import uuid
+import random
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from benchmarks.make_fixtures import (
+    make_category_page,
+    make_product,
+    make_product_page,
+)
+from myntra_crawler.partitions import parse_filter_params
+
+DEFAULT_CATEGORIES = [
+    "men-clothing",
+    "women-clothing",
+    "men-footwear",
+    "women-footwear",
+    "men-accessories",
+    "women-accessories",
+]
+
+SESSION_COOKIE = "at"
+
+
+def parse_latency(spec):
+    """Build a latency sampler (seconds) from fixed:MS, uniform:LO,HI, normal:MEAN,SD or lognormal:MEDIAN,SIGMA"""
+    if not spec or spec == "none":
+        return lambda rng: 0.0
+
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v]
+
+    if kind == "fixed":
+        return lambda rng: values[0] / 1000
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1])) / 1000
+    if kind == "lognormal":
+        # Median in ms, sigma of the underlying normal is dimensionless
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1]) / 1000
+
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class Catalog:
+    """Deterministic synthetic catalog; products are generated on demand, never stored"""
+
+    def __init__(self, categories, size, seed=42):
+        self.categories = categories
+        self.size = size
+        self.seed = seed
+
+    def product_id(self, category, index):
+        return 10000000 + self.categories.index(category) * 100000000 + index
+
+    def product(self, product_id):
+        rng = random.Random(self.seed * 1000003 + product_id)
+        category = self.categories[(product_id - 10000000) // 100000000 % len(self.categories)]
+        gender = "Women" if category.startswith("women") else "Men"
+        return make_product(rng, product_id, gender=gender)
+
+    def page(self, category, offset, rows):
+        end = min(offset + rows, self.size)
+        return [
+            self.product(self.product_id(category, index))
+            for index in range(max(offset, 0), end)
+        ]
+
+
+class FacetIndex:
+    """Brand and price of every product per category, for filtered searches
+
+    Built on the first filtered search of a category, which generates the whole
+    category once.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.attributes = {}
+        self.lock = threading.Lock()
+
+    def category(self, category):
+        with self.lock:
+            if category not in self.attributes:
+                rows = []
+                for index in range(self.catalog.size):
+                    product = self.catalog.product(self.catalog.product_id(category, index))
+                    rows.append((product["brand"], product["price"]))
+                self.attributes[category] = rows
+            return self.attributes[category]
+
+    def search(self, category, filters):
+        """Indexes of matching products plus brand counts and price range over them"""
+        brand = filters.get("brand")
+        low, high = filters.get("price") or (None, None)
+        matches = []
+        brands = Counter()
+        prices = []
+        for index, (product_brand, price) in enumerate(self.category(category)):
+            if low is not None and not low <= price <= high:
+                continue
+            brands[product_brand] += 1
+            prices.append(price)
+            if brand is None or product_brand == brand:
+                matches.append(index)
+        facets = {
+            "primaryFilters": [
+                {
+                    "id": "Brand",
+                    "filterValues": [
+                        {"id": name, "value": name, "count": count}
+                        for name, count in sorted(brands.items())
+                    ],
+                }
+            ],
+            "rangeFilters": [
+                {"id": "Price", "filterValues": [{"start": min(prices), "end": max(prices)}]}
+            ]
+            if prices
+            else [],
+        }
+        return matches, facets
+
+
+class GatewayState:
+    """Shared server configuration, sessions and counters"""
+
+    def __init__(self, args):
+        self.catalog = Catalog(args.categories, args.catalog_size, args.seed)
+        self.latency = parse_latency(args.latency)
+        self.error_401 = args.error_401
+        self.error_429 = args.error_429
+        self.error_5xx = args.error_5xx
+        self.require_session = args.require_session
+        self.session_ttl = args.session_ttl
+        self.max_rows = args.max_rows
+        self.page_size = args.page_size
+        self.facets = FacetIndex(self.catalog) if args.facets else None
+        self.sessions = {}
+        self.counters = Counter()
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    def count(self, key):
+        with self.lock:
+            self.counters[key] += 1
+
+    def new_session(self):
+        token = uuid.uuid4().hex
+        with self.lock:
+            self.sessions[token] = time.time()
+        return token
+
+    def session_valid(self, token):
+        with self.lock:
+            created = self.sessions.get(token)
+        if created is None:
+            return False
+        return not self.session_ttl or time.time() - created < self.session_ttl
+
+
+class GatewayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MockGateway/1.0"
+    state = None  # Set by serve()
+
+    search_path = re.compile(r"^/gateway/v2/search/([\w-]+)$")
+    product_path = re.compile(r"^/(?:buy/[^/]+|product)/(\d+)(?:/buy)?$")
+
+    def do_GET(self):
+        state = self.state
+        rng = random.Random()
+        parsed = urlparse(self.path)
+        params = parse_qs(parsed.query)
+        path = parsed.path.rstrip("/") or "/"
+
+        time.sleep(state.latency(rng))
+
+        if path == "/stats":
+            return self.send_json(200, self.stats())
+
+        # Fault injection applies to every site route
+        roll = rng.random()
+        if roll < state.error_5xx:
+            state.count("status_5xx")
+            return self.send_json(rng.choice([500, 502, 503, 504]), {"error": "upstream"})
+        roll -= state.error_5xx
+        if roll < state.error_429:
+            state.count("status_429")
+            return self.send_json(
+                429, {"error": "Too Many Requests"}, {"Retry-After": "1"}
+            )
+        roll -= state.error_429
+        if roll < state.error_401:
+            state.count("status_401")
+            return self.send_json(401, {"error": "Unauthorized"})
+
+        match = self.search_path.match(path)
+        if match:
+            return self.serve_search(match.group(1), params)
+
+        match = self.product_path.match(path)
+        if match:
+            return self.serve_product(int(match.group(1)))
+
+        if path == "/":
+            state.count("home")
+            return self.send_html(
+                200, "<html><body><h1>Myntra (mock)</h1></body></html>", session=True
+            )
+
+        category = path.lstrip("/")
+        if category in state.catalog.categories:
+            return self.serve_category(category, params)
+
+        state.count("status_404")
+        return self.send_json(404, {"error": "Not Found"})
+
+    def serve_search(self, category, params):
+        state = self.state
+        if category not in state.catalog.categories:
+            state.count("status_404")
+            return self.send_json(404, {"error": "Unknown category"})
+
+        if state.require_session:
+            token = self.cookies().get(SESSION_COOKIE)
+            if not token or not state.session_valid(token):
+                state.count("status_401")
+                return self.send_json(401, {"error": "Session expired"})
+
+        rows = min(int(params.get("rows", ["50"])[0]), state.max_rows)
+        offset = int(params.get("o", ["0"])[0])
+        state.count("search")
+
+        if state.facets is None:
+            total = state.catalog.size
+            products = state.catalog.page(category, offset, rows)
+            facets = None
+        else:
+            # Facets mirror the real API: brand counts ignore the brand filter
+            filters = parse_filter_params(params)
+            matches, facets = state.facets.search(category, filters)
+            total = len(matches)
+            products = [
+                state.catalog.product(state.catalog.product_id(category, index))
+                for index in matches[max(offset, 0) : offset + rows]
+            ]
+
+        payload = {
+            "totalCount": total,
+            "products": products,
+            "appliedParams": {"filters": [], "sortOptions": "recommended"},
+            "hasNextPage": offset + rows < total,
+        }
+        if facets:
+            payload["filters"] = facets
+        return self.send_json(200, payload)
+
+    def serve_category(self, category, params):
+        state = self.state
+        page = int(params.get("p", ["1"])[0])
+        offset = (page - 1) * state.page_size
+        products = state.catalog.page(category, offset, state.page_size)
+        state.count("category")
+
+        html = make_category_page(random.Random(page), products, category, page)
+        if offset + state.page_size >= state.catalog.size:
+            html = html.replace('aria-label="Next"', 'aria-label="Last"')
+        return self.send_html(200, html, session=True)
+
+    def serve_product(self, product_id):
+        state = self.state
+        state.count("product")
+        product = state.catalog.product(product_id)
+        return self.send_html(200, make_product_page(random.Random(product_id), product))
+
+    def cookies(self):
+        cookies = {}
+        for part in (self.headers.get("Cookie") or "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name:
+                cookies[name] = value
+        return cookies
+
+    def stats(self):
+        state = self.state
+        with state.lock:
+            counters = dict(state.counters)
+        elapsed = time.time() - state.started
+        served = sum(counters.values())
+        return {
+            "uptime_s": round(elapsed, 1),
+            "requests": served,
+            "requests_per_s": round(served / elapsed, 2) if elapsed else 0,
+            "sessions": len(state.sessions),
+            "counters": counters,
+        }
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_body(status, body, "application/json", headers)
+
+    def send_html(self, status, html, session=False):
+        headers = {}
+        if session:
+            token = self.state.new_session()
+            headers["Set-Cookie"] = f"{SESSION_COOKIE}={token}; Path=/; HttpOnly"
+        self.send_body(status, html.encode("utf-8"), "text/html; charset=utf-8", headers)
+
+    def send_body(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Per-request logging would dominate load tests
+
+
+def serve(args):
+    GatewayHandler.state = GatewayState(args)
+    server = ThreadingHTTPServer((args.host, args.port), GatewayHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Myntra stand-in for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument(
+        "--catalog-size", type=int, default=100000, help="Products per category"
+    )
+    parser.add_argument(
+        "--categories", nargs="+", default=DEFAULT_CATEGORIES, help="Category slugs"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--latency",
+        default="lognormal:40,0.5",
+        help="fixed:MS | uniform:LO,HI | normal:MEAN,SD | lognormal:MEDIAN,SIGMA | none",
+    )
+    parser.add_argument("--error-401", type=float, default=0.0, help="401 probability")
+    parser.add_argument("--error-429", type=float, default=0.0, help="429 probability")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="5xx probability")
+    parser.add_argument(
+        "--require-session",
+        action="store_true",
+        help="Answer 401 on search API calls without a session cookie",
+    )
+    parser.add_argument(
+        "--session-ttl", type=float, default=0, help="Session lifetime in seconds (0 = forever)"
+    )
+    parser.add_argument(
+        "--max-rows", type=int, default=100, help="Largest page the search API serves"
+    )
+    parser.add_argument(
+        "--page-size", type=int, default=50, help="Products per category listing page"
+    )
+    parser.add_argument(
+        "--facets",
+        action="store_true",
+        help="Serve brand/price facet counts and honor f/rf search filters",
+    )
+    args = parser.parse_args()
+
+    server = serve(args)
+    print(f"🚀 Mock gateway on http://{args.host}:{args.port}")
+    print(
+        f"📦 {len(args.categories)} categories x {args.catalog_size:,} products, latency {args.latency}"
+    )
+    print(f"📊 Live counters at http://{args.host}:{args.port}/stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+        server.server_close()
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
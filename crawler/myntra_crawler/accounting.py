@@ -0,0 +1,210 @@
+import json
+import os
+import subprocess
+import time
+from collections import defaultdict
+
+COUNTERS = ("requests", "retries", "failures", "wire_bytes", "decoded_bytes", "download_seconds", "items")
+
+
+def current_release():
+    """Short git revision of the checkout, or "unknown" outside a git tree"""
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+    return output.stdout.strip() or "unknown"
+
+
+def ratio(numerator, denominator):
+    return round(numerator / denominator, 3) if denominator else None
+
+
+def efficiency(totals, new_items):
+    """Items per request, bytes per item and cost per new item for one set of counters"""
+    return {
+        "items_per_request": ratio(totals["items"], totals["requests"]),
+        "wire_bytes_per_item": ratio(totals["wire_bytes"], totals["items"]),
+        "decoded_bytes_per_item": ratio(totals["decoded_bytes"], totals["items"]),
+        "requests_per_new_item": ratio(totals["requests"], new_items),
+        "wire_bytes_per_new_item": ratio(totals["wire_bytes"], new_items),
+    }
+
+
+class CostLedger:
+    """What a crawl spent, per category and request type
+
+    Request types are tracing hop names (the callback, or meta["step"]), so the
+    HTML spider's category pages and product pages and the API spider's session
+    warm-ups and search pages are accounted separately. Wire bytes are counted
+    as received, before decompression; decoded bytes are the body size the
+    spider parsed. is_known(product_id) tells whether an earlier run scraped a
+    product; it is asked once per product, when the run first scrapes it.
+    """
+
+    def __init__(self, is_known=None, clock=time.monotonic):
+        self.clock = clock
+        self.is_known = is_known or (lambda product_id: False)
+        self.costs = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+        self.spans = {}
+        self.known = {}  # product id -> whether an earlier run had scraped it
+        self.new_ids = defaultdict(set)
+        self.started = clock()
+
+    def add(self, category, hop, counter, amount=1):
+        self.costs[(category, hop)][counter] += amount
+
+    def touch(self, category):
+        """Extend the category's wall-time span to now"""
+        now = self.clock()
+        first, _ = self.spans.get(category, (now, now))
+        self.spans[category] = (first, now)
+
+    def item(self, category, hop, product_id=None):
+        self.add(category, hop, "items")
+        self.touch(category)
+        if product_id:
+            product_id = str(product_id)
+            if product_id not in self.known:
+                self.known[product_id] = self.is_known(product_id)
+            if not self.known[product_id]:
+                self.new_ids[category].add(product_id)
+
+    def new_items(self, category=None):
+        """Distinct products of this run that an earlier run had not scraped"""
+        if category is not None:
+            return len(self.new_ids.get(category, ()))
+        return len(set().union(*self.new_ids.values()))
+
+    def totals(self, category=None):
+        totals = dict.fromkeys(COUNTERS, 0)
+        for (name, _), counters in self.costs.items():
+            if category is None or name == category:
+                for counter, value in counters.items():
+                    totals[counter] += value
+        return totals
+
+    def report(self):
+        """JSON-ready breakdown: per category and hop, per category, and for the run"""
+        rows = []
+        for (category, hop), counters in sorted(self.costs.items()):
+            rows.append(
+                {
+                    "category": category,
+                    "hop": hop,
+                    **counters,
+                    "download_seconds": round(counters["download_seconds"], 3),
+                }
+            )
+
+        categories = {}
+        for category in sorted({name for name, _ in self.costs}):
+            totals = self.totals(category)
+            totals["download_seconds"] = round(totals["download_seconds"], 3)
+            new_items = self.new_items(category)
+            first, last = self.spans.get(category, (0, 0))
+            categories[category] = {
+                **totals,
+                "new_items": new_items,
+                "wall_seconds": round(last - first, 3),
+                **efficiency(totals, new_items),
+            }
+
+        totals = self.totals()
+        totals["download_seconds"] = round(totals["download_seconds"], 3)
+        new_items = self.new_items()
+        return {
+            "wall_seconds": round(self.clock() - self.started, 3),
+            "totals": {**totals, "new_items": new_items, **efficiency(totals, new_items)},
+            "categories": categories,
+            "hops": rows,
+            # Kept so the workers of one run can be merged without counting a product twice
+            "new_ids": {category: sorted(ids) for category, ids in sorted(self.new_ids.items())},
+        }
+
+
+def append_run(path, record):
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def load_runs(path):
+    """Run records from a cost log, oldest first"""
+    runs = []
+    if not os.path.exists(path):
+        return runs
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                runs.append(json.loads(line))
+    return runs
+
+
+def merge_runs(records):
+    """Combine the records of one run (e.g. one per parallel worker) into one"""
+    if len(records) == 1:
+        return records[0]
+
+    def summed(parts, new_ids=None):
+        totals = dict.fromkeys(COUNTERS + ("new_items",), 0)
+        for part in parts:
+            for counter in totals:
+                totals[counter] += part.get(counter, 0)
+        if new_ids is not None:
+            # Workers sharing products each count them as new; count them once
+            totals["new_items"] = len(new_ids)
+        return {**totals, **efficiency(totals, totals["new_items"])}
+
+    # Records written before new ids were kept can only be summed
+    dedup = all("new_ids" in record for record in records)
+    categories = defaultdict(list)
+    new_ids = defaultdict(set)
+    hops = {}
+    for record in records:
+        for name, values in record["categories"].items():
+            categories[name].append(values)
+        for name, ids in record.get("new_ids", {}).items():
+            new_ids[name].update(ids)
+        for row in record["hops"]:
+            key = (row["category"], row["hop"])
+            merged = hops.setdefault(key, {"category": row["category"], "hop": row["hop"], **dict.fromkeys(COUNTERS, 0)})
+            for counter in COUNTERS:
+                merged[counter] += row.get(counter, 0)
+
+    first = records[0]
+    return {
+        **first,
+        "worker_id": None,
+        "workers": len(records),
+        "started_at": min(r["started_at"] for r in records),
+        "finished_at": max(r["finished_at"] for r in records),
+        "wall_seconds": max(r["wall_seconds"] for r in records),
+        "totals": summed(
+            (r["totals"] for r in records), set().union(*new_ids.values()) if dedup else None
+        ),
+        "categories": {
+            name: summed(parts, new_ids[name] if dedup else None)
+            for name, parts in sorted(categories.items())
+        },
+        "hops": [hops[key] for key in sorted(hops)],
+        "new_ids": {name: sorted(ids) for name, ids in sorted(new_ids.items())},
+    }
+
+
+def group_runs(records):
+    """Merged run records in the order their runs started"""
+    runs = defaultdict(list)
+    for record in records:
+        runs[(record.get("run_id"), record.get("spider"))].append(record)
+    merged = [merge_runs(parts) for parts in runs.values()]
+    return sorted(merged, key=lambda r: r["started_at"])
@@ -0,0 +1,254 @@
+import json
+import os
+import sqlite3
+import time
+from array import array
+from bisect import bisect_left
+import numpy as np
+from myntra_crawler.catalog_index import effective_price, facet_key
+
+NO_LIMIT = 2**62  # Threshold of rules without a max_price
+FLUSH_EVERY = 5000  # Matched alerts buffered between writes to the outbox
+
+
+def rule_key(rule):
+    """Bucket of a rule: (brand, category, size), None where the rule doesn't filter"""
+    brand, category, size = rule.get("brand"), rule.get("category"), rule.get("size")
+    return (
+        facet_key(brand) if brand else None,
+        facet_key(category) if category else None,
+        facet_key(size) if size else None,
+    )
+
+
+def load_rules(path):
+    """Watch rules from a JSONL file, one object per line
+
+    {"rule_id": "r1", "user_id": "u1", "brand": "Nike", "size": "M", "max_price": 1500}
+    brand, category and size are optional filters; max_price is in rupees.
+    """
+    rules = []
+    if not os.path.exists(path):
+        return rules
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                rules.append(json.loads(line))
+    return rules
+
+
+class AlertIndex:
+    """Watch rules indexed so a product is checked against candidate rules only
+
+    Rules are hashed into buckets by their (brand, category, size) filters, a
+    filter the rule leaves open being None. Each bucket keeps its rules sorted
+    by price threshold in compact arrays. A product looks up the buckets its
+    brand, category and sizes can match (with and without each filter, at most
+    4 x (sizes + 1) hash lookups) and bisects each for the rules whose
+    threshold its price is within.
+    """
+
+    def __init__(self, rules=()):
+        self.rule_ids = []
+        self.user_ids = []
+        bucket_ids = {}
+        buckets = array("l")
+        thresholds = array("q")
+        for rule in rules:
+            key = rule_key(rule)
+            bucket = bucket_ids.get(key)
+            if bucket is None:
+                bucket = bucket_ids[key] = len(bucket_ids)
+            max_price = rule.get("max_price")
+            buckets.append(bucket)
+            thresholds.append(NO_LIMIT if max_price in (None, "") else int(round(float(max_price) * 100)))
+            self.rule_ids.append(str(rule["rule_id"]))
+            self.user_ids.append(rule.get("user_id"))
+
+        # One sort of all rules by (bucket, threshold), then a slice per bucket
+        buckets = np.frombuffer(buckets, dtype=np.int_)
+        thresholds = np.frombuffer(thresholds, dtype=np.int64)
+        order = np.lexsort((thresholds, buckets))
+        bounds = np.searchsorted(buckets[order], np.arange(len(bucket_ids) + 1))
+        self.buckets = {}
+        for key, bucket in bucket_ids.items():
+            rules_in_bucket = order[bounds[bucket] : bounds[bucket + 1]]
+            self.buckets[key] = (
+                array("q", thresholds[rules_in_bucket].tobytes()),
+                array("l", rules_in_bucket.astype(np.int_).tobytes()),
+            )
+        self.brand_keys = {key[0] for key in self.buckets}
+        self.category_keys = {key[1] for key in self.buckets}
+
+    def __len__(self):
+        return len(self.rule_ids)
+
+    def match(self, brand, category, sizes, price):
+        """Indexes of the rules a product satisfies"""
+        if price is None:
+            return []
+        brands = [None]
+        if brand and facet_key(brand) in self.brand_keys:
+            brands.append(facet_key(brand))
+        categories = [None]
+        if category and facet_key(category) in self.category_keys:
+            categories.append(facet_key(category))
+        size_keys = [None] + [facet_key(size) for size in sizes or ()]
+
+        matched = []
+        for brand_key in brands:
+            for category_key in categories:
+                for size_key in size_keys:
+                    bucket = self.buckets.get((brand_key, category_key, size_key))
+                    if bucket is not None:
+                        thresholds, rules = bucket
+                        matched.extend(rules[bisect_left(thresholds, price) :])
+        return matched
+
+    def match_record(self, record):
+        """Rules matched by a ProductRecord at the price the shopper pays (not the MRP)"""
+        return self.match(record.brand, record.category, record.sizes, effective_price(record))
+
+
+class AlertOutbox:
+    """Local SQLite outbox of matched alerts, read by the notification sender
+
+    One row per (rule, product), plus the product's details once. A product
+    matching a rule again is only re-queued when its price fell below the
+    price already alerted.
+    """
+
+    def __init__(self, path, timeout=30):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS alerts (
+                rule_id TEXT NOT NULL,
+                user_id TEXT,
+                product_id TEXT NOT NULL,
+                price INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                delivered_at REAL,
+                PRIMARY KEY (rule_id, product_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS alerts_pending ON alerts (delivered_at, created_at);
+            CREATE TABLE IF NOT EXISTS products (
+                product_id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL
+            );
+            """
+        )
+        self.pending = []
+        self.products = {}
+        self.queued = 0
+
+    def add(self, rules, product_id, price, payload):
+        """Queue alerts for one product: rules is a list of (rule_id, user_id)"""
+        now = time.time()
+        self.pending.extend((rule_id, user_id, product_id, price, now) for rule_id, user_id in rules)
+        self.products[product_id] = payload
+        if len(self.pending) >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                """
+                INSERT INTO alerts (rule_id, user_id, product_id, price, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (rule_id, product_id) DO UPDATE SET
+                    price = excluded.price,
+                    created_at = excluded.created_at,
+                    delivered_at = NULL
+                WHERE excluded.price < alerts.price
+                """,
+                self.pending,
+            )
+            self.queued += self.conn.total_changes - before
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO products (product_id, payload) VALUES (?, ?)",
+                self.products.items(),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.pending.clear()
+        self.products.clear()
+
+    def undelivered(self, limit=100):
+        rows = self.conn.execute(
+            "SELECT rule_id, user_id, product_id, price, payload, created_at "
+            "FROM alerts JOIN products USING (product_id) "
+            "WHERE delivered_at IS NULL ORDER BY created_at LIMIT ?",
+            (limit,),
+        )
+        return [
+            {
+                "rule_id": rule_id,
+                "user_id": user_id,
+                "product_id": product_id,
+                "price": price,
+                "product": json.loads(payload),
+                "created_at": created_at,
+            }
+            for rule_id, user_id, product_id, price, payload, created_at in rows
+        ]
+
+    def mark_delivered(self, keys):
+        """Acknowledge (rule_id, product_id) pairs as sent"""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        self.conn.executemany(
+            "UPDATE alerts SET delivered_at = ? WHERE rule_id = ? AND product_id = ?",
+            [(now, rule_id, product_id) for rule_id, product_id in keys],
+        )
+        self.conn.execute("COMMIT")
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+class AlertEngine:
+    """Matches products against an AlertIndex and queues alerts in an AlertOutbox"""
+
+    def __init__(self, index, outbox):
+        self.index = index
+        self.outbox = outbox
+        self.matched = 0
+
+    def process(self, record):
+        """Queue alerts for a ProductRecord; returns the number of rules matched"""
+        rules = self.index.match_record(record)
+        if not rules:
+            return 0
+        price = effective_price(record)
+        payload = json.dumps(
+            {
+                "product_id": record.product_id,
+                "name": record.name,
+                "brand": record.brand,
+                "category": record.category,
+                "sizes": list(record.sizes),
+                "price": price,
+                "product_url": record.product_url,
+            },
+            ensure_ascii=False,
+        )
+        self.outbox.add(
+            [(self.index.rule_ids[rule], self.index.user_ids[rule]) for rule in rules],
+            record.product_id,
+            price,
+            payload,
+        )
+        self.matched += len(rules)
+        return len(rules)
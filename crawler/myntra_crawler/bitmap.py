@@ -0,0 +1,143 @@
+CHUNK_BITS = 12
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+
+class Bitmap:
+    """Compressed set of document ids
+
+    Ids are split into 4096-id chunks, each stored as a Python int used as a
+    bitset. Only chunks holding at least one id exist, so sparse postings stay
+    small while AND/OR over dense facets run at C speed chunk by chunk.
+    """
+
+    __slots__ = ("chunks",)
+
+    def __init__(self, chunks=None):
+        self.chunks = chunks if chunks is not None else {}
+
+    @classmethod
+    def from_ids(cls, ids):
+        bitmap = cls()
+        for doc in ids:
+            bitmap.add(doc)
+        return bitmap
+
+    @classmethod
+    def from_packed(cls, data):
+        """Bitmap of the set bits of little-endian packed bytes, bit i being doc i"""
+        size = 1 << CHUNK_BITS >> 3
+        chunks = {}
+        for key, start in enumerate(range(0, len(data), size)):
+            bits = int.from_bytes(data[start : start + size], "little")
+            if bits:
+                chunks[key] = bits
+        return cls(chunks)
+
+    def to_packed(self):
+        """Inverse of from_packed, up to the last chunk holding an id"""
+        if not self.chunks:
+            return b""
+        size = 1 << CHUNK_BITS >> 3
+        empty = bytes(size)
+        return b"".join(
+            self.chunks[key].to_bytes(size, "little") if key in self.chunks else empty
+            for key in range(max(self.chunks) + 1)
+        )
+
+    def add(self, doc):
+        key = doc >> CHUNK_BITS
+        self.chunks[key] = self.chunks.get(key, 0) | (1 << (doc & CHUNK_MASK))
+        return key
+
+    def discard(self, doc):
+        key = doc >> CHUNK_BITS
+        bits = self.chunks.get(key, 0) & ~(1 << (doc & CHUNK_MASK))
+        if bits:
+            self.chunks[key] = bits
+        else:
+            self.chunks.pop(key, None)
+        return key
+
+    def __contains__(self, doc):
+        return bool(self.chunks.get(doc >> CHUNK_BITS, 0) >> (doc & CHUNK_MASK) & 1)
+
+    def __len__(self):
+        return sum(bits.bit_count() for bits in self.chunks.values())
+
+    def __bool__(self):
+        return bool(self.chunks)
+
+    def __and__(self, other):
+        small, large = self.chunks, other.chunks
+        if len(small) > len(large):
+            small, large = large, small
+        chunks = {}
+        for key, bits in small.items():
+            common = bits & large.get(key, 0)
+            if common:
+                chunks[key] = common
+        return Bitmap(chunks)
+
+    def __or__(self, other):
+        chunks = dict(self.chunks)
+        for key, bits in other.chunks.items():
+            chunks[key] = chunks.get(key, 0) | bits
+        return Bitmap(chunks)
+
+    def __sub__(self, other):
+        chunks = {}
+        for key, bits in self.chunks.items():
+            left = bits & ~other.chunks.get(key, 0)
+            if left:
+                chunks[key] = left
+        return Bitmap(chunks)
+
+    def __iter__(self):
+        for key in sorted(self.chunks):
+            base = key << CHUNK_BITS
+            bits = self.chunks[key]
+            while bits:
+                low = bits & -bits
+                yield base + low.bit_length() - 1
+                bits ^= low
+
+    def __reversed__(self):
+        for key in sorted(self.chunks, reverse=True):
+            base = key << CHUNK_BITS
+            bits = self.chunks[key]
+            while bits:
+                high = bits.bit_length() - 1
+                yield base + high
+                bits ^= 1 << high
+
+    def __repr__(self):
+        return f"Bitmap({len(self)} ids in {len(self.chunks)} chunks)"
+
+    @staticmethod
+    def intersect(bitmaps):
+        """AND of several bitmaps, smallest first so the work shrinks quickly"""
+        bitmaps = sorted(bitmaps, key=lambda b: len(b.chunks))
+        if not bitmaps:
+            return None
+        result = bitmaps[0]
+        for bitmap in bitmaps[1:]:
+            if not result:
+                break
+            result = result & bitmap
+        return result
+
+    @staticmethod
+    def union(bitmaps):
+        chunks = {}
+        for bitmap in bitmaps:
+            for key, bits in bitmap.chunks.items():
+                chunks[key] = chunks.get(key, 0) | bits
+        return Bitmap(chunks)
+
+    @staticmethod
+    def chunk_to_bytes(bits):
+        return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+    @staticmethod
+    def chunk_from_bytes(data):
+        return int.from_bytes(data, "little")
@@ -0,0 +1,386 @@
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+from myntra_crawler.catalog_index import CatalogIndex
+from myntra_crawler.pricehistory import PriceHistory
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_CACHE_SIZE = 100000  # Encoded products kept in memory
+QUERY_CACHE_SIZE = 10000  # Result pages of list queries
+RELOAD_SECONDS = 5.0  # Shortest time between two reloads of the catalog
+MAX_LIMIT = 10000  # Largest page a list endpoint serves
+STREAM_BATCH = 200  # Products read from SQLite and written per chunk
+FILTERS = ("brand", "category", "size", "color")
+
+
+class LRUCache:
+    """Thread-safe least-recently-used mapping with a fixed number of entries"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class CatalogSnapshot:
+    """Facet bitmaps of the catalog index and recent price changes, as loaded at one point
+
+    Documents themselves are read from SQLite on demand. The snapshot is never
+    modified, so request threads share it without locking; a reload builds a
+    new one and swaps it in.
+    """
+
+    def __init__(self, index_path, history_path=None):
+        self.loaded_at = time.time()
+        self.generation = f"{time.time_ns():x}"
+        index = CatalogIndex(index_path)
+        index.close()  # Only the in-memory postings are used
+        self.index = index
+
+        # Products by time of their last price or rating change, newest first
+        self.changed_ids = []
+        self.changed_at = np.zeros(0)
+        if history_path and os.path.exists(os.path.join(history_path, "manifest.json")):
+            history = PriceHistory(history_path)
+            order = np.argsort(-history.latest["changed"], kind="stable")
+            self.changed_at = history.latest["changed"][order]
+            self.changed_ids = [history.ids[i] for i in order]
+
+    def __len__(self):
+        return len(self.index)
+
+    def changed_since(self, since, limit):
+        count = int(np.searchsorted(-self.changed_at, -since, side="right"))
+        count = min(count, limit)
+        return self.changed_ids[:count], self.changed_at[:count].tolist()
+
+
+class CatalogStore:
+    """Read access to the local catalog for the API, through LRU caches
+
+    Products are encoded once and cached by (generation, product id); result
+    pages of list queries are cached by (generation, query). A watcher thread
+    notices commits to the catalog index (PRAGMA data_version) and saves of
+    the price history, and loads a new snapshot with a new generation, at
+    most every reload_seconds. Entries of older generations are never hit
+    again and age out of the caches.
+    """
+
+    def __init__(self, index_path, history_path=None, product_cache=PRODUCT_CACHE_SIZE,
+                 query_cache=QUERY_CACHE_SIZE, reload_seconds=RELOAD_SECONDS):
+        self.index_path = index_path
+        self.history_path = history_path
+        self.reload_seconds = reload_seconds
+        self.products = LRUCache(product_cache)
+        self.queries = LRUCache(query_cache)
+        self.local = threading.local()
+        self.snapshot = CatalogSnapshot(index_path, history_path)
+        self.reloads = 0
+        self.stopped = threading.Event()
+        self.watcher = None
+
+    def connection(self):
+        """Read-only SQLite connection of the calling thread"""
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True)
+            self.local.conn = conn
+        return conn
+
+    def history_mtime(self):
+        if not self.history_path:
+            return None
+        path = os.path.join(self.history_path, "latest.npy")
+        return os.path.getmtime(path) if os.path.exists(path) else None
+
+    def watch(self):
+        """Start the thread reloading the snapshot when new crawl results land"""
+        self.watcher = threading.Thread(target=self._watch, name="catalog-watcher", daemon=True)
+        self.watcher.start()
+
+    def _watch(self):
+        conn = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True)
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        history = self.history_mtime()
+        while not self.stopped.wait(min(1.0, self.reload_seconds)):
+            if time.time() - self.snapshot.loaded_at < self.reload_seconds:
+                continue
+            current = conn.execute("PRAGMA data_version").fetchone()[0]
+            current_history = self.history_mtime()
+            if current == version and current_history == history:
+                continue
+            version, history = current, current_history
+            try:
+                started = time.time()
+                self.snapshot = CatalogSnapshot(self.index_path, self.history_path)
+                self.reloads += 1
+                logger.info(
+                    f"🔄 Catalog reloaded: {len(self.snapshot)} products in {time.time() - started:.1f}s"
+                )
+            except Exception:
+                logger.exception("Catalog reload failed, serving the previous snapshot")
+        conn.close()
+
+    def stop(self):
+        self.stopped.set()
+
+    def product_bytes(self, product_ids, generation):
+        """{product_id: encoded JSON} for the stored products among product_ids"""
+        found = {}
+        missing = []
+        for product_id in product_ids:
+            body = self.products.get((generation, product_id))
+            if body is None:
+                missing.append(product_id)
+            else:
+                found[product_id] = body
+        conn = self.connection()
+        for start in range(0, len(missing), 500):
+            chunk = missing[start : start + 500]
+            rows = conn.execute(
+                f"SELECT product_id, data FROM docs WHERE product_id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for product_id, data in rows:
+                body = data.encode("utf-8")
+                self.products.put((generation, product_id), body)
+                found[product_id] = body
+        return found
+
+    def product(self, product_id):
+        """(encoded product, generation) or (None, generation)"""
+        snapshot = self.snapshot
+        body = self.product_bytes([product_id], snapshot.generation).get(product_id)
+        return body, snapshot.generation
+
+    def search(self, limit, offset, sort=None, **filters):
+        """(generation, total, product ids) of one page of products matching the filters"""
+        snapshot = self.snapshot
+        key = (snapshot.generation, "search", limit, offset, sort, tuple(sorted(filters.items())))
+        cached = self.queries.get(key)
+        if cached is None:
+            result = snapshot.index.search(limit=limit, offset=offset, sort=sort, **filters)
+            cached = (snapshot.generation, result.total, result.product_ids)
+            self.queries.put(key, cached)
+        return cached
+
+    def changes(self, since, limit):
+        """(generation, product ids, change times) of products changed since a timestamp"""
+        snapshot = self.snapshot
+        key = (snapshot.generation, "changes", int(since), limit)
+        cached = self.queries.get(key)
+        if cached is None:
+            product_ids, times = snapshot.changed_since(int(since), limit)
+            cached = (snapshot.generation, product_ids, times)
+            self.queries.put(key, cached)
+        return cached
+
+    def stats(self):
+        snapshot = self.snapshot
+        return {
+            "products": len(snapshot),
+            "changes_tracked": len(snapshot.changed_ids),
+            "generation": snapshot.generation,
+            "loaded_at": round(snapshot.loaded_at, 3),
+            "reloads": self.reloads,
+            "product_cache": {"entries": len(self.products), "hits": self.products.hits, "misses": self.products.misses},
+            "query_cache": {"entries": len(self.queries), "hits": self.queries.hits, "misses": self.queries.misses},
+        }
+
+
+def etag(*parts):
+    digest = blake2b("\x1f".join(str(part) for part in parts).encode("utf-8"), digest_size=8)
+    return f'"{digest.hexdigest()}"'
+
+
+class CatalogAPIHandler(BaseHTTPRequestHandler):
+    """GET /products/<id>, /products?brand=&category=..., /changes?minutes=, /stats"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "MyntraCatalogAPI/1.0"
+    # Headers and body are separate writes; with Nagle's algorithm the body
+    # waits for the client's delayed ACK (~40 ms) on keep-alive connections
+    disable_nagle_algorithm = True
+    store = None  # Set by make_server()
+
+    product_path = re.compile(r"^/products/([^/]+)$")
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = {name: values[-1] for name, values in parse_qs(parsed.query).items()}
+        path = parsed.path.rstrip("/") or "/"
+        try:
+            match = self.product_path.match(path)
+            if match:
+                return self.serve_product(match.group(1))
+            if path == "/products":
+                return self.serve_search(params)
+            if path == "/changes":
+                return self.serve_changes(params)
+            if path == "/stats":
+                return self.send_body(200, json.dumps(self.store.stats()).encode("utf-8"))
+            return self.send_error_json(404, "Not Found")
+        except (ValueError, OverflowError) as e:
+            return self.send_error_json(400, str(e))
+
+    def serve_product(self, product_id):
+        body, _ = self.store.product(product_id)
+        if body is None:
+            return self.send_error_json(404, f"Unknown product {product_id}")
+        tag = etag(blake2b(body, digest_size=8).hexdigest())
+        if self.not_modified(tag):
+            return
+        self.send_body(200, body, {"ETag": tag})
+
+    def serve_search(self, params):
+        limit, offset = page_params(params)
+        sort = params.get("sort")
+        if sort not in (None, "price", "-price"):
+            raise ValueError("sort must be price or -price")
+        filters = {name: tuple(params[name].split(",")) for name in FILTERS if params.get(name)}
+        if params.get("q"):
+            filters["text"] = params["q"]
+        for name in ("price_min", "price_max"):
+            if params.get(name):
+                filters[name] = int(number_param(params, name) * 100)  # Rupees to paise
+
+        generation, total, product_ids = self.store.search(limit, offset, sort, **filters)
+        tag = etag(generation, self.path)
+        if self.not_modified(tag):
+            return
+        self.stream_products(
+            tag, generation, f'{{"total":{total},"offset":{offset},"products":[', product_ids
+        )
+
+    def serve_changes(self, params):
+        limit, _ = page_params(params)
+        minutes = number_param(params, "minutes", 60)
+        since = time.time() - minutes * 60
+        generation, product_ids, times = self.store.changes(since, limit)
+        tag = etag(generation, self.path)
+        if self.not_modified(tag):
+            return
+        changed_at = dict(zip(product_ids, times))
+        self.stream_products(
+            tag,
+            generation,
+            f'{{"count":{len(product_ids)},"since":{since:.0f},"products":[',
+            product_ids,
+            lambda product_id: f'{{"changed_at":{changed_at[product_id]:.0f},"product":'.encode("utf-8"),
+        )
+
+    def stream_products(self, tag, generation, head, product_ids, wrap=None):
+        """Send a JSON object whose product list is written in chunks as it is read"""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("ETag", tag)
+        self.end_headers()
+
+        first = True
+        self.write_chunk(head.encode("utf-8"))
+        for start in range(0, len(product_ids), STREAM_BATCH):
+            batch = product_ids[start : start + STREAM_BATCH]
+            bodies = self.store.product_bytes(batch, generation)
+            parts = []
+            for product_id in batch:
+                body = bodies.get(product_id)
+                if body is None:
+                    continue  # Known to the price history but not the catalog
+                if not first:
+                    parts.append(b",")
+                first = False
+                parts.append(wrap(product_id) + body + b"}" if wrap else body)
+            self.write_chunk(b"".join(parts))
+        self.write_chunk(b"]}")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def write_chunk(self, data):
+        if data:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    def not_modified(self, tag):
+        if tag not in (self.headers.get("If-None-Match") or ""):
+            return False
+        self.send_response(304)
+        self.send_header("ETag", tag)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        return True
+
+    def send_error_json(self, status, message):
+        self.send_body(status, json.dumps({"error": message}).encode("utf-8"))
+
+    def send_body(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Per-request logging would dominate response times
+
+
+def page_params(params):
+    limit = int(params.get("limit", 100))
+    offset = int(params.get("offset", 0))
+    if not 0 < limit <= MAX_LIMIT or offset < 0:
+        raise ValueError(f"limit must be 1-{MAX_LIMIT} and offset non-negative")
+    return limit, offset
+
+
+def number_param(params, name, default=None):
+    """A finite, non-negative number from the query string (inf or nan would overflow later)"""
+    value = float(params[name]) if params.get(name) else default
+    if not (math.isfinite(value) and value >= 0):
+        raise ValueError(f"{name} must be a finite non-negative number")
+    return value
+
+
+def make_server(store, host="127.0.0.1", port=8420):
+    handler = type("Handler", (CatalogAPIHandler,), {"store": store})
+    # The default listen backlog of 5 drops SYNs when many clients connect at once
+    server_class = type("Server", (ThreadingHTTPServer,), {"request_queue_size": 128})
+    server = server_class((host, port), handler)
+    server.daemon_threads = True
+    return server
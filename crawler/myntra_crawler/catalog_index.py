@@ -0,0 +1,402 @@
+import json
+import re
+import sqlite3
+import time
+from array import array
+import numpy as np
+from myntra_crawler.bitmap import Bitmap
+from myntra_crawler.jsonstream import iter_json_array
+from myntra_crawler.records import ProductRecord, product_record
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+TEXT_FIELDS = ("name", "brand", "description")
+FACETS = ("brand", "category", "size", "color", "price")
+
+# Price bucket edges in paise; the last bucket is open-ended
+PRICE_EDGES = (0, 50000, 100000, 200000, 300000, 500000, 1000000)
+
+# Stored with each document; raw_data is left out to keep the index small
+STORED_FIELDS = tuple(
+    name for name in ProductRecord.__dataclass_fields__ if name != "raw_data"
+)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+def facet_key(value):
+    return str(value).strip().lower()
+
+
+def effective_price(record):
+    """Price the shopper pays: the smaller of price and discount_price that is set
+
+    The spiders store the selling price in price and the MRP in discount_price,
+    as product pages label them; taking the smaller value also reads dumps that
+    have the two the other way round.
+    """
+    prices = [value for value in (record.price, record.discount_price) if value]
+    return min(prices) if prices else record.price
+
+
+def price_bucket(paise):
+    if paise is None:
+        return None
+    for low, high in zip(PRICE_EDGES, PRICE_EDGES[1:]):
+        if paise < high:
+            return f"{low // 100}-{high // 100}"
+    return f"{PRICE_EDGES[-1] // 100}+"
+
+
+def record_terms(record):
+    """(field, value) postings of a record: text tokens plus facet values"""
+    terms = set()
+    for name in TEXT_FIELDS:
+        for token in tokenize(getattr(record, name)):
+            terms.add(("text", token))
+    if record.brand:
+        terms.add(("brand", facet_key(record.brand)))
+    if record.category:
+        terms.add(("category", facet_key(record.category)))
+    for size in record.sizes:
+        terms.add(("size", facet_key(size)))
+    for color in record.colors:
+        terms.add(("color", facet_key(color)))
+    bucket = price_bucket(effective_price(record))
+    if bucket:
+        terms.add(("price", bucket))
+    return terms
+
+
+def stored_record(data):
+    """Rebuild a ProductRecord from a stored document or a crawl output entry"""
+    if data.get("product_id") in (None, ""):
+        raise ValueError("product_id is required")
+    record = ProductRecord(
+        **{name: data[name] for name in STORED_FIELDS if data.get(name) is not None}
+    )
+    record.images = tuple(record.images)
+    record.sizes = tuple(record.sizes)
+    record.colors = tuple(record.colors)
+    return record
+
+
+class SearchResult:
+    """Matching product ids for one page, total hit count and facet counts"""
+
+    def __init__(self, total, docs, product_ids, facets, elapsed_ms):
+        self.total = total
+        self.docs = docs
+        self.product_ids = product_ids
+        self.facets = facets
+        self.elapsed_ms = elapsed_ms
+
+    def __repr__(self):
+        return f"SearchResult({self.total} hits, {self.elapsed_ms:.3f} ms)"
+
+
+class CatalogIndex:
+    """Persistent inverted index and bitmap facet index over scraped products
+
+    Every product gets a dense integer doc id. Name/brand/description tokens and
+    the brand, category, size, color and price-bucket facets each map to a
+    Bitmap of doc ids, so a filtered query is a handful of chunked AND/OR
+    operations. All postings live in memory; SQLite holds the documents and the
+    changed bitmap chunks written by flush().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS docs (
+                doc INTEGER PRIMARY KEY,
+                product_id TEXT NOT NULL UNIQUE,
+                price INTEGER,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                field TEXT NOT NULL,
+                value TEXT NOT NULL,
+                chunk INTEGER NOT NULL,
+                bits BLOB NOT NULL,
+                PRIMARY KEY (field, value, chunk)
+            ) WITHOUT ROWID;
+            """
+        )
+
+        self.postings = {field: {} for field in ("text",) + FACETS}
+        self.doc_ids = {}
+        self.product_ids = []
+        self.prices = array("q")
+        self.live = Bitmap()
+        self.dirty = set()
+        self.pending_docs = {}
+        self.load()
+
+    def load(self):
+        for field, value, chunk, bits in self.conn.execute(
+            "SELECT field, value, chunk, bits FROM postings"
+        ):
+            bitmap = self.postings[field].setdefault(value, Bitmap())
+            bitmap.chunks[chunk] = Bitmap.chunk_from_bytes(bits)
+
+        for doc, product_id, price in self.conn.execute(
+            "SELECT doc, product_id, price FROM docs ORDER BY doc"
+        ):
+            self.doc_ids[product_id] = doc
+            self.product_ids.append(product_id)
+            self.set_price(doc, price)
+            self.live.add(doc)
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def set_price(self, doc, price):
+        if doc >= len(self.prices):
+            self.prices.extend([-1] * (doc + 1 - len(self.prices)))
+        self.prices[doc] = -1 if price is None else price
+
+    def add(self, item):
+        """Index a ProductItem, ProductRecord or dict, replacing any older version"""
+        record = item if isinstance(item, ProductRecord) else product_record(item)
+        data = {name: getattr(record, name) for name in STORED_FIELDS}
+
+        doc = self.doc_ids.get(record.product_id)
+        if doc is None:
+            doc = len(self.product_ids)
+            self.doc_ids[record.product_id] = doc
+            self.product_ids.append(record.product_id)
+            terms = record_terms(record)
+        else:
+            old_terms = record_terms(self.record(doc))
+            terms = record_terms(record)
+            for field, value in old_terms - terms:
+                bitmap = self.postings[field][value]
+                self.dirty.add((field, value, bitmap.discard(doc)))
+
+        postings, dirty = self.postings, self.dirty
+        for field, value in terms:
+            bitmap = postings[field].get(value)
+            if bitmap is None:
+                bitmap = postings[field][value] = Bitmap()
+            dirty.add((field, value, bitmap.add(doc)))
+
+        price = effective_price(record)
+        self.set_price(doc, price)
+        self.live.add(doc)
+        self.pending_docs[doc] = (record.product_id, price, data)
+        return doc
+
+    def flush(self):
+        """Write new documents and changed bitmap chunks in one transaction"""
+        if not self.dirty and not self.pending_docs:
+            return
+
+        rows, deleted = [], []
+        for field, value, chunk in self.dirty:
+            bits = self.postings[field].get(value, Bitmap()).chunks.get(chunk)
+            if bits:
+                rows.append((field, value, chunk, Bitmap.chunk_to_bytes(bits)))
+            else:
+                deleted.append((field, value, chunk))
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO docs (doc, product_id, price, data) VALUES (?, ?, ?, ?)",
+                [
+                    (doc, product_id, price, json.dumps(data, ensure_ascii=False))
+                    for doc, (product_id, price, data) in self.pending_docs.items()
+                ],
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO postings (field, value, chunk, bits) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self.conn.executemany(
+                "DELETE FROM postings WHERE field = ? AND value = ? AND chunk = ?",
+                deleted,
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        self.dirty.clear()
+        self.pending_docs.clear()
+
+    def record(self, doc):
+        """Stored ProductRecord for a doc id (without raw_data)"""
+        if doc in self.pending_docs:
+            return stored_record(self.pending_docs[doc][2])
+        row = self.conn.execute("SELECT data FROM docs WHERE doc = ?", (doc,)).fetchone()
+        return stored_record(json.loads(row[0])) if row else None
+
+    def get(self, product_id):
+        doc = self.doc_ids.get(str(product_id))
+        return None if doc is None else self.record(doc)
+
+    def records(self, docs):
+        return [self.record(doc) for doc in docs]
+
+    def iter_records(self):
+        """Every stored ProductRecord in doc id order"""
+        self.flush()
+        for (data,) in self.conn.execute("SELECT data FROM docs ORDER BY doc"):
+            yield stored_record(json.loads(data))
+
+    def facet_bitmap(self, field, values):
+        """OR of the postings for one or more values of a facet"""
+        if isinstance(values, str):
+            values = [values]
+        postings = self.postings[field]
+        return Bitmap.union(
+            postings[key] for key in map(facet_key, values) if key in postings
+        )
+
+    def price_bitmap(self, low, high, within):
+        """Docs priced in [low, high] paise, restricted to `within`
+
+        Every doc's price is compared at once with numpy and the matches are
+        packed straight into bitmap chunks, so the cost is the same wherever the
+        range falls relative to the price buckets.
+        """
+        prices = np.frombuffer(self.prices, dtype=np.int64)
+        matched = prices >= (0 if low is None else low)  # Unpriced docs hold -1
+        if high is not None:
+            matched &= prices <= high
+        return Bitmap.from_packed(np.packbits(matched, bitorder="little").tobytes()) & within
+
+    def match(self, text=None, brand=None, category=None, size=None, color=None,
+              price_min=None, price_max=None):
+        """Bitmap of docs matching every given condition
+
+        Text tokens are ANDed; several values for one facet are ORed. Prices are
+        in paise.
+        """
+        bitmaps = []
+        for token in set(tokenize(text)):
+            bitmaps.append(self.postings["text"].get(token, Bitmap()))
+        for field, values in (
+            ("brand", brand),
+            ("category", category),
+            ("size", size),
+            ("color", color),
+        ):
+            if values:
+                bitmaps.append(self.facet_bitmap(field, values))
+
+        result = Bitmap.intersect(bitmaps) if bitmaps else self.live
+        if price_min is not None or price_max is not None:
+            result = self.price_bitmap(price_min, price_max, result)
+        return result
+
+    def facet_counts(self, result, field, top=10):
+        """Most common values of a facet within a result bitmap"""
+        counts = []
+        for value, bitmap in self.postings[field].items():
+            count = len(result & bitmap)
+            if count:
+                counts.append((value, count))
+        counts.sort(key=lambda pair: (-pair[1], pair[0]))
+        return counts[:top]
+
+    def sorted_by_price(self, result, count, descending=False):
+        """First `count` docs of a result ordered by price
+
+        Only the `count` cheapest (or dearest) docs are fully sorted, ties in doc
+        order; unpriced products come last.
+        """
+        packed = np.frombuffer(result.to_packed(), dtype=np.uint8)
+        docs = np.flatnonzero(np.unpackbits(packed, bitorder="little").view(bool))
+        prices = np.frombuffer(self.prices, dtype=np.int64)[docs]
+        if descending:
+            keys = -prices  # Unpriced (-1) sorts after every real price
+        else:
+            keys = np.where(prices < 0, np.iinfo(np.int64).max, prices)
+        if 0 < count < len(docs):
+            top = np.argpartition(keys, count - 1)[:count]
+            docs, keys = docs[top], keys[top]
+        return docs[np.lexsort((docs, keys))][:count].tolist()
+
+    def search(self, text=None, limit=20, offset=0, sort=None, facets=(), **filters):
+        """Filtered query returning a page of product ids plus facet counts
+
+        sort is None (index order), "price" or "-price".
+        """
+        start = time.perf_counter()
+        result = self.match(text, **filters)
+
+        if sort in ("price", "-price"):
+            docs = self.sorted_by_price(result, offset + limit, sort == "-price")[offset:]
+        else:
+            docs = []
+            for position, doc in enumerate(result):
+                if position >= offset + limit:
+                    break
+                if position >= offset:
+                    docs.append(doc)
+
+        counts = {field: self.facet_counts(result, field) for field in facets}
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        return SearchResult(
+            len(result),
+            docs,
+            [self.product_ids[doc] for doc in docs],
+            counts,
+            elapsed_ms,
+        )
+
+    def stats(self):
+        return {
+            "products": len(self.doc_ids),
+            "terms": len(self.postings["text"]),
+            **{f"{field}_values": len(self.postings[field]) for field in FACETS},
+        }
+
+
+def index_file(index, path, normalize=False):
+    """Add every product of a crawl output JSON file, returning how many were indexed
+
+    Output written by the current pipelines already holds normalized records.
+    normalize=True runs older dumps of raw items through product_record instead.
+    """
+    count = 0
+    with open(path, encoding="utf-8") as f:
+        for item in iter_json_array(f):
+            try:
+                index.add(product_record(item) if normalize else stored_record(item))
+            except (ValueError, TypeError):
+                continue
+            count += 1
+    index.flush()
+    return count
+
+
+def read_records(path, product_ids):
+    """{product_id: stored ProductRecord} for some products, without loading the index"""
+    ids = [str(product_id) for product_id in product_ids]
+    records = {}
+    conn = sqlite3.connect(path)
+    try:
+        for start in range(0, len(ids), 500):
+            chunk = ids[start : start + 500]
+            rows = conn.execute(
+                f"SELECT data FROM docs WHERE product_id IN ({','.join('?' * len(chunk))})", chunk
+            )
+            for (data,) in rows:
+                record = stored_record(json.loads(data))
+                records[record.product_id] = record
+    finally:
+        conn.close()
+    return records
@@ -0,0 +1,288 @@
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from twisted.internet import defer, task
+from twisted.internet.endpoints import UNIXServerEndpoint
+from twisted.internet.protocol import Factory
+from twisted.protocols.basic import LineOnlyReceiver
+from twisted.python.failure import Failure
+from scrapy.crawler import CrawlerRunner
+from myntra_crawler.state import WarmState
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOBS = [
+    {
+        "name": "api_listing",
+        "spider": "myntra_api_products",
+        "schedule": "*/15 * * * *",
+        "kwargs": {"category": "men-clothing", "max_pages": 5},
+    },
+    {
+        "name": "pdp_nightly",
+        "spider": "myntra_products",
+        "schedule": "0 2 * * *",
+        "kwargs": {"max_pages": 5},
+    },
+]
+
+DAEMON_SETTINGS = {
+    # Keep-alive connections are pooled across runs instead of per crawler
+    "DOWNLOAD_HANDLERS": {
+        "http": "myntra_crawler.state.PersistentHTTPDownloadHandler",
+        "https": "myntra_crawler.state.PersistentHTTPDownloadHandler",
+    },
+    # Concurrent jobs would fight over one metrics port
+    "METRICS_PORT": 0,
+}
+
+
+class CronSchedule:
+    """Five-field cron expression (minute hour day-of-month month day-of-week)"""
+
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+    def __init__(self, expression):
+        self.expression = expression
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Expected 5 cron fields, got: {expression!r}")
+        self.fields = [
+            self.parse_field(field, low, high)
+            for field, (low, high) in zip(fields, self.RANGES)
+        ]
+        # As in cron, a job restricting both days runs when either one matches
+        self.either_day = not fields[2].startswith("*") and not fields[4].startswith("*")
+
+    @staticmethod
+    def parse_field(field, low, high):
+        values = set()
+        for part in field.split(","):
+            spec, _, step = part.partition("/")
+            step = int(step) if step else 1
+            if spec == "*":
+                start, end = low, high
+            elif "-" in spec:
+                start, end = (int(v) for v in spec.split("-"))
+            else:
+                start = int(spec)
+                end = high if step > 1 else start
+            if start < low or end > high:
+                raise ValueError(f"Cron field {field!r} outside {low}-{high}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def matches(self, when):
+        minute, hour, day, month, weekday = self.fields
+        day_matches = when.day in day
+        weekday_matches = (when.weekday() + 1) % 7 in weekday  # cron counts Sunday as 0
+        return (
+            when.minute in minute
+            and when.hour in hour
+            and when.month in month
+            and (
+                day_matches or weekday_matches
+                if self.either_day
+                else day_matches and weekday_matches
+            )
+        )
+
+    def next_after(self, when):
+        """First matching minute strictly after `when`"""
+        candidate = when.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(366 * 24 * 60):
+            if self.matches(candidate):
+                return candidate
+            candidate += timedelta(minutes=1)
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+
+class Job:
+    """A named spider run with its schedule and run history"""
+
+    def __init__(self, name, spider, schedule, kwargs=None, settings=None):
+        self.name = name
+        self.spider = spider
+        self.schedule = CronSchedule(schedule)
+        self.kwargs = kwargs or {}
+        self.settings = settings or {}
+        self.next_run = self.schedule.next_after(datetime.now())
+        self.running = None
+        self.history = []
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "spider": self.spider,
+            "schedule": self.schedule.expression,
+            "next_run": self.next_run.isoformat(timespec="minutes"),
+            "running": self.running,
+            "last_run": self.history[-1] if self.history else None,
+            "runs": len(self.history),
+        }
+
+
+def load_jobs(path=None):
+    """Read job definitions from a JSON schedule file, or use the defaults"""
+    definitions = DEFAULT_JOBS
+    if path:
+        with open(path, encoding="utf-8") as f:
+            definitions = json.load(f)["jobs"]
+    return [Job(**definition) for definition in definitions]
+
+
+class ControlProtocol(LineOnlyReceiver):
+    """One JSON command per line in, one JSON reply per line out"""
+
+    delimiter = b"\n"
+
+    def lineReceived(self, line):
+        try:
+            command = json.loads(line)
+            reply = self.factory.daemon.handle_command(command)
+        except Exception as e:
+            reply = {"ok": False, "error": str(e)}
+        self.sendLine(json.dumps(reply, default=str).encode("utf-8"))
+
+
+class CrawlDaemon:
+    """Runs scheduled crawls inside one warm process and reactor"""
+
+    def __init__(self, settings, jobs, socket_path, tick_seconds=15):
+        self.state = WarmState()
+        for name, value in DAEMON_SETTINGS.items():
+            settings.set(name, value, priority="cmdline")
+        settings.set("WARM_STATE", self.state, priority="cmdline")
+
+        self.runner = CrawlerRunner(settings)
+        self.jobs = {job.name: job for job in jobs}
+        self.socket_path = socket_path
+        self.tick_seconds = tick_seconds
+        self.started = time.time()
+        self.run_counter = 0
+        self.port = None
+        self.ticker = None
+
+    def start(self):
+        from twisted.internet import reactor
+
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)  # Left behind by a previous daemon
+        factory = Factory.forProtocol(ControlProtocol)
+        factory.daemon = self
+        endpoint = UNIXServerEndpoint(reactor, self.socket_path)
+        endpoint.listen(factory).addCallback(self._listening)
+
+        self.ticker = task.LoopingCall(self.tick)
+        self.ticker.start(self.tick_seconds, now=True)
+        for job in self.jobs.values():
+            logger.info(f"📅 {job.name}: {job.spider} at '{job.schedule.expression}', next {job.next_run}")
+
+    def _listening(self, port):
+        self.port = port
+        logger.info(f"🔌 Control socket listening on {self.socket_path}")
+
+    def tick(self):
+        now = datetime.now()
+        for job in self.jobs.values():
+            if now >= job.next_run:
+                job.next_run = job.schedule.next_after(now)
+                if job.running:
+                    logger.warning(f"⏭️  {job.name} still running, skipping this slot")
+                    continue
+                self.trigger(job.name, reason="schedule")
+
+    def trigger(self, name, reason="manual"):
+        job = self.jobs.get(name)
+        if job is None:
+            raise KeyError(f"Unknown job: {name}")
+        if job.running:
+            return job.running
+
+        self.run_counter += 1
+        run = {
+            "id": self.run_counter,
+            "job": name,
+            "reason": reason,
+            "started": datetime.now().isoformat(timespec="seconds"),
+        }
+        job.running = run
+
+        crawler = self.runner.create_crawler(job.spider)
+        for setting, value in job.settings.items():
+            crawler.settings.set(setting, value, priority="cmdline")
+        logger.info(f"▶️  Run {run['id']}: {name} ({reason})")
+
+        d = self.runner.crawl(crawler, **job.kwargs)
+        d.addBoth(self._finished, job, run, crawler)
+        return run
+
+    def _finished(self, result, job, run, crawler):
+        stats = crawler.stats.get_stats() if crawler.stats else {}
+        run["finished"] = datetime.now().isoformat(timespec="seconds")
+        run["items"] = stats.get("item_scraped_count", 0)
+        run["requests"] = stats.get("downloader/request_count", 0)
+        run["finish_reason"] = stats.get("finish_reason")
+        if isinstance(result, Failure):
+            run["error"] = result.getErrorMessage()
+            logger.error(f"❌ Run {run['id']} ({job.name}) failed: {run['error']}")
+        else:
+            logger.info(
+                f"✅ Run {run['id']} ({job.name}): {run['items']} items, {run['requests']} requests"
+            )
+
+        job.running = None
+        job.history = (job.history + [run])[-20:]
+
+    def handle_command(self, command):
+        action = command.get("cmd")
+        if action == "status":
+            return {"ok": True, **self.status()}
+        if action == "trigger":
+            return {"ok": True, "run": self.trigger(command["job"])}
+        if action == "history":
+            job = self.jobs[command["job"]]
+            return {"ok": True, "history": job.history}
+        if action == "stop":
+            from twisted.internet import reactor
+
+            reactor.callLater(0, self.stop)
+            return {"ok": True, "stopping": True}
+        return {"ok": False, "error": f"Unknown command: {action}"}
+
+    def status(self):
+        pool = self.state.objects.get("http_pool")
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "runs": self.run_counter,
+            "active_crawls": len(self.runner.crawlers),
+            "jobs": [job.to_dict() for job in self.jobs.values()],
+            "warm_state": self.state.describe(),
+            "warm_hits": self.state.hits,
+            "cached_connections": sum(
+                len(conns) for conns in pool._connections.values()
+            )
+            if pool is not None
+            else 0,
+        }
+
+    @defer.inlineCallbacks
+    def stop(self):
+        from twisted.internet import reactor
+
+        logger.info("🛑 Stopping crawl daemon")
+        if self.ticker and self.ticker.running:
+            self.ticker.stop()
+        yield self.runner.stop()
+        if self.port:
+            yield self.port.stopListening()
+        pool = self.state.pop("http_pool")
+        if pool is not None:
+            yield pool.closeCachedConnections()
+        stores = ("catalog_index:", "user_profiles:")
+        for key in [key for key in self.state.objects if key.startswith(stores)]:
+            self.state.pop(key).close()
+        if reactor.running:
+            reactor.stop()
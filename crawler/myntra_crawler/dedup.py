@@ -0,0 +1,161 @@
+import hashlib
+import os
+import sqlite3
+import time
+from scrapy import signals
+from scrapy.dupefilters import RFPDupeFilter
+from scrapy.utils.request import RequestFingerprinter
+from myntra_crawler.items import ProductItem
+from myntra_crawler.records import ProductRecord
+
+FLUSH_EVERY = 500  # Fetched products buffered between writes to the freshness store
+
+
+def product_id_of(item):
+    """Product id of a scraped ProductItem or ProductRecord, None for other items"""
+    if isinstance(item, ProductItem):
+        return item.get("product_id")
+    if isinstance(item, ProductRecord):
+        return item.product_id
+    return None
+
+
+class ProductRequestFingerprinter:
+    """Fingerprints product page requests by product id instead of URL
+
+    Requests carrying meta["product_id"] map to one fingerprint per product, so
+    the same product linked from several categories, slugs or query-string
+    variants is only fetched once. Other requests use Scrapy's default
+    fingerprint.
+    """
+
+    def __init__(self, crawler=None):
+        self.default = RequestFingerprinter(crawler)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def fingerprint(self, request):
+        product_id = request.meta.get("product_id")
+        if product_id:
+            return hashlib.sha1(f"product:{product_id}".encode("utf-8")).digest()
+        return self.default.fingerprint(request)
+
+
+class FreshnessStore:
+    """When each product was last scraped, shared by runs and worker processes"""
+
+    def __init__(self, path, timeout=30):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS fetched (
+                product_id TEXT PRIMARY KEY,
+                fetched_at REAL NOT NULL,
+                first_fetched_at REAL
+            )
+            """
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(fetched)")}
+        if "first_fetched_at" not in columns:
+            # Stores from before the column: their products count as scraped long ago
+            self.conn.execute("ALTER TABLE fetched ADD COLUMN first_fetched_at REAL")
+        self.pending = {}
+
+    def fresh_since(self, cutoff):
+        """Ids of products scraped at or after the cutoff timestamp"""
+        return {
+            row[0]
+            for row in self.conn.execute(
+                "SELECT product_id FROM fetched WHERE fetched_at >= ?", (cutoff,)
+            )
+        }
+
+    def first_fetched_at(self, product_id):
+        """When the product was first scraped (0 if before that was recorded), or None"""
+        row = self.conn.execute(
+            "SELECT COALESCE(first_fetched_at, 0) FROM fetched WHERE product_id = ?", (product_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def mark(self, product_id, fetched_at=None):
+        self.pending[product_id] = fetched_at or time.time()
+        if len(self.pending) >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                """
+                INSERT INTO fetched (product_id, fetched_at, first_fetched_at) VALUES (?1, ?2, ?2)
+                ON CONFLICT (product_id) DO UPDATE SET fetched_at = excluded.fetched_at
+                """,
+                self.pending.items(),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.pending.clear()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+class ProductDupeFilter(RFPDupeFilter):
+    """Dupefilter that also skips products scraped within a freshness window
+
+    In-run duplicates are caught by ProductRequestFingerprinter. With
+    PRODUCT_FRESHNESS_HOURS set, product page requests for products scraped by
+    an earlier run within that many hours are dropped as well. Every scraped
+    product is recorded in PRODUCT_FRESHNESS_PATH whether or not the window is
+    enabled.
+    """
+
+    def __init__(self, path=None, debug=False, *, fingerprinter=None):
+        super().__init__(path, debug, fingerprinter=fingerprinter)
+        self.store = None
+        self.fresh = set()
+        self.stats = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        dupefilter = super().from_crawler(crawler)
+        path = crawler.settings.get("PRODUCT_FRESHNESS_PATH")
+        if path:
+            directory = os.path.dirname(path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            dupefilter.store = FreshnessStore(path)
+            hours = crawler.settings.getfloat("PRODUCT_FRESHNESS_HOURS", 0)
+            if hours > 0:
+                dupefilter.fresh = dupefilter.store.fresh_since(time.time() - hours * 3600)
+            crawler.signals.connect(dupefilter.item_scraped, signal=signals.item_scraped)
+        dupefilter.stats = crawler.stats
+        return dupefilter
+
+    def request_seen(self, request):
+        product_id = request.meta.get("product_id")
+        if product_id and product_id in self.fresh:
+            if self.stats:
+                self.stats.inc_value("dupefilter/fresh_skipped")
+            return True
+        return super().request_seen(request)
+
+    def item_scraped(self, item, response, spider):
+        product_id = product_id_of(item)
+        if product_id:
+            self.store.mark(str(product_id))
+
+    def close(self, reason):
+        super().close(reason)
+        if self.store is not None:
+            self.store.close()
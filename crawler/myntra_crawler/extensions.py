@@ -0,0 +1,375 @@
+import os
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+from twisted.internet import task
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider, NotConfigured
+from myntra_crawler.accounting import CostLedger, append_run, current_release
+from myntra_crawler.dedup import FreshnessStore, product_id_of
+from myntra_crawler.metrics import (
+    MetricsHTTPServer,
+    SIZE_BUCKETS,
+    get_registry,
+)
+from myntra_crawler.profiling import get_profiler
+from myntra_crawler.tracing import hop_name
+from myntra_crawler.workqueue import WorkQueue
+
+
+class MetricsExtension:
+    """Extension recording latency/throughput histograms and exposing them for Prometheus"""
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.registry = get_registry(crawler)
+        self.host = crawler.settings.get("METRICS_HOST", "127.0.0.1")
+        self.port = crawler.settings.getint("METRICS_PORT", 9410)
+        self.server = None
+        self.start_time = None
+        self.items_scraped = 0
+
+        self.registry.describe(
+            "download_latency_seconds", "Time from request sent to response headers"
+        )
+        self.registry.describe(
+            "callback_cpu_seconds", "CPU time spent inside spider callbacks"
+        )
+        self.registry.describe(
+            "pipeline_stage_seconds", "Wall time spent in each item pipeline stage"
+        )
+        self.registry.describe("response_bytes", "Size of downloaded response bodies")
+        self.registry.describe("items_scraped_total", "Items that passed pipelines")
+        self.registry.describe("items_per_second", "Average item throughput")
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("METRICS_ENABLED"):
+            raise NotConfigured
+
+        ext = cls(crawler)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        return ext
+
+    def spider_opened(self, spider):
+        self.start_time = time.monotonic()
+        self.registry.set_gauge("items_per_second", self.items_per_second)
+
+        if self.port:
+            self.server = MetricsHTTPServer(self.registry, self.host, self.port)
+            try:
+                self.server.start()
+                spider.logger.info(
+                    f"📈 Metrics available at http://{self.host}:{self.server.port}/metrics"
+                )
+            except OSError as e:
+                spider.logger.warning(f"⚠️  Could not start metrics endpoint: {e}")
+                self.server = None
+
+    def response_received(self, response, request, spider):
+        latency = request.meta.get("download_latency")
+        if latency is not None:
+            self.registry.observe(
+                "download_latency_seconds", latency, host=urlparse(request.url).netloc
+            )
+        self.registry.observe(
+            "response_bytes",
+            len(response.body),
+            buckets=SIZE_BUCKETS,
+            status=response.status,
+        )
+
+    def item_scraped(self, item, response, spider):
+        self.items_scraped += 1
+        self.registry.inc("items_scraped_total", spider=spider.name)
+
+    def items_per_second(self):
+        if not self.start_time:
+            return 0.0
+        elapsed = time.monotonic() - self.start_time
+        return round(self.items_scraped / elapsed, 3) if elapsed > 0 else 0.0
+
+    def spider_closed(self, spider, reason):
+        self.log_summary(spider)
+        if self.server:
+            self.server.stop()
+
+    def log_summary(self, spider):
+        """Dump a summary table and a network/parse/disk time breakdown"""
+        rows = self.registry.summary_rows()
+        if not rows:
+            return
+
+        header = f"{'metric':<26} {'labels':<36} {'count':>7} {'mean':>10} {'p50':>10} {'p95':>10} {'max':>10}"
+        lines = [header, "-" * len(header)]
+        for name, labels, count, mean, p50, p95, peak in rows:
+            lines.append(
+                f"{name:<26} {labels[:36]:<36} {count:>7} {mean:>10.4f} {p50:>10.4f} {p95:>10.4f} {peak:>10.4f}"
+            )
+
+        spider.logger.info("📊 Metrics summary\n" + "\n".join(lines))
+
+        network = self.registry.total("download_latency_seconds")
+        parse = self.registry.total("callback_cpu_seconds")
+        disk = self.registry.total("pipeline_stage_seconds")
+        spent = network + parse + disk
+        if spent:
+            spider.logger.info(
+                f"⏱️  Time breakdown - network: {network:.2f}s ({network / spent:.0%}), "
+                f"parse: {parse:.2f}s ({parse / spent:.0%}), "
+                f"pipelines: {disk:.2f}s ({disk / spent:.0%}), "
+                f"items/s: {self.items_per_second()}"
+            )
+
+
+
+class ProfilingExtension:
+    """Extension flushing sampled profiles every N responses or seconds"""
+
+    def __init__(self, crawler):
+        self.profiler = get_profiler(crawler)
+        self.every_requests = crawler.settings.getint("PROFILE_EVERY_REQUESTS", 500)
+        self.every_seconds = crawler.settings.getfloat("PROFILE_EVERY_SECONDS", 60)
+        self.responses = 0
+        self.task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("PROFILE_ENABLED"):
+            raise NotConfigured
+
+        ext = cls(crawler)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        return ext
+
+    def spider_opened(self, spider):
+        self.profiler.start(spider.name)
+        spider.logger.info(
+            f"🔬 Profiling {self.profiler.sample_rate:.0%} of callbacks/pipelines into {self.profiler.output_dir}"
+        )
+
+        if self.every_seconds > 0:
+            self.task = task.LoopingCall(self.flush, spider, "interval")
+            self.task.start(self.every_seconds, now=False)
+
+    def response_received(self, response, request, spider):
+        self.responses += 1
+        if self.every_requests > 0 and self.responses % self.every_requests == 0:
+            self.flush(spider, "requests")
+
+    def flush(self, spider, reason):
+        for path in self.profiler.flush(reason):
+            spider.logger.info(f"🔬 Wrote profile: {path}")
+
+    def spider_closed(self, spider, reason):
+        if self.task and self.task.running:
+            self.task.stop()
+        self.flush(spider, "closed")
+        self.profiler.stop()
+
+
+class WorkQueueExtension:
+    """Extension feeding a spider with units claimed from a shared work queue"""
+
+    def __init__(self, crawler, path):
+        self.crawler = crawler
+        self.path = path
+        self.worker_id = str(crawler.settings.get("WORKER_ID", "0"))
+        self.lease_seconds = crawler.settings.getfloat("WORK_QUEUE_LEASE", 300)
+        self.queue = None
+        self.current = None
+        self.unit_items = 0
+        self.units_done = 0
+        self.task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get("WORK_QUEUE_PATH")
+        if not path:
+            raise NotConfigured
+
+        ext = cls(crawler, path)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_idle, signal=signals.spider_idle)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        return ext
+
+    def spider_opened(self, spider):
+        self.queue = WorkQueue(self.path)
+        self.task = task.LoopingCall(self.renew_lease)
+        self.task.start(max(self.lease_seconds / 3, 1), now=False)
+        spider.logger.info(f"👷 Worker {self.worker_id} pulling from {self.path}")
+
+    def renew_lease(self):
+        if self.current:
+            self.queue.renew(self.current, self.worker_id, self.lease_seconds)
+
+    def item_scraped(self, item, response, spider):
+        self.unit_items += 1
+
+    def spider_idle(self, spider):
+        """The previous unit is drained once the spider goes idle; claim the next"""
+        if self.current:
+            self.queue.complete(self.current, self.worker_id, self.unit_items)
+            self.units_done += 1
+            self.current = None
+
+        unit = self.queue.claim(self.worker_id, self.lease_seconds)
+        if unit is None:
+            if self.queue.has_unfinished():
+                # Other workers hold leases that may expire and become stealable
+                raise DontCloseSpider
+            spider.logger.info(
+                f"👷 Worker {self.worker_id} finished {self.units_done} units, queue drained"
+            )
+            return
+
+        self.current = unit
+        self.unit_items = 0
+        spider.logger.info(
+            f"👷 Worker {self.worker_id} claimed unit {unit.id} (attempt {unit.attempts}): {unit.payload}"
+        )
+        for request in spider.requests_for_unit(unit.payload):
+            self.crawler.engine.crawl(request)
+        raise DontCloseSpider
+
+    def spider_closed(self, spider, reason):
+        if self.task and self.task.running:
+            self.task.stop()
+        if self.current:
+            self.queue.release(self.current, self.worker_id)
+        self.queue.close()
+
+
+class CostAccountingExtension:
+    """Extension attributing requests, bytes, retries and time to categories and hops
+
+    At close it logs items per request, bytes per item and cost per new item
+    (products no earlier run had scraped, per the freshness store) and appends
+    the run to COST_REPORT_PATH, so efficiency can be compared across releases.
+    """
+
+    def __init__(self, crawler, path):
+        self.crawler = crawler
+        self.path = path
+        self.release = crawler.settings.get("CRAWL_RELEASE") or current_release()
+        self.run_id = crawler.settings.get("CRAWL_RUN_ID")
+        self.worker_id = crawler.settings.get("WORKER_ID")
+        self.freshness_path = crawler.settings.get("PRODUCT_FRESHNESS_PATH")
+        self.ledger = None
+        self.store = None
+        self.started_at = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get("COST_REPORT_PATH")
+        if not path:
+            raise NotConfigured
+
+        ext = cls(crawler, path)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(ext.request_reached_downloader, signal=signals.request_reached_downloader)
+        crawler.signals.connect(ext.bytes_received, signal=signals.bytes_received)
+        crawler.signals.connect(ext.response_received, signal=signals.response_received)
+        crawler.signals.connect(ext.item_scraped, signal=signals.item_scraped)
+        return ext
+
+    def spider_opened(self, spider):
+        self.started_at = time.time()
+        is_known = None
+        if self.freshness_path and os.path.exists(self.freshness_path):
+            self.store = FreshnessStore(self.freshness_path)
+            is_known = self.known_before_run
+        self.ledger = CostLedger(is_known)
+        if not self.run_id:
+            self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    def known_before_run(self, product_id):
+        # Products this run (or another worker of it) scraped first are newer than its start
+        first_fetched_at = self.store.first_fetched_at(product_id)
+        return first_fetched_at is not None and first_fetched_at < self.started_at
+
+    @staticmethod
+    def key(request):
+        return request.meta.get("category") or "-", hop_name(request)
+
+    def request_reached_downloader(self, request, spider):
+        category, hop = self.key(request)
+        self.ledger.add(category, hop, "requests")
+        if request.meta.get("retry_times"):
+            self.ledger.add(category, hop, "retries")
+        self.ledger.touch(category)
+
+    def bytes_received(self, data, request, spider):
+        category, hop = self.key(request)
+        self.ledger.add(category, hop, "wire_bytes", len(data))
+
+    def response_received(self, response, request, spider):
+        category, hop = self.key(request)
+        self.ledger.add(category, hop, "decoded_bytes", len(response.body))
+        self.ledger.add(category, hop, "download_seconds", request.meta.get("download_latency") or 0)
+        if response.status >= 400:
+            self.ledger.add(category, hop, "failures")
+        self.ledger.touch(category)
+
+    def item_scraped(self, item, response, spider):
+        category, hop = self.key(response.request) if response is not None else ("-", "-")
+        self.ledger.item(category, hop, product_id_of(item))
+
+    def spider_closed(self, spider, reason):
+        if self.store is not None:
+            self.store.close()
+        report = self.ledger.report()
+        self.log_report(spider, report)
+
+        totals = report["totals"]
+        stats = self.crawler.stats
+        for name in ("items_per_request", "wire_bytes_per_item", "requests_per_new_item"):
+            if totals[name] is not None:
+                stats.set_value(f"cost/{name}", totals[name])
+        stats.set_value("cost/new_items", totals["new_items"])
+
+        append_run(
+            self.path,
+            {
+                "run_id": self.run_id,
+                "worker_id": self.worker_id,
+                "spider": spider.name,
+                "release": self.release,
+                "started_at": self.started_at,
+                "finished_at": time.time(),
+                "reason": reason,
+                **report,
+            },
+        )
+        spider.logger.info(f"💰 Crawl costs appended to {self.path}")
+
+    def log_report(self, spider, report):
+        header = (
+            f"{'category':<22} {'hop':<28} {'reqs':>6} {'retry':>6} {'wire KB':>10} "
+            f"{'decoded KB':>11} {'dl s':>8} {'items':>7}"
+        )
+        lines = [header, "-" * len(header)]
+        for row in report["hops"]:
+            lines.append(
+                f"{row['category'][:22]:<22} {row['hop'][:28]:<28} {row['requests']:>6} "
+                f"{row['retries']:>6} {row['wire_bytes'] / 1024:>10.1f} "
+                f"{row['decoded_bytes'] / 1024:>11.1f} {row['download_seconds']:>8.2f} {row['items']:>7}"
+            )
+        spider.logger.info("💰 Crawl costs\n" + "\n".join(lines))
+
+        totals = report["totals"]
+        per_new = totals["requests_per_new_item"]
+        spider.logger.info(
+            f"💰 {totals['items']} items ({totals['new_items']} new) from {totals['requests']} requests - "
+            f"items/request: {totals['items_per_request']}, "
+            f"KB/item: {(totals['wire_bytes_per_item'] or 0) / 1024:.1f}, "
+            f"requests/new item: {per_new if per_new is not None else 'n/a'}"
+        )
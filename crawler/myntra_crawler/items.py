@@ -20,12 +20,15 @@ class ProductItem(scrapy.Item):
     product_url = scrapy.Field()
     scraped_at = scrapy.Field()
     raw_data = scrapy.Field()  # Store raw API response
+    trace_id = scrapy.Field()  # Request chain that produced the item
+    canonical_id = scrapy.Field()  # First-seen product of its near-duplicate group
 
 
 class UserOrderItem(scrapy.Item):
     """Item for storing user order history from Myntra"""
 
     order_id = scrapy.Field()
+    user_id = scrapy.Field()  # Pseudonymous id of the account the order belongs to
     product_id = scrapy.Field()
     product_name = scrapy.Field()
     brand = scrapy.Field()
@@ -39,3 +42,15 @@ class UserOrderItem(scrapy.Item):
     review_text = scrapy.Field()
     scraped_at = scrapy.Field()
     raw_data = scrapy.Field()  # Store raw API response
+    trace_id = scrapy.Field()  # Request chain that produced the item
+
+
+class ProductDeltaItem(scrapy.Item):
+    """Changed fields of a polled product (see the myntra_api_poll spider)"""
+
+    product_id = scrapy.Field()
+    category = scrapy.Field()
+    changes = scrapy.Field()  # {field: {"old", "new", ...} or {"added", "removed"}}
+    polled_at = scrapy.Field()
+    scraped_at = scrapy.Field()
+    trace_id = scrapy.Field()  # Request chain that produced the item
@@ -0,0 +1,134 @@
+import json
+import re
+
+# Top-level keys that may hold the product list, in the order spiders check them
+PRODUCT_LIST_KEYS = ("products", "items", "data", "results", "listings", "productList")
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+DECODER = json.JSONDecoder()
+
+
+class StreamedResponse:
+    """Incremental reader for a search API response
+
+    Iterating yields the product objects one at a time, decoding each only when
+    it is reached; every other top-level value is collected in `meta` (totals,
+    pagination flags, filters). `meta` is complete once iteration finishes and
+    `count` holds the number of products yielded.
+    """
+
+    def __init__(self, text, list_keys=PRODUCT_LIST_KEYS):
+        self.text = text
+        self.list_keys = list_keys
+        self.meta = {}
+        self.count = 0
+        self.list_key = None
+
+    def __iter__(self):
+        text = self.text
+        pos = self.skip(0)
+        if text.startswith("[", pos):
+            self.list_key = ""
+            yield from self.iter_array(pos)
+            return
+        if not text.startswith("{", pos):
+            raise json.JSONDecodeError("Expected an object or array", text, pos)
+
+        pos = self.skip(pos + 1)
+        if text.startswith("}", pos):
+            return
+        while True:
+            key, pos = DECODER.raw_decode(text, pos)
+            pos = self.expect(":", pos)
+            if self.list_key is None and key in self.list_keys and text.startswith("[", pos):
+                self.list_key = key
+                pos = yield from self.iter_array(pos)
+            else:
+                self.meta[key], pos = DECODER.raw_decode(text, pos)
+            pos = self.skip(pos)
+            if text.startswith("}", pos):
+                return
+            pos = self.expect(",", pos)
+
+    def iter_array(self, pos):
+        """Yield the elements of the array at pos; returns the position after it"""
+        text = self.text
+        pos = self.skip(pos + 1)
+        if text.startswith("]", pos):
+            return pos + 1
+        while True:
+            value, pos = DECODER.raw_decode(text, pos)
+            self.count += 1
+            yield value
+            pos = self.skip(pos)
+            if text.startswith("]", pos):
+                return pos + 1
+            pos = self.expect(",", pos)
+
+    def skip(self, pos):
+        return WHITESPACE.match(self.text, pos).end()
+
+    def expect(self, char, pos):
+        pos = self.skip(pos)
+        if not self.text.startswith(char, pos):
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.text, pos)
+        return self.skip(pos + 1)
+
+
+def iter_json_array(f, chunk_size=1 << 20):
+    """Yield the elements of a top-level JSON array read from a text file in chunks
+
+    Only about one chunk plus the element being decoded is held in memory, so
+    crawl outputs far larger than RAM can be walked.
+    """
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def skip():
+        # Whitespace may straddle chunks; returns False at end of input
+        nonlocal pos
+        while True:
+            pos = WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer):
+                return True
+            if eof:
+                return False
+            fill()
+
+    if not skip() or buffer[pos] != "[":
+        raise json.JSONDecodeError("Expected an array", buffer, pos)
+    pos += 1
+    if skip() and buffer[pos] == "]":
+        return
+
+    while True:
+        try:
+            value, end = DECODER.raw_decode(buffer, pos)
+            # A value ending exactly at the buffer end may be a truncated number
+            complete = end < len(buffer) or eof
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if not complete:
+            fill()
+            continue
+        yield value
+        pos = end
+        if not skip():
+            raise json.JSONDecodeError("Unterminated array", buffer, pos)
+        if buffer[pos] == "]":
+            return
+        if buffer[pos] != ",":
+            raise json.JSONDecodeError("Expecting ','", buffer, pos)
+        pos += 1
+        skip()
@@ -0,0 +1,305 @@
+import json
+import math
+import os
+from itertools import islice
+import numpy as np
+from myntra_crawler.catalog_index import effective_price, stored_record, tokenize
+from myntra_crawler.jsonstream import iter_json_array
+
+NUM_PERM = 128
+BANDS = 16  # 16 bands of 8 rows: pairs above ~0.7 Jaccard usually share a bucket
+THRESHOLD = 0.8  # Estimated Jaccard similarity for two products to be merged
+SHINGLE_SIZE = 3
+PRICE_BAND_WIDTH = 0.2  # Natural-log width of a price band (~x1.22 per band)
+SIGNATURE_CHUNK = 128  # Shingle sets hashed per vectorized step (stays in cache)
+
+
+def title_text(brand, name):
+    """Normalized brand + name, without the brand repeated at the start of the name"""
+    brand_tokens = tokenize(brand)
+    name_tokens = tokenize(name)
+    if brand_tokens and name_tokens[: len(brand_tokens)] == brand_tokens:
+        name_tokens = name_tokens[len(brand_tokens):]
+    return " ".join(brand_tokens + name_tokens)
+
+
+def shingles(record):
+    """Byte shingles of the normalized title, packed into ints, plus a price band
+
+    SHINGLE_SIZE consecutive UTF-8 bytes fit exactly in one integer, so no
+    string hashing is needed; the price band is encoded above that range.
+    """
+    data = np.frombuffer(title_text(record.brand, record.name).encode("utf-8"), dtype=np.uint8)
+    codes = data[: max(1, len(data) - SHINGLE_SIZE + 1)].astype(np.uint64)
+    for offset in range(1, min(SHINGLE_SIZE, len(data))):
+        codes <<= np.uint64(8)
+        codes |= data[offset : offset + len(codes)]
+
+    price = effective_price(record)
+    if price:
+        band = int(math.log(price) / PRICE_BAND_WIDTH)
+        codes = np.append(codes, np.uint64((1 << (8 * SHINGLE_SIZE)) + band))
+    return codes
+
+
+class MinHasher:
+    """MinHash signatures from NUM_PERM multiply-shift hashes ((a*x + b) mod 2**64) >> 32"""
+
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = np.random.default_rng(seed)
+        # uint64 arithmetic wraps around, which is the mod 2**64 the scheme needs
+        self.a = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) * 2 + 1
+        self.b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+        self.shift = np.uint64(32)
+
+    def signature(self, shingle_codes):
+        return self.signatures([shingle_codes])[0]
+
+    def signatures(self, shingle_codes):
+        """Signatures of many shingle arrays, vectorized per chunk, shape (n, num_perm)"""
+        # Empty titles hash a single placeholder so every product gets a signature
+        shingle_codes = [codes if len(codes) else np.zeros(1, np.uint64) for codes in shingle_codes]
+        result = np.empty((len(shingle_codes), len(self.a)), dtype=np.uint32)
+        for start in range(0, len(shingle_codes), SIGNATURE_CHUNK):
+            chunk = shingle_codes[start : start + SIGNATURE_CHUNK]
+            offsets = np.cumsum([0] + [len(codes) for codes in chunk[:-1]])
+            # (num_perm, shingles) layout keeps the per-product min contiguous
+            values = np.multiply.outer(self.a, np.concatenate(chunk))
+            values += self.b[:, None]
+            values >>= self.shift
+            result[start : start + len(chunk)] = np.minimum.reduceat(values, offsets, axis=1).T
+        return result
+
+
+class NearDuplicateIndex:
+    """Groups near-duplicate products with MinHash LSH banding and union-find
+
+    Each signature is cut into BANDS bands; products sharing any band are
+    candidates and are merged when their estimated Jaccard similarity reaches
+    the threshold. Only bucket-mates are compared and a bucket holds one member
+    per group, so adding n products takes roughly linear time. The canonical id
+    of a group is its first-seen product.
+
+    With max_products set, the oldest quarter of the products is forgotten
+    whenever the index outgrows it. The rest keep their groups: a canonical id
+    whose product was forgotten stays on as a bare group label.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS, threshold=THRESHOLD, seed=1,
+                 max_products=None):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.hasher = MinHasher(num_perm, seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_products = max_products
+        self.buckets = [{} for _ in range(bands)]
+        self.signatures = {}
+        self.parent = {}
+        self.order = {}
+        self.sequence = 0
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def find(self, product_id):
+        root = product_id
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[product_id] != root:  # Path compression
+            self.parent[product_id], product_id = root, self.parent[product_id]
+        return root
+
+    def union(self, left, right):
+        left, right = self.find(left), self.find(right)
+        if left == right:
+            return left
+        # The group keeps the id of whichever product was seen first
+        if self.order[right] < self.order[left]:
+            left, right = right, left
+        self.parent[right] = left
+        return left
+
+    def add(self, record, signature=None):
+        """Add a ProductRecord and return the canonical id of its group"""
+        product_id = record.product_id
+        if product_id in self.signatures:
+            return self.find(product_id)
+        if signature is None:
+            signature = self.hasher.signature(shingles(record))
+
+        self.signatures[product_id] = signature
+        # A forgotten canonical id coming back is still its group's label
+        if product_id not in self.parent:
+            self.parent[product_id] = product_id
+            self.order[product_id] = self.sequence
+            self.sequence += 1
+
+        # A bucket only needs one member per group, so products that join a
+        # group already present in the bucket are not appended to it
+        root = product_id
+        compared = set()
+        for band, buckets in enumerate(self.buckets):
+            key = signature[band * self.rows : (band + 1) * self.rows].tobytes()
+            members = buckets.setdefault(key, [])
+            represented = False
+            for other in members:
+                if self.find(other) == root:
+                    represented = True
+                    continue
+                if other in compared:
+                    continue
+                compared.add(other)
+                if self.similarity(signature, self.signatures[other]) >= self.threshold:
+                    root = self.union(product_id, other)
+                    represented = True
+            if not represented:
+                members.append(product_id)
+
+        if self.max_products and len(self.signatures) > self.max_products:
+            self.evict(len(self.signatures) - self.max_products * 3 // 4)
+        return self.find(product_id)
+
+    def evict(self, count):
+        """Forget the count oldest products, flattening the groups of the rest"""
+        evicted = set(islice(self.signatures, count))
+        roots = {
+            product_id: self.find(product_id)
+            for product_id in self.signatures
+            if product_id not in evicted
+        }
+        for product_id in evicted:
+            del self.signatures[product_id]
+        self.parent = {}
+        for product_id, root in roots.items():
+            self.parent[product_id] = root
+            self.parent[root] = root
+        self.order = {product_id: self.order[product_id] for product_id in self.parent}
+        for buckets in self.buckets:
+            for key, members in list(buckets.items()):
+                kept = [product_id for product_id in members if product_id not in evicted]
+                if kept:
+                    buckets[key] = kept
+                else:
+                    del buckets[key]
+
+    def save(self, path):
+        """Write signatures and groups to an .npz file, replaced atomically"""
+        product_ids = list(self.signatures)
+        signatures = np.zeros((len(product_ids), self.rows * self.bands), dtype=np.uint32)
+        for i, product_id in enumerate(product_ids):
+            signatures[i] = self.signatures[product_id]
+        # Which band buckets each product sits in (a bucket has one member per group)
+        position = {product_id: i for i, product_id in enumerate(product_ids)}
+        bucketed = np.zeros((len(product_ids), self.bands), dtype=bool)
+        for band, buckets in enumerate(self.buckets):
+            for members in buckets.values():
+                for product_id in members:
+                    bucketed[position[product_id], band] = True
+        labels = list(self.parent)
+        tmp = f"{path}.tmp.npz"
+        np.savez(
+            tmp,
+            product_ids=np.array(product_ids, dtype=str),
+            signatures=signatures,
+            bucketed=bucketed,
+            labels=np.array(labels, dtype=str),
+            roots=np.array([self.find(label) for label in labels], dtype=str),
+            orders=np.array([self.order[label] for label in labels], dtype=np.int64),
+        )
+        os.replace(tmp, path)
+
+    def load(self, path):
+        """Restore what save() wrote; buckets are rebuilt without comparing anything"""
+        with np.load(path) as data:
+            product_ids = data["product_ids"].tolist()
+            signatures = data["signatures"]
+            bucketed = data["bucketed"]
+            labels, roots, orders = data["labels"].tolist(), data["roots"].tolist(), data["orders"]
+        self.parent = dict(zip(labels, roots))
+        self.order = dict(zip(labels, orders.tolist()))
+        self.sequence = int(orders.max()) + 1 if len(orders) else 0
+        self.signatures = {}
+        self.buckets = [{} for _ in range(self.bands)]
+        # Products are stored in the order they were added, so appending them
+        # recreates every bucket list as it was
+        for product_id, signature, in_bands in zip(product_ids, signatures, bucketed):
+            self.signatures[product_id] = signature
+            for band in np.flatnonzero(in_bands):
+                key = signature[band * self.rows : (band + 1) * self.rows].tobytes()
+                self.buckets[band].setdefault(key, []).append(product_id)
+        return self
+
+    def add_many(self, records):
+        """Batch add; signatures for the whole batch are computed first"""
+        signatures = self.hasher.signatures([shingles(record) for record in records])
+        return [self.add(record, signature) for record, signature in zip(records, signatures)]
+
+    @staticmethod
+    def similarity(left, right):
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.count_nonzero(left == right)) / len(left)
+
+    def canonical(self, product_id):
+        return self.find(product_id) if product_id in self.parent else None
+
+    def groups(self, min_size=2):
+        """canonical id -> member ids for every group of at least min_size products"""
+        groups = {}
+        for product_id in self.parent:
+            groups.setdefault(self.find(product_id), []).append(product_id)
+        return {root: members for root, members in groups.items() if len(members) >= min_size}
+
+
+def match_file(index, path, drop=False, batch_size=1000):
+    """Tag every product of a crawl output file with its canonical_id, in place
+
+    Products are added in file order, as NearDuplicatePipeline adds them during
+    a crawl; drop=True leaves near duplicates out. Returns (products, duplicates).
+    """
+    count = duplicates = written = 0
+    tmp = f"{path}.tmp"
+
+    with open(path, encoding="utf-8") as f, open(tmp, "w", encoding="utf-8") as out:
+
+        def write(item):
+            nonlocal written
+            text = json.dumps(item, indent=4, ensure_ascii=False)
+            out.write(",\n    " if written else "[\n    ")
+            out.write(text.replace("\n", "\n    "))
+            written += 1
+
+        def flush(batch):
+            nonlocal count, duplicates
+            if not batch:
+                return
+            canonical_ids = index.add_many([record for _, record in batch])
+            for (item, record), canonical_id in zip(batch, canonical_ids):
+                count += 1
+                if canonical_id != record.product_id:
+                    duplicates += 1
+                    if drop:
+                        continue
+                item["canonical_id"] = canonical_id
+                write(item)
+
+        batch = []
+        for item in iter_json_array(f):
+            try:
+                record = stored_record(item)
+            except (ValueError, TypeError):
+                # Not a product; kept in place once the batch before it is out
+                flush(batch)
+                batch = []
+                write(item)
+                continue
+            batch.append((item, record))
+            if len(batch) == batch_size:
+                flush(batch)
+                batch = []
+        flush(batch)
+        out.write("\n]" if written else "[]")
+
+    os.replace(tmp, path)
+    return count, duplicates
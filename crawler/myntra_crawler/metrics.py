@@ -0,0 +1,262 @@
+import functools
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Bucket upper bounds (seconds) for download latency and CPU timings
+LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+# Bucket upper bounds (bytes) for response sizes
+SIZE_BUCKETS = (
+    1024,
+    4096,
+    16384,
+    65536,
+    262144,
+    1048576,
+    4194304,
+    16777216,
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram compatible with the Prometheus exposition format"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        """Record a single observation"""
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q):
+        """Approximate a quantile by interpolating inside the matching bucket"""
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, bucket_count in enumerate(self.counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.max
+            if seen + bucket_count >= rank and bucket_count:
+                fraction = (rank - seen) / bucket_count
+                return min(lower + (upper - lower) * fraction, self.max)
+            seen += bucket_count
+            lower = upper
+        return self.max
+
+
+class MetricsRegistry:
+    """Thread-safe collection of labelled histograms and counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.help = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def describe(self, name, text):
+        """Attach HELP text to a metric family"""
+        self.help[name] = text
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        """Record a value in the histogram identified by name and labels"""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        """Increment a counter"""
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set_gauge(self, name, value_fn, **labels):
+        """Register a callable evaluated at scrape time"""
+        with self._lock:
+            self.gauges[self._key(name, labels)] = value_fn
+
+    def total(self, name):
+        """Sum of all observations of a histogram family across labels"""
+        with self._lock:
+            return sum(h.sum for (n, _), h in self.histograms.items() if n == name)
+
+    def render_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            families = {}
+            for (name, labels), value in self.counters.items():
+                families.setdefault((name, "counter"), []).append((labels, value))
+            for (name, labels), value_fn in self.gauges.items():
+                families.setdefault((name, "gauge"), []).append((labels, value_fn()))
+            for (name, labels), histogram in self.histograms.items():
+                families.setdefault((name, "histogram"), []).append(
+                    (labels, histogram)
+                )
+
+            for (name, kind), samples in sorted(families.items()):
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in sorted(samples, key=lambda s: s[0]):
+                    if kind != "histogram":
+                        lines.append(f"{name}{_format_labels(labels)} {value}")
+                        continue
+
+                    cumulative = 0
+                    for bound, bucket_count in zip(
+                        value.buckets + ("+Inf",), value.counts
+                    ):
+                        cumulative += bucket_count
+                        bucket_labels = labels + (("le", str(bound)),)
+                        lines.append(
+                            f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}"
+                        )
+                    lines.append(f"{name}_sum{_format_labels(labels)} {value.sum}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {value.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def summary_rows(self):
+        """Return (metric, labels, count, mean, p50, p95, max) rows for reporting"""
+        with self._lock:
+            rows = []
+            for (name, labels), h in sorted(self.histograms.items()):
+                label_text = ",".join(f"{k}={v}" for k, v in labels)
+                rows.append(
+                    (
+                        name,
+                        label_text,
+                        h.count,
+                        h.mean,
+                        h.quantile(0.5),
+                        h.quantile(0.95),
+                        h.max,
+                    )
+                )
+            return rows
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in labels
+    )
+    return "{" + body + "}"
+
+
+def get_registry(crawler):
+    """Return the registry attached to a crawler, creating it on first use"""
+    registry = getattr(crawler, "metrics_registry", None)
+    if registry is None:
+        registry = MetricsRegistry()
+        crawler.metrics_registry = registry
+    return registry
+
+
+def timed_stage(process_item):
+    """Decorator recording wall time of an item pipeline's process_item"""
+
+    @functools.wraps(process_item)
+    def wrapper(self, item, spider):
+        registry = getattr(getattr(spider, "crawler", None), "metrics_registry", None)
+        if registry is None:
+            return process_item(self, item, spider)
+
+        start = time.perf_counter()
+        try:
+            return process_item(self, item, spider)
+        finally:
+            registry.observe(
+                "pipeline_stage_seconds",
+                time.perf_counter() - start,
+                stage=type(self).__name__,
+            )
+
+    return wrapper
+
+
+class MetricsHTTPServer:
+    """Serve a registry on /metrics from a background daemon thread"""
+
+    def __init__(self, registry, host="127.0.0.1", port=9410):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep crawl logs clean
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name="metrics-http", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
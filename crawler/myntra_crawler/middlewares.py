@@ -1,12 +1,42 @@
 import random
+import time
+from twisted.internet.task import deferLater
 from fake_useragent import UserAgent
+from itemadapter import ItemAdapter, is_item
+from scrapy import Request, signals
+from scrapy.downloadermiddlewares.retry import RetryMiddleware, get_retry_request
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.misc import load_object
+from scrapy.utils.response import response_status_message
+from myntra_crawler.metrics import get_registry
+from myntra_crawler.profiling import get_profiler
+from myntra_crawler.resilience import (
+    HALF_OPEN,
+    CircuitBreaker,
+    RetryBudget,
+    backoff_delay,
+    endpoint_class,
+)
+from myntra_crawler.scheduler import NOT_BEFORE, DelayedRequestScheduler
+from myntra_crawler.state import get_warm_state
+from myntra_crawler.tracing import (
+    TRACE_DOWNLOAD_END,
+    TRACE_DOWNLOAD_START,
+    TRACE_ENQUEUED_AT,
+    TRACE_ID,
+    TRACE_PARENT,
+    TRACE_RETRIES_SEEN,
+    get_tracer,
+    hop_name,
+)
+from myntra_crawler.workqueue import WorkQueue
 
 
 class RotateUserAgentMiddleware:
     """Middleware to rotate User-Agent headers"""
 
-    def __init__(self):
-        self.ua = UserAgent()
+    def __init__(self, ua=None):
+        self.ua = ua or UserAgent()
         # Fallback user agents if fake_useragent fails
         self.user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -16,6 +46,11 @@ class RotateUserAgentMiddleware:
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:109.0) Gecko/20100101 Firefox/121.0",
         ]
 
+    @classmethod
+    def from_crawler(cls, crawler):
+        # Loading the user agent database is slow, reuse it across daemon runs
+        return cls(get_warm_state(crawler).get("user_agents", UserAgent))
+
     def process_request(self, request, spider):
         try:
             # Try to get a random user agent
@@ -26,3 +61,476 @@ class RotateUserAgentMiddleware:
 
         request.headers["User-Agent"] = ua
         return None
+
+
+class CallbackTimingMiddleware:
+    """Spider middleware measuring CPU time spent in each spider callback"""
+
+    def __init__(self, registry):
+        self.registry = registry
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("METRICS_ENABLED"):
+            raise NotConfigured
+        return cls(get_registry(crawler))
+
+    @staticmethod
+    def _callback_name(response):
+        callback = response.request.callback if response.request else None
+        return getattr(callback, "__name__", "parse")
+
+    def process_spider_output(self, response, result, spider):
+        callback_name = self._callback_name(response)
+
+        # Callbacks are generators, so their work happens while we iterate
+        elapsed = 0.0
+        iterator = iter(result)
+        try:
+            while True:
+                start = time.process_time()
+                try:
+                    output = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    elapsed += time.process_time() - start
+                yield output
+        finally:
+            self.registry.observe(
+                "callback_cpu_seconds", elapsed, callback=callback_name
+            )
+
+    async def process_spider_output_async(self, response, result, spider):
+        callback_name = self._callback_name(response)
+
+        elapsed = 0.0
+        iterator = result.__aiter__()
+        try:
+            while True:
+                start = time.process_time()
+                try:
+                    output = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    elapsed += time.process_time() - start
+                yield output
+        finally:
+            self.registry.observe(
+                "callback_cpu_seconds", elapsed, callback=callback_name
+            )
+
+
+class ProfilingMiddleware:
+    """Spider middleware running a sample of callbacks under the crawl profiler"""
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("PROFILE_ENABLED"):
+            raise NotConfigured
+        return cls(get_profiler(crawler))
+
+    def process_spider_output(self, response, result, spider):
+        if not self.profiler.should_sample():
+            yield from result
+            return
+
+        iterator = iter(result)
+        while True:
+            with self.profiler.section():
+                try:
+                    output = next(iterator)
+                except StopIteration:
+                    break
+            yield output
+
+    async def process_spider_output_async(self, response, result, spider):
+        if not self.profiler.should_sample():
+            async for output in result:
+                yield output
+            return
+
+        iterator = result.__aiter__()
+        while True:
+            with self.profiler.section():
+                try:
+                    output = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+            yield output
+
+
+class TracingSpiderMiddleware:
+    """Spider middleware propagating trace ids across callbacks and tagging items"""
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("TRACING_ENABLED"):
+            raise NotConfigured
+        return cls(get_tracer(crawler))
+
+    def process_start_requests(self, start_requests, spider):
+        for request in start_requests:
+            if isinstance(request, Request):
+                self.tracer.start_trace(request)
+            yield request
+
+    async def process_start(self, start):
+        async for request in start:
+            if isinstance(request, Request):
+                self.tracer.start_trace(request)
+            yield request
+
+    def _propagate(self, output, trace_id, span_id, counts):
+        if isinstance(output, Request):
+            output.meta.setdefault(TRACE_ID, trace_id)
+            output.meta[TRACE_PARENT] = span_id
+            output.meta[TRACE_ENQUEUED_AT] = time.time()
+            counts["requests"] += 1
+        elif is_item(output):
+            try:
+                ItemAdapter(output)["trace_id"] = trace_id
+            except KeyError:
+                pass  # Item class without a trace_id field
+            counts["items"] += 1
+
+    def _record_parse(self, response, trace_id, span_id, start, busy, counts):
+        self.tracer.record(
+            trace_id,
+            "parse",
+            start,
+            start + busy,
+            hop=hop_name(response.request),
+            parent_id=response.meta.get(TRACE_PARENT),
+            span_id=span_id,
+            url=response.url,
+            **counts,
+        )
+
+    def process_spider_output(self, response, result, spider):
+        trace_id = response.meta.get(TRACE_ID) or self.tracer.new_id()
+        span_id = self.tracer.new_id()
+        counts = {"items": 0, "requests": 0}
+        start = time.time()
+        busy = 0.0
+
+        iterator = iter(result)
+        try:
+            while True:
+                step = time.perf_counter()
+                try:
+                    output = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    busy += time.perf_counter() - step
+                self._propagate(output, trace_id, span_id, counts)
+                yield output
+        finally:
+            self._record_parse(response, trace_id, span_id, start, busy, counts)
+
+    async def process_spider_output_async(self, response, result, spider):
+        trace_id = response.meta.get(TRACE_ID) or self.tracer.new_id()
+        span_id = self.tracer.new_id()
+        counts = {"items": 0, "requests": 0}
+        start = time.time()
+        busy = 0.0
+
+        iterator = result.__aiter__()
+        try:
+            while True:
+                step = time.perf_counter()
+                try:
+                    output = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    busy += time.perf_counter() - step
+                self._propagate(output, trace_id, span_id, counts)
+                yield output
+        finally:
+            self._record_parse(response, trace_id, span_id, start, busy, counts)
+
+
+class TracingDownloaderMiddleware:
+    """Downloader middleware recording scheduling wait, download and retry spans"""
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("TRACING_ENABLED"):
+            raise NotConfigured
+
+        mw = cls(get_tracer(crawler))
+        crawler.signals.connect(mw.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(mw.spider_closed, signal=signals.spider_closed)
+        return mw
+
+    def spider_opened(self, spider):
+        self.tracer.open(spider.name)
+        spider.logger.info(f"🧵 Writing trace spans to {self.tracer.filename}")
+
+    def spider_closed(self, spider):
+        self.tracer.close()
+        spider.logger.info(
+            f"🧵 Wrote {self.tracer.spans_written} spans to {self.tracer.filename}"
+        )
+
+    def process_request(self, request, spider):
+        now = time.time()
+        trace_id = self.tracer.start_trace(request)
+        hop = hop_name(request)
+        parent_id = request.meta.get(TRACE_PARENT)
+        retries = request.meta.get("retry_times", 0)
+
+        if retries > request.meta.get(TRACE_RETRIES_SEEN, 0):
+            # Retried copy: time since the failed attempt is retry backoff + queueing
+            request.meta[TRACE_RETRIES_SEEN] = retries
+            self.tracer.record(
+                trace_id,
+                "retry",
+                request.meta.get(TRACE_DOWNLOAD_END, now),
+                now,
+                hop=hop,
+                parent_id=parent_id,
+                attempt=retries,
+                url=request.url,
+            )
+        else:
+            self.tracer.record(
+                trace_id,
+                "schedule",
+                request.meta.get(TRACE_ENQUEUED_AT, now),
+                now,
+                hop=hop,
+                parent_id=parent_id,
+                url=request.url,
+            )
+
+        request.meta[TRACE_DOWNLOAD_START] = now
+        return None
+
+    def process_response(self, request, response, spider):
+        now = time.time()
+        request.meta[TRACE_DOWNLOAD_END] = now
+        self.tracer.record(
+            request.meta.get(TRACE_ID),
+            "download",
+            request.meta.get(TRACE_DOWNLOAD_START, now),
+            now,
+            hop=hop_name(request),
+            parent_id=request.meta.get(TRACE_PARENT),
+            url=request.url,
+            status=response.status,
+            bytes=len(response.body),
+            attempt=request.meta.get("retry_times", 0),
+        )
+        return response
+
+    def process_exception(self, request, exception, spider):
+        now = time.time()
+        request.meta[TRACE_DOWNLOAD_END] = now
+        self.tracer.record(
+            request.meta.get(TRACE_ID),
+            "download",
+            request.meta.get(TRACE_DOWNLOAD_START, now),
+            now,
+            hop=hop_name(request),
+            parent_id=request.meta.get(TRACE_PARENT),
+            url=request.url,
+            error=type(exception).__name__,
+            attempt=request.meta.get("retry_times", 0),
+        )
+        return None
+
+
+class SharedBudgetMiddleware:
+    """Downloader middleware enforcing one request rate across all worker processes"""
+
+    def __init__(self, queue, rate, burst):
+        self.queue = queue
+        self.rate = rate
+        self.burst = burst
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get("WORK_QUEUE_PATH")
+        rate = crawler.settings.getfloat("SHARED_REQUESTS_PER_SECOND")
+        if not path or rate <= 0:
+            raise NotConfigured
+        burst = crawler.settings.getfloat("SHARED_REQUESTS_BURST", 1.0)
+        return cls(WorkQueue(path), rate, burst)
+
+    def process_request(self, request, spider):
+        wait = self.queue.acquire_token("requests", self.rate, self.burst)
+        if wait <= 0:
+            return None
+
+        from twisted.internet import reactor
+
+        # Re-check after the bucket refills without blocking the reactor
+        return deferLater(reactor, wait, self.process_request, request, spider)
+
+
+class BackoffRetryMiddleware(RetryMiddleware):
+    """Retry middleware with jittered backoff, per-endpoint retry budgets and circuit breakers
+
+    Replaces Scrapy's RetryMiddleware and keeps its settings (RETRY_TIMES,
+    RETRY_HTTP_CODES, RETRY_EXCEPTIONS). Retries wait an exponentially growing,
+    jittered delay (at least any Retry-After), are only sent while the
+    endpoint class still has retry budget, and every request to an endpoint
+    whose breaker is open is held until it half-opens. Budgets and breakers
+    live in the warm state, so an outage carries over between daemon runs.
+    """
+
+    def __init__(self, settings, stats, budgets, breakers):
+        super().__init__(settings)
+        self.stats = stats
+        self.budgets = budgets
+        self.breakers = breakers
+        self.backoff_base = settings.getfloat("RETRY_BACKOFF_BASE", 1.0)
+        self.backoff_max = settings.getfloat("RETRY_BACKOFF_MAX", 60.0)
+        self.budget_ratio = settings.getfloat("RETRY_BUDGET_RATIO", 0.2)
+        self.budget_reserve = settings.getint("RETRY_BUDGET_RESERVE", 10)
+        self.breaker_failures = settings.getint("CIRCUIT_BREAKER_FAILURES", 10)
+        self.breaker_cooldown = settings.getfloat("CIRCUIT_BREAKER_COOLDOWN", 30.0)
+        self.breaker_max_cooldown = settings.getfloat("CIRCUIT_BREAKER_MAX_COOLDOWN", 300.0)
+        self.breaker_probe_timeout = settings.getfloat("CIRCUIT_BREAKER_PROBE_TIMEOUT", 60.0)
+        # Waiting requests go back to a DelayedRequestScheduler when there is
+        # one; otherwise they are held here, taking up a download slot
+        self.scheduler_delays = issubclass(
+            load_object(settings.get("SCHEDULER")), DelayedRequestScheduler
+        )
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        state = get_warm_state(crawler)
+        middleware = cls(
+            crawler.settings,
+            crawler.stats,
+            state.get("retry_budgets", dict),
+            state.get("circuit_breakers", dict),
+        )
+        middleware.crawler = crawler
+        return middleware
+
+    def budget(self, endpoint):
+        if endpoint not in self.budgets:
+            self.budgets[endpoint] = RetryBudget(self.budget_ratio, self.budget_reserve)
+        return self.budgets[endpoint]
+
+    def breaker(self, endpoint):
+        if endpoint not in self.breakers:
+            self.breakers[endpoint] = CircuitBreaker(
+                self.breaker_failures,
+                self.breaker_cooldown,
+                self.breaker_max_cooldown,
+                self.breaker_probe_timeout,
+            )
+        return self.breakers[endpoint]
+
+    def update_stats(self, endpoint):
+        breaker = self.breaker(endpoint)
+        budget = self.budget(endpoint)
+        self.stats.set_value(f"circuit/{endpoint}/state", breaker.state)
+        self.stats.set_value(f"circuit/{endpoint}/trips", breaker.trips)
+        self.stats.set_value(f"retry_budget/{endpoint}/balance", round(budget.balance, 2))
+        self.stats.set_value(f"retry_budget/{endpoint}/exhausted", budget.exhausted)
+
+    def process_request(self, request, spider):
+        # Retries carry the time they may go out; other requests wait only
+        # while their endpoint's breaker is open
+        wait = request.meta.get(NOT_BEFORE, 0) - time.time()
+        if wait <= 0:
+            endpoint = endpoint_class(request)
+            breaker = self.breaker(endpoint)
+            was = breaker.state
+            wait = breaker.wait_time()
+            if breaker.state != was:
+                self.update_stats(endpoint)
+            request.meta.pop("circuit_probe", None)
+            if wait <= 0 and breaker.state == HALF_OPEN:
+                request.meta["circuit_probe"] = True
+        if wait <= 0:
+            return None
+
+        if self.scheduler_delays:
+            # Back to the scheduler, which holds it without taking a download slot
+            return request.replace(
+                dont_filter=True, meta={**request.meta, NOT_BEFORE: time.time() + wait}
+            )
+
+        from twisted.internet import reactor
+
+        return deferLater(reactor, wait, self.process_request, request, spider)
+
+    def process_response(self, request, response, spider):
+        endpoint = endpoint_class(request)
+        if response.status not in self.retry_http_codes:
+            self.breaker(endpoint).record_success()
+            self.budget(endpoint).deposit()
+            self.update_stats(endpoint)
+            return response
+
+        # The outcome counts towards the breaker even when it isn't retried
+        self.breaker(endpoint).record_failure()
+        if request.meta.get("dont_retry", False):
+            self.update_stats(endpoint)
+            return response
+
+        retry_after = response.headers.get("Retry-After")
+        try:
+            retry_after = float(retry_after) if retry_after else 0.0
+        except ValueError:
+            retry_after = 0.0  # HTTP-date form, rare enough to ignore
+        reason = response_status_message(response.status)
+        return self.retry(request, reason, endpoint, spider, retry_after) or response
+
+    def process_exception(self, request, exception, spider):
+        endpoint = endpoint_class(request)
+        if not isinstance(exception, self.exceptions_to_retry):
+            # Says nothing about the endpoint (e.g. IgnoreRequest), but a probe
+            # ending this way must not keep the breaker half-open for good
+            if request.meta.get("circuit_probe"):
+                self.breaker(endpoint).release_probe()
+            return None
+        self.breaker(endpoint).record_failure()
+        if request.meta.get("dont_retry", False):
+            self.update_stats(endpoint)
+            return None
+        return self.retry(request, exception, endpoint, spider)
+
+    def retry(self, request, reason, endpoint, spider, retry_after=0.0):
+        """Retry request after a backoff, if its endpoint can afford it"""
+        attempt = request.meta.get("retry_times", 0) + 1
+        max_retry_times = request.meta.get("max_retry_times", self.max_retry_times)
+        if attempt <= max_retry_times and not self.budget(endpoint).withdraw():
+            spider.logger.debug(f"Retry budget for {endpoint} exhausted, giving up {request}")
+            self.update_stats(endpoint)
+            return None
+
+        retry = get_retry_request(
+            request,
+            spider=spider,
+            reason=reason,
+            max_retry_times=max_retry_times,
+            priority_adjust=request.meta.get("priority_adjust", self.priority_adjust),
+        )
+        self.update_stats(endpoint)
+        if retry is None:
+            return None
+
+        delay = max(backoff_delay(attempt, self.backoff_base, self.backoff_max), retry_after)
+        retry.meta.pop("circuit_probe", None)
+        retry.meta[NOT_BEFORE] = time.time() + delay
+        self.stats.inc_value("retry/backoff_seconds", delay)
+        return retry
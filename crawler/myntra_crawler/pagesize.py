@@ -0,0 +1,103 @@
+import json
+import os
+import time
+
+DEFAULT_ROWS = 50  # Page size the site's own client uses; always accepted
+PAGE_SIZE_CANDIDATES = (500, 200, 100, 50)
+PAGE_SIZE_TTL_DAYS = 7  # Re-probe remembered page sizes after this long
+
+
+def load_page_sizes(path):
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class PageSizeTuner:
+    """Largest search API page size an endpoint really serves, remembered on disk
+
+    Until a size is known, requests ask for the largest candidate. A response
+    holding that many products verifies it. A short page while more results
+    remain may mean the server capped the page; once a second short page in a
+    row serves the same count, that count is used from then on. An endpoint
+    that rejects a size outright steps down to the next candidate. Verified
+    sizes are stored per endpoint in a small JSON file.
+    """
+
+    def __init__(self, endpoint, path=None, candidates=PAGE_SIZE_CANDIDATES, ttl_days=PAGE_SIZE_TTL_DAYS):
+        self.endpoint = endpoint
+        self.path = path
+        self.candidates = sorted({int(c) for c in candidates} | {DEFAULT_ROWS}, reverse=True)
+        self.candidate = 0
+        self.rows = None
+        self.short = None  # Count served by the last short page, until it repeats
+
+        entry = load_page_sizes(path).get(endpoint)
+        if entry and time.time() - entry.get("checked", 0) < ttl_days * 86400:
+            self.rows = int(entry["rows"])
+
+    @classmethod
+    def from_settings(cls, endpoint, settings=None):
+        if settings is None:
+            return cls(endpoint)
+        return cls(
+            endpoint,
+            settings.get("PAGE_SIZE_PATH"),
+            settings.getlist("PAGE_SIZE_CANDIDATES") or PAGE_SIZE_CANDIDATES,
+            settings.getfloat("PAGE_SIZE_TTL_DAYS", PAGE_SIZE_TTL_DAYS),
+        )
+
+    @property
+    def probing(self):
+        return self.rows is None
+
+    def current(self):
+        return self.rows or self.candidates[self.candidate]
+
+    def rows_for(self, offset, stop_offset=None):
+        """Rows to request at offset, without reading past stop_offset"""
+        rows = self.current()
+        if stop_offset is not None:
+            rows = max(1, min(rows, stop_offset - offset))
+        return rows
+
+    def observe(self, requested, served, more):
+        """Learn from a page: `served` products for `requested` rows, `more` results left"""
+        if 0 < served < requested and more:
+            # A single short page may be a glitch; a cap serves the same count again
+            if self.rows != served and self.short == served:
+                self.settle(served)
+            self.short = served
+            return
+        self.short = None
+        if self.probing and requested == self.current() and served >= requested:
+            self.settle(requested)
+
+    def reject(self, requested):
+        """The endpoint refused `requested` rows; returns the size to retry with, or None"""
+        if requested <= DEFAULT_ROWS:
+            return None
+        if self.rows is not None and self.rows >= requested:
+            self.rows = None
+        while self.candidates[self.candidate] >= requested:
+            self.candidate += 1
+        return self.current()
+
+    def settle(self, rows):
+        self.rows = rows
+        if not self.path:
+            return
+        sizes = load_page_sizes(self.path)
+        sizes[self.endpoint] = {"rows": rows, "checked": time.time()}
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        # Workers share the file; each replaces it whole so no reader sees half of it
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(sizes, f, indent=2)
+        os.replace(tmp, self.path)
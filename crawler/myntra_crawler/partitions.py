@@ -0,0 +1,151 @@
+import json
+import time
+from urllib.parse import urlencode
+import requests
+
+MAX_SHARD_RESULTS = 5000  # Largest shard crawled by offset pagination alone
+PRICE_RANGE = (0, 100000)  # Rupees; used when the API reports no price range
+
+API_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
+    "Accept": "application/json",
+    "app": "web",
+    "x-myntraweb": "Yes",
+    "x-requested-with": "browser",
+}
+
+
+def filter_params(filters):
+    """Search API query parameters for a shard's filters
+
+    Facets go in `f` ("Brand:Roadster") and ranges in `rf`
+    ("Price:500.0_999.0_500.0 TO 999.0"), as the Myntra web client sends them.
+    """
+    params = {}
+    if not filters:
+        return params
+    if filters.get("brand"):
+        params["f"] = f"Brand:{filters['brand']}"
+    if filters.get("price"):
+        low, high = filters["price"]
+        params["rf"] = f"Price:{low:.1f}_{high:.1f}_{low:.1f} TO {high:.1f}"
+    return params
+
+
+def parse_filter_params(params):
+    """Inverse of filter_params, from parse_qs-style {name: [values]}"""
+    filters = {}
+    for facet in params.get("f", [""])[0].split("::"):
+        name, _, value = facet.partition(":")
+        if name == "Brand" and value:
+            filters["brand"] = value
+    name, _, spec = params.get("rf", [""])[0].partition(":")
+    if name == "Price" and spec:
+        low, high = spec.split("_")[:2]
+        filters["price"] = [int(float(low)), int(float(high))]
+    return filters
+
+
+def describe(filters):
+    parts = []
+    if filters.get("brand"):
+        parts.append(filters["brand"])
+    if filters.get("price"):
+        parts.append("₹{}-{}".format(*filters["price"]))
+    return " ".join(parts) or "all"
+
+
+class PartitionPlanner:
+    """Splits categories into disjoint search shards small enough to paginate
+
+    A category whose result count exceeds max_results is split by brand (the
+    counts come with the first probe), and any brand still too large is split
+    by bisecting its price range, probing each half for its count. Price ranges
+    are inclusive whole rupees, so sibling shards never overlap. When the brand
+    facet doesn't account for every result (the API truncates long facet lists)
+    the category is split by price alone, since a search can't exclude brands.
+    """
+
+    def __init__(self, base_url="https://www.myntra.com", max_results=MAX_SHARD_RESULTS, delay=1.0, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.max_results = max_results
+        self.delay = delay
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(API_HEADERS)
+        self.probes = 0
+        self.totals = {}
+        self.last_probe = 0.0
+
+    def open_session(self, category):
+        """Visit the category page for session cookies, like the API spider"""
+        self.session.get(f"{self.base_url}/{category}", timeout=self.timeout)
+
+    def probe(self, category, filters):
+        """(result count, brand -> count, (low, high) price range) for a shard"""
+        wait = self.last_probe + self.delay - time.time()
+        if wait > 0:
+            time.sleep(wait)
+        params = {"rows": 1, "o": 0, **filter_params(filters)}
+        url = f"{self.base_url}/gateway/v2/search/{category}?{urlencode(params)}"
+        response = self.session.get(url, timeout=self.timeout)
+        self.last_probe = time.time()
+        self.probes += 1
+        response.raise_for_status()
+        data = json.loads(response.text)
+
+        brands = {}
+        price_range = None
+        facets = data.get("filters") or {}
+        for facet in facets.get("primaryFilters") or []:
+            if facet.get("id") == "Brand":
+                for value in facet.get("filterValues") or []:
+                    if value.get("count"):
+                        brands[value.get("value") or value.get("id")] = value["count"]
+        for facet in facets.get("rangeFilters") or []:
+            if facet.get("id") == "Price":
+                values = facet.get("filterValues") or []
+                if values:
+                    price_range = (
+                        int(min(v["start"] for v in values)),
+                        int(max(v["end"] for v in values)),
+                    )
+        return int(data.get("totalCount") or 0), brands, price_range
+
+    def plan(self, category):
+        """[(filters, count)] of disjoint shards covering the category"""
+        self.open_session(category)
+        total, brands, price_range = self.probe(category, {})
+        self.totals[category] = total
+        if total <= self.max_results:
+            return [({}, total)]
+
+        price_range = price_range or PRICE_RANGE
+        if sum(brands.values()) < total:
+            # Products of unlisted brands would fall between brand shards
+            return self.split_price(category, {}, price_range, total)
+
+        shards = []
+        for brand, count in sorted(brands.items()):
+            filters = {"brand": brand}
+            if count <= self.max_results:
+                shards.append((filters, count))
+            else:
+                shards.extend(self.split_price(category, filters, price_range, count))
+        return shards
+
+    def split_price(self, category, filters, price_range, count):
+        low, high = price_range
+        if count <= self.max_results or low >= high:
+            # A single price point can't be split further; it is crawled as far
+            # as pagination reaches
+            return [(dict(filters, price=[low, high]), count)]
+
+        middle = (low + high) // 2
+        shards = []
+        for part in ((low, middle), (middle + 1, high)):
+            part_filters = dict(filters, price=list(part))
+            part_count, _, _ = self.probe(category, part_filters)
+            if part_count:
+                shards.extend(self.split_price(category, filters, part, part_count))
+        return shards
@@ -2,6 +2,90 @@ import json
 import os
 from datetime import datetime
 from itemadapter import ItemAdapter
+from scrapy.exceptions import DropItem, NotConfigured
+from myntra_crawler.alerts import AlertEngine, AlertIndex, AlertOutbox, load_rules
+from myntra_crawler.catalog_index import CatalogIndex
+from myntra_crawler.items import ProductItem, UserOrderItem
+from myntra_crawler.matching import NearDuplicateIndex
+from myntra_crawler.metrics import timed_stage
+from myntra_crawler.profiles import ProfileStore
+from myntra_crawler.pricehistory import PriceHistory
+from myntra_crawler.profiling import profiled_stage
+from myntra_crawler.records import (
+    OrderRecord,
+    ProductRecord,
+    order_record,
+    product_record,
+)
+from myntra_crawler.state import get_warm_state
+
+
+class NormalizeRecordsPipeline:
+    """Pipeline converting scraped Items into compact typed records"""
+
+    @timed_stage
+    @profiled_stage
+    def process_item(self, item, spider):
+        try:
+            if isinstance(item, ProductItem):
+                return product_record(item)
+            if isinstance(item, UserOrderItem):
+                return order_record(item)
+        except ValueError as e:
+            raise DropItem(f"Invalid item: {e}")
+        return item
+
+
+class NearDuplicatePipeline:
+    """Pipeline tagging each product with the canonical id of its near-duplicate group"""
+
+    def __init__(self, index, drop=False, path=None):
+        self.index = index
+        self.drop = drop
+        self.path = path
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("NEAR_DUPLICATES_ENABLED"):
+            raise NotConfigured
+
+        threshold = crawler.settings.getfloat("NEAR_DUPLICATES_THRESHOLD", 0.8)
+        max_products = crawler.settings.getint("NEAR_DUPLICATES_MAX_PRODUCTS", 100000)
+        path = crawler.settings.get("NEAR_DUPLICATES_PATH")
+
+        def load_index():
+            index = NearDuplicateIndex(threshold=threshold, max_products=max_products or None)
+            if path and os.path.exists(path):
+                index.load(path)
+            return index
+
+        # Groups persist between crawls, so a product keeps its canonical_id;
+        # runs inside the crawl daemon share the loaded index
+        index = get_warm_state(crawler).get(
+            f"near_duplicates:{path or crawler.spidercls.name}", load_index
+        )
+        return cls(index, crawler.settings.getbool("NEAR_DUPLICATES_DROP"), path)
+
+    def close_spider(self, spider):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.index.save(self.path)
+
+    @timed_stage
+    @profiled_stage
+    def process_item(self, item, spider):
+        if isinstance(item, ProductItem):
+            item = product_record(item)
+        if not isinstance(item, ProductRecord):
+            return item
+
+        item.canonical_id = self.index.add(item)
+        if self.drop and item.canonical_id != item.product_id:
+            raise DropItem(f"Near duplicate of {item.canonical_id}: {item.product_id}")
+        return item
 
 
 class JsonWriterPipeline:
@@ -19,29 +103,32 @@ class JsonWriterPipeline:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{data_dir}/{spider.name}_{timestamp}.json"
 
+        # Parallel workers each write their own part, merged after the run
+        worker_id = getattr(spider, "worker_id", None)
+        if worker_id is not None:
+            filename = f"{data_dir}/{spider.name}_{timestamp}_w{worker_id}.json"
+
         self.files[spider.name] = {
             "file": open(filename, "w", encoding="utf-8"),
             "filename": filename,
-            "items": [],
+            "count": 0,
         }
 
         spider.logger.info(f"Opened file: {filename}")
 
     def close_spider(self, spider):
-        """Close file and write all items"""
+        """Terminate the JSON array and close the file"""
         if spider.name in self.files:
             file_info = self.files[spider.name]
 
-            # Write all items to file
-            json.dump(
-                file_info["items"], file_info["file"], ensure_ascii=False, indent=4
-            )
-
+            file_info["file"].write("\n]" if file_info["count"] else "[]")
             file_info["file"].close()
             spider.logger.info(
-                f"Saved {len(file_info['items'])} items to {file_info['filename']}"
+                f"Saved {file_info['count']} items to {file_info['filename']}"
             )
 
+    @timed_stage
+    @profiled_stage
     def process_item(self, item, spider):
         """Process each item"""
         adapter = ItemAdapter(item)
@@ -49,9 +136,16 @@ class JsonWriterPipeline:
         # Add timestamp
         adapter["scraped_at"] = datetime.now().isoformat()
 
-        # Add to items list
+        # Stream the item into the JSON array instead of holding every item
+        # until the spider closes; the file layout matches json.dump(indent=4)
         if spider.name in self.files:
-            self.files[spider.name]["items"].append(dict(adapter))
+            file_info = self.files[spider.name]
+            encoded = json.dumps(dict(adapter), ensure_ascii=False, indent=4)
+            file_info["file"].write(
+                ("[\n    " if not file_info["count"] else ",\n    ")
+                + encoded.replace("\n", "\n    ")
+            )
+            file_info["count"] += 1
 
         return item
 
@@ -59,9 +153,17 @@ class JsonWriterPipeline:
 class DuplicatesPipeline:
     """Pipeline to filter out duplicate items"""
 
-    def __init__(self):
-        self.ids_seen = set()
+    def __init__(self, ids_seen=None):
+        self.ids_seen = set() if ids_seen is None else ids_seen
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        # Inside the crawl daemon seen ids persist across runs of a spider
+        key = f"ids_seen:{crawler.spidercls.name}"
+        return cls(get_warm_state(crawler).get(key, set))
 
+    @timed_stage
+    @profiled_stage
     def process_item(self, item, spider):
         adapter = ItemAdapter(item)
 
@@ -74,3 +176,175 @@ class DuplicatesPipeline:
         else:
             self.ids_seen.add(item_id)
             return item
+
+
+class CatalogIndexPipeline:
+    """Pipeline adding products to the persistent catalog search index"""
+
+    def __init__(self, index, flush_every=1000, shared=False):
+        self.index = index
+        self.flush_every = flush_every
+        self.shared = shared
+        self.unflushed = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get("CATALOG_INDEX_PATH")
+        if not path:
+            raise NotConfigured
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        # Runs inside the crawl daemon share one open index (a single writer)
+        index = get_warm_state(crawler).get(
+            f"catalog_index:{path}", lambda: CatalogIndex(path)
+        )
+        return cls(
+            index,
+            crawler.settings.getint("CATALOG_INDEX_FLUSH_EVERY", 1000),
+            shared=crawler.settings.get("WARM_STATE") is not None,
+        )
+
+    def close_spider(self, spider):
+        if self.shared:
+            self.index.flush()
+        else:
+            self.index.close()
+        spider.logger.info(f"Catalog index now holds {len(self.index)} products")
+
+    @timed_stage
+    @profiled_stage
+    def process_item(self, item, spider):
+        if isinstance(item, (ProductRecord, ProductItem)):
+            self.index.add(item)
+            self.unflushed += 1
+            if self.unflushed >= self.flush_every:
+                self.index.flush()
+                self.unflushed = 0
+        return item
+
+
+class PriceHistoryPipeline:
+    """Pipeline appending changed prices and ratings to the price history store"""
+
+    def __init__(self, history):
+        self.history = history
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get("PRICE_HISTORY_PATH")
+        if not path:
+            raise NotConfigured
+
+        # Runs inside the crawl daemon share one open store (a single writer)
+        history = get_warm_state(crawler).get(
+            f"price_history:{path}",
+            lambda: PriceHistory(path, crawler.settings.getint("PRICE_HISTORY_FLUSH_EVERY", 100000)),
+        )
+        return cls(history)
+
+    def close_spider(self, spider):
+        stored = self.history.flush()
+        spider.logger.info(
+            f"Price history: {stored} changed observations stored, {len(self.history)} products tracked"
+        )
+
+    @timed_stage
+    @profiled_stage
+    def process_item(self, item, spider):
+        if isinstance(item, (ProductRecord, ProductItem)):
+            self.history.add(item)
+        return item
+
+
+class PriceAlertPipeline:
+    """Pipeline matching products against users' watch rules and queuing alerts"""
+
+    def __init__(self, engine, stats=None):
+        self.engine = engine
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        rules_path = crawler.settings.get("WATCHLIST_PATH")
+        outbox_path = crawler.settings.get("ALERT_OUTBOX_PATH")
+        if not rules_path or not outbox_path or not os.path.exists(rules_path):
+            raise NotConfigured
+
+        directory = os.path.dirname(outbox_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        # Building the index for a large watchlist takes seconds; runs inside
+        # the crawl daemon reuse it until the watchlist file changes
+        index = get_warm_state(crawler).get(
+            f"alert_index:{rules_path}",
+            lambda: AlertIndex(load_rules(rules_path)),
+            version=os.path.getmtime(rules_path),
+        )
+        return cls(AlertEngine(index, AlertOutbox(outbox_path)), crawler.stats)
+
+    def open_spider(self, spider):
+        spider.logger.info(f"🔔 Watching {len(self.engine.index)} price alert rules")
+
+    def close_spider(self, spider):
+        self.engine.outbox.close()
+        if self.stats:
+            self.stats.set_value("alerts/matched", self.engine.matched)
+            self.stats.set_value("alerts/queued", self.engine.outbox.queued)
+        spider.logger.info(
+            f"🔔 {self.engine.matched} rule matches, {self.engine.outbox.queued} alerts queued"
+        )
+
+    @timed_stage
+    @profiled_stage
+    def process_item(self, item, spider):
+        if isinstance(item, ProductRecord):
+            self.engine.process(item)
+        elif isinstance(item, ProductItem):
+            try:
+                self.engine.process(product_record(item))
+            except (ValueError, TypeError):
+                pass
+        return item
+
+
+class UserProfilePipeline:
+    """Pipeline folding scraped orders into running per-user profiles"""
+
+    def __init__(self, store, shared=False):
+        self.store = store
+        self.shared = shared
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get("USER_PROFILES_PATH")
+        if not path:
+            raise NotConfigured
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        half_life = crawler.settings.getfloat("USER_PROFILE_HALF_LIFE_DAYS", 180)
+        store = get_warm_state(crawler).get(
+            f"user_profiles:{path}", lambda: ProfileStore(path, half_life)
+        )
+        return cls(store, shared=crawler.settings.get("WARM_STATE") is not None)
+
+    def close_spider(self, spider):
+        if self.shared:
+            self.store.flush()
+        else:
+            self.store.close()
+
+    @timed_stage
+    @profiled_stage
+    def process_item(self, item, spider):
+        if isinstance(item, UserOrderItem):
+            item = order_record(item)
+        if isinstance(item, OrderRecord):
+            self.store.add_order(item, getattr(spider, "user_id", None))
+        return item
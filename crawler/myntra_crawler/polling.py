@@ -0,0 +1,287 @@
+import json
+import os
+import sqlite3
+import time
+from myntra_crawler.snapshots import LIST_FIELDS, field_delta
+
+# Price and stock signals compared between polls; sizes stand in for stock
+POLL_FIELDS = ("price", "discount_price", "rating", "rating_count", "sizes")
+UNKNOWN = -1  # Offset of a product not located in its shard yet
+
+MIN_INTERVAL = 60.0  # Seconds
+MAX_INTERVAL = 3600.0
+
+
+def load_tracked(path):
+    """Product ids to poll, one per line (or comma-separated); # starts a comment"""
+    product_ids = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            product_ids.extend(part.strip() for part in line.split(",") if part.strip())
+    return list(dict.fromkeys(product_ids))
+
+
+def poll_values(record):
+    """The polled fields of a ProductRecord, lists sorted so they compare as sets"""
+    values = {}
+    for name in POLL_FIELDS:
+        value = getattr(record, name, None)
+        if name in LIST_FIELDS:
+            value = sorted(value or ())
+        values[name] = value
+    return values
+
+
+def next_interval(interval, changed, low=MIN_INTERVAL, high=MAX_INTERVAL):
+    """Halve the polling interval after a change, stretch it by half after none
+
+    A product settles around the rate it actually changes at: one that changes
+    every few minutes is polled every few minutes, one that never changes
+    drifts out to the maximum interval.
+    """
+    return min(high, max(low, interval / 2 if changed else interval * 1.5))
+
+
+class Tracked:
+    """Poll state of one product: where it is listed, its cadence and last values"""
+
+    __slots__ = (
+        "product_id", "category", "filters", "offset", "interval",
+        "next_due", "polls", "changes", "missed", "values",
+    )
+
+    def __init__(self, product_id, category, filters=None, offset=UNKNOWN, interval=MIN_INTERVAL,
+                 next_due=0.0, polls=0, changes=0, missed=0, values=None):
+        self.product_id = product_id
+        self.category = category
+        self.filters = filters or {}
+        self.offset = offset
+        self.interval = interval
+        self.next_due = next_due
+        self.polls = polls
+        self.changes = changes
+        self.missed = missed
+        self.values = values
+
+    @property
+    def shard(self):
+        """(category, filters JSON): the listing the product is searched in"""
+        return self.category, json.dumps(self.filters, sort_keys=True)
+
+    def row(self):
+        return (
+            self.product_id, self.category, json.dumps(self.filters, sort_keys=True), self.offset,
+            self.interval, self.next_due, self.polls, self.changes, self.missed,
+            json.dumps(self.values) if self.values is not None else None,
+        )
+
+
+class PollStore:
+    """Tracked products with their listing position and adaptive poll cadence
+
+    Each product remembers the shard (category plus brand filter) and offset
+    it was last listed at, so a poll round fetches just the pages holding due
+    products; every tracked product on a fetched page is refreshed with it.
+    State lives in memory and is written to a small SQLite file by flush(),
+    so cadences and baselines survive restarts.
+    """
+
+    def __init__(self, path, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL):
+        self.path = path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tracked (
+                product_id TEXT PRIMARY KEY,
+                category TEXT NOT NULL,
+                filters TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                interval REAL NOT NULL,
+                next_due REAL NOT NULL,
+                polls INTEGER NOT NULL,
+                changes INTEGER NOT NULL,
+                missed INTEGER NOT NULL,
+                vals TEXT
+            ) WITHOUT ROWID
+            """
+        )
+        self.products = {}
+        for row in self.conn.execute("SELECT * FROM tracked"):
+            product_id, category, filters, offset, interval, next_due, polls, changes, missed, values = row
+            self.products[product_id] = Tracked(
+                product_id, category, json.loads(filters), offset, interval, next_due,
+                polls, changes, missed, json.loads(values) if values else None,
+            )
+        self.active = {}
+        self.dirty = set()
+
+    def __len__(self):
+        return len(self.active)
+
+    def track(self, product_ids, category, known=None):
+        """Poll these products (and no others); returns how many are new
+
+        known maps product ids to stored ProductRecords, e.g. from the catalog
+        index: a known product is searched within its brand and category, and
+        its stored values are the baseline the first poll is compared with.
+        """
+        known = known or {}
+        added = 0
+        self.active = {}
+        for product_id in product_ids:
+            tracked = self.products.get(product_id)
+            if tracked is None:
+                record = known.get(product_id)
+                if record is not None:
+                    tracked = Tracked(
+                        product_id,
+                        record.category or category,
+                        {"brand": record.brand} if record.brand else {},
+                        values=poll_values(record),
+                    )
+                else:
+                    tracked = Tracked(product_id, category)
+                tracked.interval = self.min_interval
+                self.products[product_id] = tracked
+                self.dirty.add(product_id)
+                added += 1
+            self.active[product_id] = tracked
+        return added
+
+    def due(self, now=None, slack=None):
+        """Products due now, or within slack seconds (default half the minimum interval)
+
+        Pulling nearly-due products forward batches them into fewer rounds that
+        share their page fetches.
+        """
+        now = time.time() if now is None else now
+        cutoff = now + (self.min_interval / 2 if slack is None else slack)
+        return [tracked for tracked in self.active.values() if tracked.next_due <= cutoff]
+
+    def next_due(self):
+        return min((tracked.next_due for tracked in self.active.values()), default=None)
+
+    def plan(self, due, rows):
+        """Requests for a round: ({(shard, page offset): [ids]}, {shard: [ids]} to locate)"""
+        pages = {}
+        locate = {}
+        for tracked in due:
+            if tracked.offset == UNKNOWN:
+                locate.setdefault(tracked.shard, []).append(tracked.product_id)
+            else:
+                key = (tracked.shard, tracked.offset // rows * rows)
+                pages.setdefault(key, []).append(tracked.product_id)
+        return pages, locate
+
+    def observe(self, record, category, filters, offset, now=None):
+        """Record a polled product; returns {field: delta} if it changed, else None
+
+        Products that aren't tracked return None too. The first sighting of a
+        product without a baseline only stores its values.
+        """
+        tracked = self.active.get(record.product_id)
+        if tracked is None:
+            return None
+        now = time.time() if now is None else now
+        values = poll_values(record)
+        changes = {}
+        if tracked.values is not None:
+            for name in POLL_FIELDS:
+                delta = field_delta(name, tracked.values.get(name), values[name])
+                if delta is not None:
+                    changes[name] = delta
+
+        tracked.category = category
+        tracked.filters = filters or {}
+        tracked.offset = offset
+        tracked.values = values
+        tracked.polls += 1
+        tracked.missed = 0
+        if changes:
+            tracked.changes += 1
+        tracked.interval = next_interval(
+            tracked.interval, bool(changes), self.min_interval, self.max_interval
+        )
+        tracked.next_due = now + tracked.interval
+        self.dirty.add(tracked.product_id)
+        return changes or None
+
+    def missed(self, product_id, relocate=False, now=None):
+        """A product wasn't where it was expected
+
+        Off its remembered page it has moved, and is searched for across its
+        shard in the next round. Not found anywhere in the shard it is retried
+        at the maximum interval, as it may have sold out or been delisted.
+        """
+        tracked = self.active.get(product_id)
+        if tracked is None:
+            return
+        now = time.time() if now is None else now
+        tracked.missed += 1
+        if relocate:
+            tracked.offset = UNKNOWN
+            tracked.next_due = now
+        else:
+            tracked.next_due = now + self.max_interval
+        self.dirty.add(product_id)
+
+    def failed(self, product_ids, now=None):
+        """A fetch for these products failed: retry them after their usual interval
+
+        Their page and cadence are kept; only the next poll is pushed back, so a
+        failing page isn't refetched round after round.
+        """
+        now = time.time() if now is None else now
+        for product_id in product_ids:
+            tracked = self.active.get(product_id)
+            if tracked is None:
+                continue
+            tracked.next_due = now + tracked.interval
+            self.dirty.add(product_id)
+
+    def flush(self):
+        if not self.dirty:
+            return
+        rows = [self.products[product_id].row() for product_id in self.dirty]
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO tracked VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.dirty.clear()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def stats(self):
+        active = list(self.active.values())
+        intervals = sorted(tracked.interval for tracked in active)
+        return {
+            "tracked": len(active),
+            "located": sum(1 for tracked in active if tracked.offset != UNKNOWN),
+            "median_interval_s": intervals[len(intervals) // 2] if intervals else None,
+            "polls": sum(tracked.polls for tracked in active),
+            "changes": sum(tracked.changes for tracked in active),
+        }
+
+
+def open_poll_store(settings):
+    path = settings.get("POLL_STATE_PATH")
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    return PollStore(
+        path,
+        settings.getfloat("POLL_MIN_INTERVAL", MIN_INTERVAL),
+        settings.getfloat("POLL_MAX_INTERVAL", MAX_INTERVAL),
+    )
@@ -0,0 +1,359 @@
+import json
+import os
+import time
+from datetime import datetime
+import numpy as np
+from myntra_crawler.jsonstream import iter_json_array
+from myntra_crawler.records import ProductRecord, product_record
+
+MISSING = -1  # Stored for absent prices, ratings and counts
+FLUSH_EVERY = 100000  # Observations buffered before a segment is written
+
+# One observation; rows of a segment are sorted by (product, dt) so each
+# product's observations form one contiguous chunk
+OBSERVATION = np.dtype(
+    [
+        ("product", "<i4"),  # Dense index into ids.txt
+        ("dt", "<u4"),  # Seconds since the segment's base time
+        ("price", "<i4"),  # Paise
+        ("discount_price", "<i4"),
+        ("rating", "<i2"),  # Hundredths of a star
+        ("rating_count", "<i4"),
+    ]
+)
+
+# Last known values per product, indexed by product
+LATEST = np.dtype(
+    [
+        ("changed", "<f8"),  # Time of the last stored observation
+        ("seen", "<f8"),  # Time the product was last observed at all
+        ("price", "<i4"),
+        ("discount_price", "<i4"),
+        ("rating", "<i2"),
+        ("rating_count", "<i4"),
+    ]
+)
+
+VALUES = ("price", "discount_price", "rating", "rating_count")
+
+
+def observation_time(scraped_at):
+    if scraped_at:
+        try:
+            return datetime.fromisoformat(scraped_at).timestamp()
+        except (TypeError, ValueError):
+            pass
+    return time.time()
+
+
+def effective(values):
+    """Price paid (the smaller of price and discount price that is set) of a structured array
+
+    As catalog_index.effective_price: price holds the selling price and
+    discount_price the MRP. MISSING where neither is set.
+    """
+    price, discount = values["price"], values["discount_price"]
+    lower = np.where((price > 0) & (discount > 0), np.minimum(price, discount), price)
+    return np.where(price > 0, lower, discount)
+
+
+class PriceHistory:
+    """Append-only time series of product prices and ratings
+
+    An observation is stored only when price, discount price, rating or rating
+    count differ from the product's last stored values. Buffered observations
+    are written as immutable segments: one numpy file of fixed-width rows,
+    timestamps as offsets from the segment's base time, prices as int32 paise,
+    sorted so every product's rows are one contiguous chunk, plus a small
+    index of chunk starts. Segments are memory-mapped for reads and compact()
+    merges them into one. Last known values of every product are kept in
+    latest.npy for change detection and whole-catalog queries.
+    """
+
+    def __init__(self, path, flush_every=FLUSH_EVERY):
+        self.path = path
+        self.flush_every = flush_every
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        self.manifest = {"segments": [], "products": 0}
+        manifest_path = os.path.join(path, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+
+        self.ids = []
+        ids_path = os.path.join(path, "ids.txt")
+        if os.path.exists(ids_path):
+            with open(ids_path, encoding="utf-8") as f:
+                # Lines past the manifest's count belong to an interrupted flush
+                self.ids = [line.rstrip("\n") for _, line in zip(range(self.manifest["products"]), f)]
+        self.index = {product_id: i for i, product_id in enumerate(self.ids)}
+        self.new_ids = []
+
+        latest_path = os.path.join(path, "latest.npy")
+        if os.path.exists(latest_path):
+            self.latest = np.load(latest_path)[: len(self.ids)].copy()
+        else:
+            self.latest = np.zeros(0, dtype=LATEST)
+        self.segments = {}
+        self.pending = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def product_index(self, product_id):
+        index = self.index.get(product_id)
+        if index is None:
+            index = len(self.ids)
+            self.index[product_id] = index
+            self.ids.append(product_id)
+            self.new_ids.append(product_id)
+        return index
+
+    def observe(self, product_id, price=None, discount_price=None, rating=None, rating_count=None, at=None):
+        """Buffer one observation; unchanged values are dropped when the buffer is flushed
+
+        Values are converted here, so a bad one (e.g. "1,299" from a raw dump)
+        raises ValueError before anything is buffered instead of failing the
+        whole buffer at flush time.
+        """
+        values = (
+            float(at) if at is not None else time.time(),
+            MISSING if price is None else int(price),
+            MISSING if discount_price is None else int(discount_price),
+            MISSING if rating is None else int(round(float(rating) * 100)),
+            MISSING if rating_count is None else int(rating_count),
+        )
+        self.pending.append((self.product_index(str(product_id)), *values))
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def add(self, item):
+        """Observe a ProductRecord, ProductItem or normalized output dict"""
+        if isinstance(item, ProductRecord):
+            values = {name: getattr(item, name) for name in ("product_id", "scraped_at", *VALUES)}
+        else:
+            values = getattr(item, "_values", item)
+        if not values.get("product_id"):
+            return
+        self.observe(
+            values["product_id"],
+            values.get("price"),
+            values.get("discount_price"),
+            values.get("rating"),
+            values.get("rating_count"),
+            observation_time(values.get("scraped_at")),
+        )
+
+    def flush(self):
+        """Write buffered changes as a new segment and update the latest values"""
+        if not self.pending:
+            return 0
+        columns = list(zip(*self.pending))
+        products = np.array(columns[0], dtype=np.int64)
+        times = np.array(columns[1], dtype=np.float64)
+        values = {
+            name: np.array(column, dtype=OBSERVATION[name])
+            for name, column in zip(VALUES, columns[2:])
+        }
+        # Cleared only once converted: a failure leaves the buffer to retry
+        self.pending = []
+
+        if len(self.latest) < len(self.ids):
+            grown = np.zeros(len(self.ids), dtype=LATEST)
+            grown[: len(self.latest)] = self.latest
+            grown["changed"][len(self.latest):] = -1
+            self.latest = grown
+
+        order = np.lexsort((times, products))
+        products, times = products[order], times[order]
+        values = {name: column[order] for name, column in values.items()}
+
+        # Each row is compared with the row before it for the same product, or
+        # with the stored latest values for the product's first row
+        first = np.ones(len(products), dtype=bool)
+        first[1:] = products[1:] != products[:-1]
+        changed = first & (self.latest["changed"][products] < 0)
+        for name, column in values.items():
+            previous = np.empty_like(column)
+            previous[1:] = column[:-1]
+            previous[first] = self.latest[name][products[first]]
+            changed |= column != previous
+
+        last = np.ones(len(products), dtype=bool)
+        last[:-1] = products[1:] != products[:-1]
+        self.latest["seen"][products[last]] = times[last]
+        for name, column in values.items():
+            self.latest[name][products[last]] = column[last]
+        kept = np.flatnonzero(changed)
+        if len(kept):
+            # Last change time per product: the latest kept row of each
+            kept_products = products[kept]
+            final = np.ones(len(kept), dtype=bool)
+            final[:-1] = kept_products[1:] != kept_products[:-1]
+            self.latest["changed"][kept_products[final]] = times[kept][final]
+
+            base = int(times[kept].min())
+            rows = np.zeros(len(kept), dtype=OBSERVATION)
+            rows["product"] = kept_products
+            rows["dt"] = (times[kept] - base).astype(np.uint32)
+            for name, column in values.items():
+                rows[name] = column[kept]
+            name = f"seg_{int(time.time() * 1000)}_{len(self.manifest['segments']):05d}"
+            self.manifest["segments"].append(self.write_segment(name, rows, base))
+
+        self.save_state()
+        return len(kept)
+
+    def save_state(self):
+        if self.new_ids:
+            with open(os.path.join(self.path, "ids.txt"), "a", encoding="utf-8") as f:
+                f.writelines(f"{product_id}\n" for product_id in self.new_ids)
+            self.new_ids = []
+        # Readers keep their open latest.npy/manifest; the new ones replace them whole
+        tmp = os.path.join(self.path, "latest.tmp.npy")
+        np.save(tmp, self.latest)
+        os.replace(tmp, os.path.join(self.path, "latest.npy"))
+        self.manifest["products"] = len(self.ids)
+        tmp = os.path.join(self.path, "manifest.tmp.json")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, os.path.join(self.path, "manifest.json"))
+
+    def close(self):
+        self.flush()
+
+    def segment(self, entry):
+        """Memory-mapped rows and chunk index of a segment"""
+        segment = self.segments.get(entry["file"])
+        if segment is None:
+            segment = (
+                np.load(os.path.join(self.path, entry["file"]), mmap_mode="r"),
+                np.load(os.path.join(self.path, entry["index"]), mmap_mode="r"),
+            )
+            self.segments[entry["file"]] = segment
+        return segment
+
+    def history(self, product_id):
+        """Stored observations of one product, oldest first, as a structured array with absolute times"""
+        index = self.index.get(str(product_id))
+        chunks = []
+        if index is not None:
+            for entry in self.manifest["segments"]:
+                rows, chunk_index = self.segment(entry)
+                products, starts = chunk_index
+                position = np.searchsorted(products, index)
+                if position < len(products) and products[position] == index:
+                    end = starts[position + 1] if position + 1 < len(starts) else len(rows)
+                    chunk = rows[starts[position] : end]
+                    chunks.append((entry["base"] + chunk["dt"].astype(np.float64), chunk))
+        dtype = [("time", "<f8")] + [(name, OBSERVATION[name]) for name in VALUES]
+        result = np.zeros(sum(len(chunk) for _, chunk in chunks), dtype=dtype)
+        position = 0
+        for times, chunk in chunks:
+            part = result[position : position + len(chunk)]
+            part["time"] = times
+            for name in VALUES:
+                part[name] = chunk[name]
+            position += len(chunk)
+        return result[np.argsort(result["time"], kind="stable")]
+
+    def as_of(self, timestamp):
+        """Values of every product at a point in time; `changed` is -1 for products not yet seen"""
+        result = np.zeros(len(self.ids), dtype=LATEST)
+        result["changed"] = -1
+        for entry in self.manifest["segments"]:
+            if entry["base"] > timestamp:
+                continue
+            rows, _ = self.segment(entry)
+            mask = rows["dt"] <= timestamp - entry["base"]
+            if not mask.any():
+                continue
+            rows = rows[mask]
+            times = entry["base"] + rows["dt"].astype(np.float64)
+            # Rows are sorted by (product, dt): the last row per product is its latest
+            last = np.ones(len(rows), dtype=bool)
+            last[:-1] = rows["product"][1:] != rows["product"][:-1]
+            products = rows["product"][last]
+            newer = times[last] >= result["changed"][products]
+            products = products[newer]
+            result["changed"][products] = times[last][newer]
+            for name in VALUES:
+                result[name][products] = rows[name][last][newer]
+        return result
+
+    def price_drops(self, since, min_drop=0.2, until=None):
+        """(product ids, old prices, new prices) of products whose price fell by min_drop or more
+
+        Prices are effective prices in paise; the old price is the one in
+        effect at `since`, the new one at `until` (default: the latest values).
+        """
+        before = self.as_of(since)
+        after = self.as_of(until) if until is not None else self.latest
+        old, new = effective(before), effective(after)
+        known = (before["changed"] >= 0) & (old > 0) & (new > 0)
+        dropped = known & (new <= old * (1 - min_drop))
+        indexes = np.flatnonzero(dropped)
+        return [self.ids[i] for i in indexes], old[indexes], new[indexes]
+
+    def compact(self):
+        """Merge all segments into one, keeping each product's rows contiguous"""
+        if len(self.manifest["segments"]) < 2:
+            return
+        parts = []
+        for entry in self.manifest["segments"]:
+            rows = np.array(self.segment(entry)[0])
+            times = entry["base"] + rows["dt"].astype(np.int64)
+            parts.append((rows, times))
+        rows = np.concatenate([part for part, _ in parts])
+        times = np.concatenate([part for _, part in parts])
+        base = int(times.min())
+        rows["dt"] = (times - base).astype(np.uint32)
+        rows = rows[np.lexsort((rows["dt"], rows["product"]))]
+
+        old = self.manifest["segments"]
+        name = f"seg_{int(time.time() * 1000)}_compact"
+        self.manifest["segments"] = [self.write_segment(name, rows, base)]
+        self.save_state()
+        self.segments.clear()
+        for entry in old:
+            os.remove(os.path.join(self.path, entry["file"]))
+            os.remove(os.path.join(self.path, entry["index"]))
+
+    def write_segment(self, name, rows, base):
+        """Save sorted rows plus their chunk index: product indexes and chunk starts"""
+        products, starts = np.unique(rows["product"], return_index=True)
+        np.save(os.path.join(self.path, f"{name}.npy"), rows)
+        np.save(os.path.join(self.path, f"{name}.idx.npy"), np.stack([products, starts]).astype(np.int64))
+        return {"file": f"{name}.npy", "index": f"{name}.idx.npy", "base": base, "rows": len(rows)}
+
+    def stats(self):
+        rows = sum(entry["rows"] for entry in self.manifest["segments"])
+        size = sum(
+            os.path.getsize(os.path.join(self.path, entry["file"]))
+            for entry in self.manifest["segments"]
+        )
+        return {
+            "products": len(self.ids),
+            "observations": rows,
+            "segments": len(self.manifest["segments"]),
+            "segment_bytes": size,
+        }
+
+
+def record_file(history, path, normalize=False):
+    """Observe every product of a crawl output file, returning how many were read
+
+    normalize=True runs older dumps of raw items through product_record first.
+    """
+    count = 0
+    with open(path, encoding="utf-8") as f:
+        for item in iter_json_array(f):
+            try:
+                history.add(product_record(item) if normalize else item)
+            except (ValueError, TypeError):
+                continue
+            count += 1
+    history.flush()
+    return count
@@ -0,0 +1,340 @@
+import json
+import math
+import re
+import sqlite3
+import time
+import zlib
+from datetime import datetime
+from myntra_crawler.catalog_index import price_bucket
+from myntra_crawler.records import OrderRecord
+
+HALF_LIFE_DAYS = 180
+RESCALE_EXPONENT = 30.0  # Re-anchor decayed scores before exp() gets large
+RATING_WEIGHT = 0.5  # A 5-star order counts 1.5x towards affinities, 1-star 0.5x
+
+ISO_DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+NUMERIC_DATE_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+TEXT_DATE_RE = re.compile(r"(\d{1,2})(?:st|nd|rd|th)?\s+([A-Za-z]{3,9})\.?,?\s*(\d{4})?")
+MONTHS = {
+    name: number
+    for number, names in enumerate(
+        [("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"),
+         ("may",), ("jun", "june"), ("jul", "july"), ("aug", "august"),
+         ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"),
+         ("dec", "december")],
+        start=1,
+    )
+    for name in names
+}
+
+
+def parse_order_date(text, reference=None):
+    """Epoch seconds of an order date such as "2023-12-15" or "Delivered on Fri, 15 Dec"
+
+    Dates without a year take the year of `reference` (the scrape time), or the
+    year before when that would put them in the future. Returns None when no
+    date is recognised.
+    """
+    if not text:
+        return None
+    reference = reference or datetime.now()
+
+    match = ISO_DATE_RE.search(text)
+    if match:
+        year, month, day = (int(part) for part in match.groups())
+    else:
+        match = NUMERIC_DATE_RE.search(text)
+        if match:
+            day, month, year = (int(part) for part in match.groups())
+        else:
+            match = TEXT_DATE_RE.search(text)
+            if not match or match.group(2).lower() not in MONTHS:
+                return None
+            day, month = int(match.group(1)), MONTHS[match.group(2).lower()]
+            year = int(match.group(3)) if match.group(3) else reference.year
+            if not match.group(3) and (month, day) > (reference.month, reference.day):
+                year -= 1
+
+    try:
+        return datetime(year, month, day).timestamp()
+    except ValueError:
+        return None
+
+
+def order_timestamp(order):
+    """When an order was placed, falling back to when it was scraped"""
+    scraped = None
+    if order.scraped_at:
+        try:
+            scraped = datetime.fromisoformat(order.scraped_at)
+        except ValueError:
+            pass
+    timestamp = parse_order_date(order.order_date, scraped)
+    if timestamp is None:
+        timestamp = scraped.timestamp() if scraped else time.time()
+    return timestamp
+
+
+def label(value):
+    return value.strip().lower() if value else ""
+
+
+class UserProfile:
+    """Running aggregates over one user's orders
+
+    Brand and category affinities use forward exponential decay: each order adds
+    w * exp(rate * (t - anchor)) to a score, and reading the score at time `now`
+    multiplies by exp(-rate * (now - anchor)). Orders can arrive in any order
+    and adding one touches a constant number of counters. Which orders were
+    already counted is tracked by the ProfileStore, not the profile.
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.anchor = None
+        self.brands = {}
+        self.categories = {}
+        self.sizes = {}  # category -> size -> orders
+        self.price_bands = {}
+        self.orders = 0
+        self.spend = 0  # paise
+        self.ratings = 0
+        self.rating_sum = 0
+        self.positive = 0
+        self.negative = 0
+        self.reviews = 0
+        self.first_order = None
+        self.last_order = None
+
+    def __repr__(self):
+        return f"UserProfile({self.user_id}, {self.orders} orders)"
+
+    def rescale(self, anchor, rate):
+        factor = math.exp(-rate * (anchor - self.anchor))
+        for scores in (self.brands, self.categories):
+            for key in scores:
+                scores[key] *= factor
+        self.anchor = anchor
+
+    def add(self, order, timestamp, rate):
+        """Fold one order into the aggregates"""
+        if self.anchor is None:
+            self.anchor = timestamp
+        elif rate * (timestamp - self.anchor) > RESCALE_EXPONENT:
+            self.rescale(timestamp, rate)
+
+        rating = order.rating_given if order.rating_given and 1 <= order.rating_given <= 5 else None
+        weight = 1.0 + (RATING_WEIGHT * (rating - 3) / 2 if rating else 0.0)
+        weight *= math.exp(rate * (timestamp - self.anchor))
+
+        brand, category = label(order.brand), label(order.category)
+        if brand:
+            self.brands[brand] = self.brands.get(brand, 0.0) + weight
+        if category:
+            self.categories[category] = self.categories.get(category, 0.0) + weight
+        if order.size:
+            sizes = self.sizes.setdefault(category, {})
+            sizes[order.size] = sizes.get(order.size, 0) + 1
+
+        band = price_bucket(order.price)
+        if band:
+            self.price_bands[band] = self.price_bands.get(band, 0) + 1
+            self.spend += order.price
+
+        if rating:
+            self.ratings += 1
+            self.rating_sum += rating
+            self.positive += rating >= 4
+            self.negative += rating <= 2
+        if order.review_text:
+            self.reviews += 1
+
+        self.orders += 1
+        self.first_order = min(self.first_order or timestamp, timestamp)
+        self.last_order = max(self.last_order or timestamp, timestamp)
+
+    def affinities(self, scores, rate, now=None, top=10):
+        """Decayed scores at `now`, as shares of the total"""
+        if not scores:
+            return []
+        now = time.time() if now is None else now
+        factor = math.exp(-rate * (now - self.anchor))
+        total = sum(scores.values()) * factor
+        ranked = sorted(scores.items(), key=lambda pair: -pair[1])[:top]
+        return [(key, score * factor / total if total else 0.0) for key, score in ranked]
+
+    def summary(self, rate, now=None, top=10):
+        return {
+            "user_id": self.user_id,
+            "orders": self.orders,
+            "spend": self.spend,
+            "first_order": self.first_order,
+            "last_order": self.last_order,
+            "brands": self.affinities(self.brands, rate, now, top),
+            "categories": self.affinities(self.categories, rate, now, top),
+            "sizes": {
+                category: max(sizes, key=sizes.get) for category, sizes in self.sizes.items()
+            },
+            "size_distribution": self.sizes,
+            "price_bands": self.price_bands,
+            "rating_mean": self.rating_sum / self.ratings if self.ratings else None,
+            "sentiment": (self.positive - self.negative) / self.ratings if self.ratings else None,
+            "reviews": self.reviews,
+        }
+
+    def to_dict(self):
+        return {
+            "anchor": self.anchor,
+            "brands": self.brands,
+            "categories": self.categories,
+            "sizes": self.sizes,
+            "price_bands": self.price_bands,
+            "counts": [
+                self.orders, self.spend, self.ratings, self.rating_sum,
+                self.positive, self.negative, self.reviews,
+            ],
+            "first_order": self.first_order,
+            "last_order": self.last_order,
+        }
+
+    @classmethod
+    def from_dict(cls, user_id, data):
+        profile = cls(user_id)
+        profile.anchor = data["anchor"]
+        profile.brands = data["brands"]
+        profile.categories = data["categories"]
+        profile.sizes = data["sizes"]
+        profile.price_bands = data["price_bands"]
+        (
+            profile.orders, profile.spend, profile.ratings, profile.rating_sum,
+            profile.positive, profile.negative, profile.reviews,
+        ) = data["counts"]
+        profile.first_order = data["first_order"]
+        profile.last_order = data["last_order"]
+        return profile
+
+
+def load_orders(path):
+    """OrderRecords from a myntra_user_data output file"""
+    with open(path, encoding="utf-8") as f:
+        items = json.load(f)
+
+    fields = OrderRecord.__dataclass_fields__
+    return [
+        OrderRecord(**{k: v for k, v in item.items() if k in fields and v is not None})
+        for item in items
+        if item.get("order_id")
+    ]
+
+
+class ProfileStore:
+    """User profiles persisted in SQLite as zlib-compressed JSON, one row per user
+
+    Profiles are loaded on first use and cached; flush() writes the ones that
+    changed since the last flush. Counted order ids live in their own
+    (user_id, order_id) table, so a profile row stays the same size however
+    many orders it has seen; new ones are written in the same transaction as
+    the profiles they were folded into.
+    """
+
+    def __init__(self, path, half_life_days=HALF_LIFE_DAYS):
+        self.path = path
+        self.rate = math.log(2) / (half_life_days * 86400)
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS profiles (
+                user_id TEXT PRIMARY KEY,
+                updated REAL NOT NULL,
+                data BLOB NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS orders (
+                user_id TEXT NOT NULL,
+                order_id TEXT NOT NULL,
+                PRIMARY KEY (user_id, order_id)
+            ) WITHOUT ROWID
+            """
+        )
+        self.cache = {}
+        self.dirty = set()
+        self.new_orders = set()  # (user_id, order_id) counted since the last flush
+
+    def get(self, user_id):
+        profile = self.cache.get(user_id)
+        if profile is None:
+            row = self.conn.execute(
+                "SELECT data FROM profiles WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            if row:
+                profile = UserProfile.from_dict(user_id, json.loads(zlib.decompress(row[0])))
+            else:
+                profile = UserProfile(user_id)
+            self.cache[user_id] = profile
+        return profile
+
+    def add_order(self, order, user_id=None):
+        """Update the profile of the order's user; False if skipped or already counted"""
+        user_id = order.user_id or user_id
+        if not user_id:
+            return False
+        profile = self.get(user_id)
+        if self.counted(user_id, order.order_id):
+            return False
+        profile.add(order, order_timestamp(order), self.rate)
+        self.new_orders.add((user_id, order.order_id))
+        self.dirty.add(user_id)
+        return True
+
+    def counted(self, user_id, order_id):
+        if (user_id, order_id) in self.new_orders:
+            return True
+        row = self.conn.execute(
+            "SELECT 1 FROM orders WHERE user_id = ? AND order_id = ?", (user_id, order_id)
+        ).fetchone()
+        return row is not None
+
+    def summary(self, user_id, now=None, top=10):
+        return self.get(user_id).summary(self.rate, now, top)
+
+    def user_ids(self):
+        self.flush()
+        return [row[0] for row in self.conn.execute("SELECT user_id FROM profiles ORDER BY user_id")]
+
+    def flush(self):
+        if not self.dirty:
+            return
+        now = time.time()
+        rows = [
+            (
+                user_id,
+                now,
+                zlib.compress(
+                    json.dumps(self.cache[user_id].to_dict(), separators=(",", ":")).encode("utf-8")
+                ),
+            )
+            for user_id in self.dirty
+        ]
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO profiles (user_id, updated, data) VALUES (?, ?, ?)",
+                rows,
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO orders (user_id, order_id) VALUES (?, ?)", self.new_orders
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.dirty.clear()
+        self.new_orders.clear()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
@@ -0,0 +1,183 @@
+import cProfile
+import functools
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class SamplingProfiler:
+    """Sampled cProfile/stack/tracemalloc capture around spider callbacks and pipelines"""
+
+    def __init__(
+        self,
+        output_dir="data/profiles",
+        sample_rate=0.2,
+        interval=0.005,
+        memory=False,
+        memory_frames=25,
+    ):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.memory = memory
+        self.memory_frames = memory_frames
+
+        self.profile = cProfile.Profile()
+        self.stacks = Counter()
+        self.depth = 0
+        self.sections = 0
+        self.flushes = 0
+        self.name = "crawl"
+
+        self._target_thread = None
+        self._sampler = None
+        self._running = False
+        self._last_snapshot = None
+
+    def start(self, name):
+        """Start the background stack sampler (and tracemalloc if requested)"""
+        self.name = name
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        self._target_thread = threading.get_ident()
+        self._running = True
+        self._sampler = threading.Thread(
+            target=self._sample_loop, name="profile-sampler", daemon=True
+        )
+        self._sampler.start()
+
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(self.memory_frames)
+
+    def stop(self):
+        self._running = False
+        if self._sampler:
+            self._sampler.join(timeout=1)
+            self._sampler = None
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def should_sample(self):
+        return random.random() < self.sample_rate
+
+    @contextmanager
+    def section(self):
+        """Profile the enclosed block; nested sections are folded into the outer one"""
+        self.depth += 1
+        if self.depth == 1:
+            self.sections += 1
+            self.profile.enable()
+        try:
+            yield
+        finally:
+            if self.depth == 1:
+                self.profile.disable()
+            self.depth -= 1
+
+    def _sample_loop(self):
+        while self._running:
+            time.sleep(self.interval)
+            if not self.depth:
+                continue
+
+            frame = sys._current_frames().get(self._target_thread)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                module = os.path.splitext(os.path.basename(code.co_filename))[0]
+                stack.append(f"{module}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def flush(self, reason="periodic"):
+        """Write the capture gathered since the last flush and start a fresh one"""
+        if not self.sections:
+            return []
+
+        self.flushes += 1
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        prefix = os.path.join(
+            self.output_dir, f"{self.name}_{timestamp}_{self.flushes:04d}"
+        )
+        written = []
+
+        profile, self.profile = self.profile, cProfile.Profile()
+        stats = pstats.Stats(profile)
+        stats.dump_stats(f"{prefix}.prof")
+        written.append(f"{prefix}.prof")
+
+        stacks, self.stacks = self.stacks, Counter()
+        with open(f"{prefix}.collapsed", "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        written.append(f"{prefix}.collapsed")
+
+        if self.memory and tracemalloc.is_tracing():
+            written.extend(self._write_memory(prefix))
+
+        self.sections = 0
+        return written
+
+    def _write_memory(self, prefix):
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+
+        # Allocation stacks weighted by bytes, also in collapsed format
+        with open(f"{prefix}.alloc.collapsed", "w", encoding="utf-8") as f:
+            for stat in snapshot.statistics("traceback"):
+                frames = [
+                    f"{os.path.splitext(os.path.basename(fr.filename))[0]}:{fr.lineno}"
+                    for fr in reversed(stat.traceback)
+                ]
+                f.write(f"{';'.join(frames)} {stat.size}\n")
+
+        # Top growing allocation sites since the previous flush
+        with open(f"{prefix}.alloc.txt", "w", encoding="utf-8") as f:
+            if self._last_snapshot is not None:
+                top = snapshot.compare_to(self._last_snapshot, "lineno")[:25]
+            else:
+                top = snapshot.statistics("lineno")[:25]
+            for stat in top:
+                f.write(f"{stat}\n")
+
+        self._last_snapshot = snapshot
+        return [f"{prefix}.alloc.collapsed", f"{prefix}.alloc.txt"]
+
+
+def get_profiler(crawler):
+    """Return the profiler attached to a crawler, creating it on first use"""
+    profiler = getattr(crawler, "profiler", None)
+    if profiler is None:
+        settings = crawler.settings
+        profiler = SamplingProfiler(
+            output_dir=settings.get("PROFILE_DIR", "data/profiles"),
+            sample_rate=settings.getfloat("PROFILE_SAMPLE_RATE", 0.2),
+            interval=settings.getfloat("PROFILE_SAMPLE_INTERVAL", 0.005),
+            memory=settings.getbool("PROFILE_MEMORY"),
+        )
+        crawler.profiler = profiler
+    return profiler
+
+
+def profiled_stage(process_item):
+    """Decorator sampling an item pipeline's process_item into the crawl profiler"""
+
+    @functools.wraps(process_item)
+    def wrapper(self, item, spider):
+        profiler = getattr(getattr(spider, "crawler", None), "profiler", None)
+        if profiler is None or not profiler.should_sample():
+            return process_item(self, item, spider)
+
+        with profiler.section():
+            return process_item(self, item, spider)
+
+    return wrapper
@@ -0,0 +1,202 @@
+import re
+import sys
+from dataclasses import dataclass, fields
+
+# Compiled once; every item goes through these
+NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+COUNT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*([kKmMlL]?)")
+COUNT_SUFFIXES = {"": 1, "k": 1000, "l": 100000, "m": 1000000}
+
+
+def to_paise(value):
+    """Rupee amount (number or text like "Rs. 1,999.50") to integer paise"""
+    if value is None or value == "" or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(round(value * 100))
+    match = NUMBER_RE.search(str(value).replace(",", ""))
+    return int(round(float(match.group()) * 100)) if match else None
+
+
+def to_float(value):
+    if value is None or value == "" or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = NUMBER_RE.search(str(value))
+    return float(match.group()) if match else None
+
+
+def to_count(value):
+    """Counts such as 1250, "1,250" or "1.2k" to int"""
+    if value is None or value == "" or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = COUNT_RE.search(str(value).replace(",", ""))
+    if not match:
+        return None
+    number, suffix = match.groups()
+    return int(float(number) * COUNT_SUFFIXES[suffix.lower()])
+
+
+def to_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        value = value.get("name", "")  # e.g. JSON-LD brand objects
+    return str(value).strip()
+
+
+def to_label(value):
+    """Low-cardinality text (brand, category, size) shared between records"""
+    return sys.intern(to_text(value))
+
+
+def to_id(value):
+    return str(value).strip() if value not in (None, "") else None
+
+
+def to_labels(value):
+    """List or comma-separated text to a tuple of interned labels"""
+    if not value:
+        return ()
+    if isinstance(value, str):
+        value = value.split(",")
+    return tuple(sys.intern(str(v).strip()) for v in value if str(v).strip())
+
+
+def to_urls(value):
+    """Image lists of URLs or {"src": url} objects to a tuple of URLs"""
+    if not value:
+        return ()
+    if isinstance(value, (str, dict)):
+        value = [value]
+    urls = []
+    for entry in value:
+        if isinstance(entry, dict):
+            entry = entry.get("src") or entry.get("url")
+        if entry:
+            urls.append(str(entry))
+    return tuple(urls)
+
+
+def keep(value):
+    return value
+
+
+@dataclass(slots=True)
+class ProductRecord:
+    """Normalized product: prices in integer paise, typed ratings, interned labels"""
+
+    product_id: str
+    name: str = ""
+    brand: str = ""
+    price: int = None
+    discount_price: int = None
+    rating: float = None
+    rating_count: int = None
+    category: str = ""
+    subcategory: str = ""
+    images: tuple = ()
+    sizes: tuple = ()
+    colors: tuple = ()
+    description: str = ""
+    product_url: str = ""
+    scraped_at: str = None
+    raw_data: dict = None
+    trace_id: str = None
+    canonical_id: str = None
+
+
+@dataclass(slots=True)
+class OrderRecord:
+    """Normalized order history entry"""
+
+    order_id: str
+    user_id: str = None
+    product_id: str = None
+    product_name: str = ""
+    brand: str = ""
+    price: int = None
+    order_date: str = ""
+    delivery_date: str = ""
+    size: str = ""
+    color: str = ""
+    category: str = ""
+    rating_given: int = None
+    review_text: str = ""
+    scraped_at: str = None
+    raw_data: dict = None
+    trace_id: str = None
+
+
+PRODUCT_CONVERTERS = {
+    "product_id": to_id,
+    "name": to_text,
+    "brand": to_label,
+    "price": to_paise,
+    "discount_price": to_paise,
+    "rating": to_float,
+    "rating_count": to_count,
+    "category": to_label,
+    "subcategory": to_label,
+    "images": to_urls,
+    "sizes": to_labels,
+    "colors": to_labels,
+    "description": to_text,
+    "product_url": to_text,
+    "scraped_at": keep,
+    "raw_data": keep,
+    "trace_id": keep,
+    "canonical_id": to_id,
+}
+
+ORDER_CONVERTERS = {
+    "order_id": to_id,
+    "user_id": to_id,
+    "product_id": to_id,
+    "product_name": to_text,
+    "brand": to_label,
+    "price": to_paise,
+    "order_date": to_text,
+    "delivery_date": to_text,
+    "size": to_label,
+    "color": to_label,
+    "category": to_label,
+    "rating_given": to_count,
+    "review_text": to_text,
+    "scraped_at": keep,
+    "raw_data": keep,
+    "trace_id": keep,
+}
+
+# Every record field needs a converter; fail at import rather than per item
+assert set(PRODUCT_CONVERTERS) == {f.name for f in fields(ProductRecord)}
+assert set(ORDER_CONVERTERS) == {f.name for f in fields(OrderRecord)}
+
+
+def build_record(record_cls, converters, data, key):
+    # scrapy.Item keeps its fields in a plain dict; reading it directly skips
+    # the MutableMapping layer, which costs more than the conversions
+    values = getattr(data, "_values", data)
+    if to_id(values.get(key)) is None:
+        raise ValueError(f"{key} is required")
+
+    return record_cls(
+        **{
+            name: converters[name](value)
+            for name, value in values.items()
+            if value is not None and name in converters
+        }
+    )
+
+
+def product_record(data):
+    """Validate and normalize a ProductItem (or dict) into a ProductRecord"""
+    return build_record(ProductRecord, PRODUCT_CONVERTERS, data, "product_id")
+
+
+def order_record(data):
+    """Validate and normalize a UserOrderItem (or dict) into an OrderRecord"""
+    return build_record(OrderRecord, ORDER_CONVERTERS, data, "order_id")
@@ -0,0 +1,130 @@
+import random
+import re
+import time
+from urllib.parse import urlparse
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+SEARCH_PATH_RE = re.compile(r"/gateway/v\d+/search")
+PRODUCT_PATH_RE = re.compile(r"/buy/|/product/|/\d+/buy$")
+ACCOUNT_PATH_RE = re.compile(r"/my/|/login|/checkout")
+
+
+def endpoint_class(request):
+    """Endpoint class of a request: search, product, account or page
+
+    Retry budgets and circuit breakers are kept per class, so an outage of the
+    search gateway doesn't stop product pages (or the other way round).
+    request.meta["endpoint"] overrides the URL-based guess.
+    """
+    endpoint = request.meta.get("endpoint")
+    if endpoint:
+        return endpoint
+    path = urlparse(request.url).path
+    if SEARCH_PATH_RE.search(path):
+        return "search"
+    if PRODUCT_PATH_RE.search(path):
+        return "product"
+    if ACCOUNT_PATH_RE.search(path):
+        return "account"
+    return "page"
+
+
+def backoff_delay(attempt, base, cap):
+    """Full-jitter exponential backoff: uniform over [0, min(cap, base * 2**attempt)]"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class RetryBudget:
+    """Retries allowed as a fraction of successful traffic
+
+    Every success deposits `ratio` tokens and every retry withdraws one, so
+    retries can never exceed about ratio x successes plus the initial reserve.
+    The balance is capped, so a long healthy period doesn't bank a retry storm.
+    """
+
+    def __init__(self, ratio=0.2, reserve=10, cap=50):
+        self.ratio = ratio
+        self.cap = max(cap, reserve)
+        self.balance = float(reserve)
+        self.exhausted = 0
+
+    def deposit(self):
+        self.balance = min(self.cap, self.balance + self.ratio)
+
+    def withdraw(self):
+        if self.balance >= 1:
+            self.balance -= 1
+            return True
+        self.exhausted += 1
+        return False
+
+
+class CircuitBreaker:
+    """Pauses an endpoint after consecutive failures and probes before resuming
+
+    Closed: requests flow. After `failures` consecutive failures it opens and
+    holds every request for `cooldown` seconds. Then it lets one probe request
+    through (half-open). A successful probe closes it; a failed one reopens it
+    with the cooldown doubled, up to `max_cooldown`. A probe whose outcome
+    never comes back is given up after `probe_timeout` and another one sent.
+    """
+
+    def __init__(self, failures=10, cooldown=30.0, max_cooldown=300.0, probe_timeout=60.0,
+                 clock=time.monotonic):
+        self.failures = failures
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.probe_timeout = probe_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.consecutive = 0
+        self.cooldown = cooldown
+        self.opened_at = None
+        self.probing = False
+        self.probe_started = None
+        self.trips = 0
+
+    def wait_time(self):
+        """Seconds before a request may go out; 0 means now (claiming the probe slot if half-open)"""
+        if self.state == CLOSED:
+            return 0
+        if self.state == OPEN:
+            remaining = self.opened_at + self.cooldown - self.clock()
+            if remaining > 0:
+                return remaining
+            self.state = HALF_OPEN
+            self.probing = False
+        if self.probing and self.clock() - self.probe_started < self.probe_timeout:
+            return min(1.0, self.cooldown)
+        self.probing = True
+        self.probe_started = self.clock()
+        return 0
+
+    def release_probe(self):
+        """The probe ended without an outcome for the endpoint; let another one through"""
+        if self.state == HALF_OPEN:
+            self.probing = False
+
+    def record_success(self):
+        self.consecutive = 0
+        if self.state != CLOSED:
+            self.state = CLOSED
+            self.cooldown = self.base_cooldown
+            self.probing = False
+
+    def record_failure(self):
+        self.consecutive += 1
+        if self.state == HALF_OPEN:
+            self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            self.open()
+        elif self.state == CLOSED and self.consecutive >= self.failures:
+            self.open()
+
+    def open(self):
+        self.state = OPEN
+        self.opened_at = self.clock()
+        self.probing = False
+        self.trips += 1
@@ -0,0 +1,71 @@
+import heapq
+import time
+from itertools import count
+from scrapy.core.scheduler import Scheduler
+
+NOT_BEFORE = "retry_not_before"  # request.meta key: epoch seconds the request may go out at
+
+
+class DelayedRequestScheduler(Scheduler):
+    """Scheduler that holds back requests until the time in meta["retry_not_before"]
+
+    Backoff retries and requests to an endpoint whose circuit breaker is open
+    wait here rather than in the downloader, where a held request takes up one
+    of the CONCURRENT_REQUESTS slots and stalls every other endpoint. Once due
+    they go back through the engine into the regular queues. Held requests
+    count as pending, so the spider doesn't close while one is waiting.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delayed = []  # Heap of (not_before, sequence, request)
+        self.sequence = count()
+        self.wakeup = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        scheduler = super().from_crawler(crawler)
+        scheduler.crawler = crawler
+        return scheduler
+
+    def __len__(self):
+        return super().__len__() + len(self.delayed)
+
+    def enqueue_request(self, request):
+        not_before = request.meta.get(NOT_BEFORE, 0)
+        if not_before <= time.time():
+            return super().enqueue_request(request)
+        # Held requests come back from the downloader, so the dupefilter saw them already
+        heapq.heappush(self.delayed, (not_before, next(self.sequence), request))
+        self.stats.inc_value("scheduler/delayed")
+        self.schedule_wakeup()
+        return True
+
+    def schedule_wakeup(self):
+        from twisted.internet import reactor
+
+        wait = max(0.0, self.delayed[0][0] - time.time())
+        if self.wakeup is not None and self.wakeup.active():
+            if self.wakeup.getTime() - reactor.seconds() <= wait:
+                return
+            self.wakeup.cancel()
+        self.wakeup = reactor.callLater(wait, self.release)
+
+    def release(self):
+        """Hand due requests back to the engine, which queues them and wakes up"""
+        self.wakeup = None
+        now = time.time()
+        while self.delayed and self.delayed[0][0] <= now:
+            _, _, request = heapq.heappop(self.delayed)
+            self.crawler.engine.crawl(request)
+        if self.delayed:
+            self.schedule_wakeup()
+
+    def close(self, reason):
+        if self.wakeup is not None and self.wakeup.active():
+            self.wakeup.cancel()
+        # With a JOBDIR, held requests are persisted along with the rest
+        while self.delayed:
+            _, _, request = heapq.heappop(self.delayed)
+            super().enqueue_request(request)
+        return super().close(reason)
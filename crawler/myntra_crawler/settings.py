@@ -10,7 +10,13 @@ ROBOTSTXT_OBEY = False
 
 # Configure pipelines
 ITEM_PIPELINES = {
+    "myntra_crawler.pipelines.NormalizeRecordsPipeline": 100,
+    "myntra_crawler.pipelines.NearDuplicatePipeline": 200,
     "myntra_crawler.pipelines.JsonWriterPipeline": 300,
+    "myntra_crawler.pipelines.CatalogIndexPipeline": 400,
+    "myntra_crawler.pipelines.PriceHistoryPipeline": 405,
+    "myntra_crawler.pipelines.PriceAlertPipeline": 408,
+    "myntra_crawler.pipelines.UserProfilePipeline": 410,
 }
 
 # Configure delays and concurrent requests
@@ -24,7 +30,113 @@ USER_AGENT = "myntra_crawler (+http://www.yourdomain.com)"
 DOWNLOADER_MIDDLEWARES = {
     "scrapy.downloadermiddlewares.useragent.UserAgentMiddleware": None,
     "myntra_crawler.middlewares.RotateUserAgentMiddleware": 400,
+    "scrapy.downloadermiddlewares.retry.RetryMiddleware": None,
+    "myntra_crawler.middlewares.BackoffRetryMiddleware": 550,
+    "myntra_crawler.middlewares.SharedBudgetMiddleware": 900,
+    "myntra_crawler.middlewares.TracingDownloaderMiddleware": 950,
 }
+SPIDER_MIDDLEWARES = {
+    "myntra_crawler.middlewares.CallbackTimingMiddleware": 950,
+    "myntra_crawler.middlewares.ProfilingMiddleware": 960,
+    "myntra_crawler.middlewares.TracingSpiderMiddleware": 970,
+}
+
+# Retries: jittered exponential backoff, per-endpoint budgets and circuit breakers
+RETRY_BACKOFF_BASE = 1.0  # Seconds; attempt n waits up to BASE * 2**n
+RETRY_BACKOFF_MAX = 60.0
+RETRY_BUDGET_RATIO = 0.2  # Retries allowed per successful response, per endpoint
+RETRY_BUDGET_RESERVE = 10  # Retries available before any success
+CIRCUIT_BREAKER_FAILURES = 10  # Consecutive failures that pause an endpoint
+CIRCUIT_BREAKER_COOLDOWN = 30.0  # Seconds before a half-open probe, doubled per failed probe
+CIRCUIT_BREAKER_MAX_COOLDOWN = 300.0
+CIRCUIT_BREAKER_PROBE_TIMEOUT = 60.0  # Seconds before a probe without an outcome is given up
+# Backoff and open breakers hold requests in the scheduler, not in download slots
+SCHEDULER = "myntra_crawler.scheduler.DelayedRequestScheduler"
+
+# Product pages are deduplicated by product id, not URL (see dedup.py)
+REQUEST_FINGERPRINTER_CLASS = "myntra_crawler.dedup.ProductRequestFingerprinter"
+DUPEFILTER_CLASS = "myntra_crawler.dedup.ProductDupeFilter"
+PRODUCT_FRESHNESS_PATH = "data/fetched_products.sqlite"  # None disables recording
+PRODUCT_FRESHNESS_HOURS = 0  # Skip PDPs scraped within this many hours, 0 disables
+
+# Search API page size, probed per endpoint and remembered (see pagesize.py)
+PAGE_SIZE_PATH = "data/page_sizes.json"  # None re-probes every run
+PAGE_SIZE_CANDIDATES = [500, 200, 100, 50]  # Tried largest first; [50] disables tuning
+PAGE_SIZE_TTL_DAYS = 7
+
+# Metrics exporter (histograms served in Prometheus format on localhost)
+EXTENSIONS = {
+    "myntra_crawler.extensions.MetricsExtension": 500,
+    "myntra_crawler.extensions.ProfilingExtension": 510,
+    "myntra_crawler.extensions.WorkQueueExtension": 520,
+    "myntra_crawler.extensions.CostAccountingExtension": 530,
+}
+METRICS_ENABLED = True
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9410  # 0 disables the HTTP endpoint, summary is still logged
+
+# Crawl cost accounting: requests/bytes/retries per category and hop, one line
+# per run appended to COST_REPORT_PATH (see cost_report.py)
+COST_REPORT_PATH = "data/crawl_costs.jsonl"  # None disables accounting
+CRAWL_RELEASE = None  # Label runs are compared by; defaults to the git revision
+CRAWL_RUN_ID = None  # Shared by the workers of one parallel crawl
+
+# Sampled profiling (enable per run with `run_crawler.py --profile`)
+PROFILE_ENABLED = False
+PROFILE_DIR = "data/profiles"
+PROFILE_SAMPLE_RATE = 0.2  # Fraction of callbacks/pipeline calls profiled
+PROFILE_SAMPLE_INTERVAL = 0.005  # Stack sampling period in seconds
+PROFILE_EVERY_REQUESTS = 500  # Write a profile every N responses
+PROFILE_EVERY_SECONDS = 60  # ... or every N seconds
+PROFILE_MEMORY = False  # Also capture tracemalloc allocation sites
+
+# Request-chain tracing (spans written as JSONL, see trace_viewer.py)
+TRACING_ENABLED = False
+TRACING_DIR = "data/traces"
+
+# Multi-process crawling (set per worker by `run_crawler.py --workers N`)
+WORK_QUEUE_PATH = None  # SQLite file shared by all workers
+WORKER_ID = "0"
+WORK_QUEUE_LEASE = 300  # Seconds before an unfinished unit can be stolen
+SHARED_REQUESTS_PER_SECOND = 1.0  # Rate across all workers, 0 disables
+SHARED_REQUESTS_BURST = 1.0
+
+# Catalog search index, updated as products are scraped (see catalog_search.py)
+CATALOG_INDEX_PATH = "data/catalog_index.sqlite"  # None disables indexing
+CATALOG_INDEX_FLUSH_EVERY = 1000  # Products between writes to disk
+
+# Local read API over the catalog (`run_crawler.py serve`, see catalog_api.py)
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 8420
+SERVE_PRODUCT_CACHE = 100000  # Encoded products kept in the LRU cache
+SERVE_QUERY_CACHE = 10000  # List query result pages kept in the LRU cache
+SERVE_RELOAD_SECONDS = 5  # Shortest time between reloads after new crawl results
+
+# Price history: changed prices/ratings appended per product (see price_history.py)
+PRICE_HISTORY_PATH = "data/price_history"  # None disables the store
+PRICE_HISTORY_FLUSH_EVERY = 100000  # Observations buffered per segment
+
+# Price alerts: products matched against users' watch rules (see price_alerts.py)
+WATCHLIST_PATH = "data/watchlist.jsonl"  # Alerts are off while the file doesn't exist
+ALERT_OUTBOX_PATH = "data/alerts_outbox.sqlite"
+
+# Delta polling of tracked products between full crawls
+# (`run_crawler.py products --api --poll FILE`, see the myntra_api_poll spider)
+POLL_STATE_PATH = "data/poll_state.sqlite"  # Positions, cadences and last values
+POLL_MIN_INTERVAL = 60  # Seconds; a product that keeps changing is polled this often
+POLL_MAX_INTERVAL = 3600  # ... and one that never changes this often
+POLL_LOCATE_PAGES = 20  # Pages searched per shard for products not located yet
+
+# Near-duplicate products (same item under several URLs/categories or sites)
+NEAR_DUPLICATES_ENABLED = True
+NEAR_DUPLICATES_THRESHOLD = 0.8  # Estimated Jaccard similarity of title shingles
+NEAR_DUPLICATES_DROP = False  # Drop duplicates instead of only tagging canonical_id
+NEAR_DUPLICATES_PATH = "data/near_duplicates.npz"  # Groups kept between crawls (None: per run)
+NEAR_DUPLICATES_MAX_PRODUCTS = 100000  # Most recent products matched against (~2.5 KB each)
+
+# Per-user profiles aggregated from scraped orders (see user_profiles.py)
+USER_PROFILES_PATH = "data/user_profiles.sqlite"  # None disables profiles
+USER_PROFILE_HALF_LIFE_DAYS = 180  # Age at which an order's affinity weight halves
 
 # Configure cookies and sessions
 COOKIES_ENABLED = True
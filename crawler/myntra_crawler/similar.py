@@ -0,0 +1,292 @@
+import math
+import zlib
+import numpy as np
+from myntra_crawler.catalog_index import effective_price, tokenize
+from myntra_crawler.records import OrderRecord
+
+DIMENSIONS = 256  # Hashed feature space; 1M products take ~1 GB as float32
+FIELD_WEIGHTS = {"brand": 2.0, "name": 1.0, "category": 1.5, "color": 1.0, "price": 1.5}
+PRICE_BAND_WIDTH = 0.35  # Natural-log width of a price band (~x1.4 per band)
+CANDIDATES_PER_QUERY = 1000  # Rows kept per query, most LSH collisions first
+BRUTE_FORCE_ROWS = 65536  # Rows scored per block when LSH finds too few candidates
+
+
+def product_features(name, brand, category, colors, price):
+    """(feature, weight) pairs for one product or ordered item
+
+    The normalized price is encoded as a log-scale band plus its neighbours at
+    half weight, so products of similar price overlap even across band edges.
+    """
+    features = []
+    for token in set(tokenize(name)):
+        features.append(("name:" + token, FIELD_WEIGHTS["name"]))
+    if brand:
+        features.append(("brand:" + brand.strip().lower(), FIELD_WEIGHTS["brand"]))
+    if category:
+        features.append(("category:" + category.strip().lower(), FIELD_WEIGHTS["category"]))
+    for color in colors:
+        features.append(("color:" + color.strip().lower(), FIELD_WEIGHTS["color"]))
+    if price:
+        band = int(math.log(price / 100) / PRICE_BAND_WIDTH)
+        features.append((f"price:{band}", FIELD_WEIGHTS["price"]))
+        features.append((f"price:{band - 1}", FIELD_WEIGHTS["price"] / 2))
+        features.append((f"price:{band + 1}", FIELD_WEIGHTS["price"] / 2))
+    return features
+
+
+def record_features(record):
+    """Features of a ProductRecord, or of the item bought in an OrderRecord"""
+    if isinstance(record, OrderRecord):
+        colors = (record.color,) if record.color else ()
+        return product_features(
+            record.product_name, record.brand, record.category, colors, record.price
+        )
+    return product_features(
+        record.name, record.brand, record.category, record.colors, effective_price(record)
+    )
+
+
+def feature_slot(feature, dimensions):
+    """Stable bucket and sign of a feature (hash() is salted per process)"""
+    h = zlib.crc32(feature.encode("utf-8"))
+    return h % dimensions, 1.0 if h & 0x80000000 else -1.0
+
+
+class SimilarProducts:
+    """Hashing-trick TF-IDF vectors with a random-projection LSH index
+
+    Each product becomes a DIMENSIONS-wide vector of signed, field-weighted
+    hashed features. Every LSH table keys products by the sign pattern of `bits`
+    random projections; a query scores only the products sharing a bucket with
+    it in any table. IDF weights come from the running document frequency of
+    each hashed slot and are applied at scoring time, so adding products never
+    requires re-weighting the stored vectors.
+    """
+
+    def __init__(self, dimensions=DIMENSIONS, tables=24, bits=10, seed=7):
+        self.dimensions = dimensions
+        self.tables = tables
+        self.bits = bits
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((dimensions, tables * bits)).astype(np.float32)
+        self.bit_weights = (1 << np.arange(bits)).astype(np.int32)
+
+        self.vectors = np.zeros((1024, dimensions), dtype=np.float32)
+        self.codes = np.zeros((1024, tables), dtype=np.int32)
+        self.doc_freq = np.zeros(dimensions, dtype=np.int64)
+        self.product_ids = []
+        self.rows = {}
+        self.buckets = [{} for _ in range(tables)]
+        # Array copies of the buckets read by queries, dropped when a bucket changes
+        self.bucket_arrays = [{} for _ in range(tables)]
+
+    def __len__(self):
+        return len(self.product_ids)
+
+    def vectorize(self, records):
+        """Raw (un-IDF-weighted) feature matrix for records or orders"""
+        matrix = np.zeros((len(records), self.dimensions), dtype=np.float32)
+        for row, record in enumerate(records):
+            for feature, weight in record_features(record):
+                slot, sign = feature_slot(feature, self.dimensions)
+                matrix[row, slot] += sign * weight
+        return matrix
+
+    def hash(self, matrix):
+        """LSH bucket code of every row in every table, shape (rows, tables)"""
+        signs = (matrix @ self.planes > 0).reshape(len(matrix), self.tables, self.bits)
+        return signs.astype(np.int32) @ self.bit_weights
+
+    def idf(self):
+        return (np.log((1 + len(self)) / (1 + self.doc_freq)) + 1).astype(np.float32)
+
+    def grow(self, size):
+        if size <= len(self.vectors):
+            return
+        capacity = max(size, 2 * len(self.vectors))
+        vectors = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        vectors[: len(self)] = self.vectors[: len(self)]
+        codes = np.zeros((capacity, self.tables), dtype=np.int32)
+        codes[: len(self)] = self.codes[: len(self)]
+        self.vectors, self.codes = vectors, codes
+
+    def add(self, records, matrix=None):
+        """Insert or replace products (ProductRecords) in the index"""
+        if matrix is None:
+            matrix = self.vectorize(records)
+        codes = self.hash(matrix)
+        self.grow(len(self) + len(records))
+
+        for record, vector, code in zip(records, matrix, codes):
+            row = self.rows.get(record.product_id)
+            if row is None:
+                row = len(self.product_ids)
+                self.rows[record.product_id] = row
+                self.product_ids.append(record.product_id)
+            else:
+                self.doc_freq -= self.vectors[row] != 0
+                for table, old in enumerate(self.codes[row].tolist()):
+                    self.buckets[table][old].remove(row)
+                    self.bucket_arrays[table].pop(old, None)
+
+            self.vectors[row] = vector
+            self.codes[row] = code
+            self.doc_freq += vector != 0
+            for table, key in enumerate(code.tolist()):
+                self.buckets[table].setdefault(key, []).append(row)
+                self.bucket_arrays[table].pop(key, None)
+
+    def update(self, records):
+        """Add new products and replace those whose features changed; returns (added, replaced)"""
+        matrix = self.vectorize(records)
+        added, replaced = [], []
+        for i, record in enumerate(records):
+            row = self.rows.get(record.product_id)
+            if row is None:
+                added.append(i)
+            elif not np.array_equal(self.vectors[row], matrix[i]):
+                replaced.append(i)
+        changed = added + replaced
+        if changed:
+            self.add([records[i] for i in changed], matrix[changed])
+        return len(added), len(replaced)
+
+    def candidates(self, code):
+        """Rows sharing an LSH bucket with one query, most collisions first
+
+        Only the CANDIDATES_PER_QUERY rows colliding in the most tables are kept,
+        so dense regions of the catalog do not turn into a full scan.
+        """
+        hits = []
+        for table, key in enumerate(code.tolist()):
+            members = self.bucket_arrays[table].get(key)
+            if members is None:
+                members = np.array(self.buckets[table].get(key, ()), dtype=np.int64)
+                self.bucket_arrays[table][key] = members
+            hits.append(members)
+        rows = np.concatenate(hits)
+        if len(rows) <= CANDIDATES_PER_QUERY:
+            return np.unique(rows)
+        rows, collisions = np.unique(rows, return_counts=True)
+        if len(rows) > CANDIDATES_PER_QUERY:
+            rows = rows[np.argpartition(-collisions, CANDIDATES_PER_QUERY)[:CANDIDATES_PER_QUERY]]
+        return rows
+
+    def score(self, query, rows, idf):
+        """Cosine similarity of an IDF-weighted unit query to the given rows"""
+        block = self.vectors[rows] * idf
+        return (block @ query) / (np.linalg.norm(block, axis=1) + 1e-9)
+
+    def scan(self, query, idf):
+        """Similarity to every row, in blocks of BRUTE_FORCE_ROWS"""
+        scores = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), BRUTE_FORCE_ROWS):
+            rows = np.arange(start, min(start + BRUTE_FORCE_ROWS, len(self)))
+            scores[rows] = self.score(query, rows, idf)
+        return scores
+
+    def lookup(self, matrix, k):
+        """Top-k (rows, scores) for every query row of a feature matrix
+
+        Queries are weighted and hashed as one batch; each is then scored only
+        against its own LSH candidates, falling back to a blocked scan when its
+        buckets hold fewer than k products.
+        """
+        idf = self.idf()
+        queries = matrix * idf
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True) + 1e-9
+        codes = self.hash(matrix)
+
+        results = []
+        for query, code in zip(queries, codes):
+            rows = self.candidates(code)
+            if len(rows) < k:
+                rows = np.arange(len(self))
+                scores = self.scan(query, idf)
+            else:
+                scores = self.score(query, rows, idf)
+            if len(scores) > k:
+                top = np.argpartition(-scores, k)[:k]
+                rows, scores = rows[top], scores[top]
+            order = np.argsort(-scores)
+            results.append((rows[order], scores[order]))
+        return results
+
+    def query(self, records, k=10):
+        """Top-k similar products for each record, as [(product_id, score), ...]"""
+        if not len(self) or not records:
+            return [[] for _ in records]
+
+        results = []
+        for record, (rows, scores) in zip(records, self.lookup(self.vectorize(records), k + 1)):
+            hits = [
+                (self.product_ids[row], float(score))
+                for row, score in zip(rows.tolist(), scores.tolist())
+                if self.product_ids[row] != getattr(record, "product_id", None)
+            ]
+            results.append(hits[:k])
+        return results
+
+    def recommend(self, orders, k=10):
+        """Top-k products for a whole order history in one batched lookup
+
+        Each candidate keeps its best similarity to any ordered item; products
+        already bought are left out. Returns [(product_id, score, order_id)].
+        """
+        if not len(self) or not orders:
+            return []
+
+        # Use the catalog vector of a bought product when it is indexed
+        matrix = self.vectorize(orders)
+        for i, order in enumerate(orders):
+            row = self.rows.get(order.product_id)
+            if row is not None:
+                matrix[i] = self.vectors[row]
+
+        bought = {order.product_id for order in orders}
+        best = {}
+        for order, (rows, scores) in zip(orders, self.lookup(matrix, k + len(bought))):
+            for row, score in zip(rows.tolist(), scores.tolist()):
+                if row not in best or score > best[row][0]:
+                    best[row] = (score, order.order_id)
+
+        results = []
+        for row, (score, order_id) in sorted(best.items(), key=lambda pair: -pair[1][0]):
+            product_id = self.product_ids[row]
+            if product_id in bought:
+                continue
+            results.append((product_id, score, order_id))
+            if len(results) == k:
+                break
+        return results
+
+    def save(self, path):
+        count = len(self)
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                config=np.array([self.dimensions, self.tables, self.bits, self.seed]),
+                vectors=self.vectors[:count],
+                codes=self.codes[:count],
+                doc_freq=self.doc_freq,
+                product_ids=np.array(self.product_ids, dtype=str),
+            )
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        dimensions, tables, bits, seed = (int(v) for v in data["config"])
+        engine = cls(dimensions, tables, bits, seed)
+
+        count = len(data["product_ids"])
+        engine.grow(count)
+        engine.vectors[:count] = data["vectors"]
+        engine.codes[:count] = data["codes"]
+        engine.doc_freq = data["doc_freq"]
+        engine.product_ids = [str(product_id) for product_id in data["product_ids"]]
+        engine.rows = {product_id: row for row, product_id in enumerate(engine.product_ids)}
+        for row, code in enumerate(engine.codes[:count].tolist()):
+            for table, key in enumerate(code):
+                engine.buckets[table].setdefault(key, []).append(row)
+        return engine
@@ -0,0 +1,167 @@
+import heapq
+import json
+import os
+import shutil
+import tempfile
+from myntra_crawler.jsonstream import iter_json_array
+from myntra_crawler.records import product_record
+
+# Fields compared between snapshots; list fields are compared as sets
+DIFF_FIELDS = (
+    "name",
+    "brand",
+    "category",
+    "price",
+    "discount_price",
+    "rating",
+    "rating_count",
+    "sizes",
+    "colors",
+)
+LIST_FIELDS = {"sizes", "colors", "images"}
+NUMERIC_FIELDS = {"price", "discount_price", "rating", "rating_count"}
+RUN_ITEMS = 200000  # Products sorted in memory per spilled run
+
+ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def project(item, fields, normalize=False):
+    """(product_id, compact JSON of the compared fields) for one output entry"""
+    if normalize:
+        record = product_record(item)
+        product_id = record.product_id
+        values = {name: getattr(record, name, None) for name in fields}
+    else:
+        product_id = item.get("product_id")
+        if product_id in (None, ""):
+            return None, None
+        product_id = str(product_id)
+        values = {name: item.get(name) for name in fields}
+    for name in LIST_FIELDS.intersection(values):
+        if values[name]:
+            values[name] = sorted(values[name])
+    # Fixed key order, so identical products encode to identical strings
+    return product_id, ENCODER.encode(values)
+
+
+class SortedSnapshot:
+    """A crawl output, external-sorted by product_id
+
+    The output is streamed once; every RUN_ITEMS products the buffered
+    (product_id, position, projection) rows are sorted and spilled to a run
+    file, and iterating k-way merges the runs. Memory stays at one run plus one
+    line per run file however large the snapshot is. Products listed twice keep
+    their first entry, like merged worker outputs.
+    """
+
+    def __init__(self, path, fields=DIFF_FIELDS, run_items=RUN_ITEMS, tmp_dir=None, normalize=False):
+        self.path = path
+        self.fields = tuple(fields)
+        self.run_items = run_items
+        self.normalize = normalize
+        self.tmp_dir = tempfile.mkdtemp(prefix="snapshot_", dir=tmp_dir)
+        self.runs = []
+        self.seen = 0
+        self.products = 0
+        self.skipped = 0
+        self.duplicates = 0
+
+    def spill(self, buffer):
+        buffer.sort()
+        path = os.path.join(self.tmp_dir, f"run_{len(self.runs):05d}.tsv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(f"{key}\t{seq:012d}\t{value}\n" for key, seq, value in buffer)
+        self.runs.append(path)
+        buffer.clear()
+
+    def sort(self):
+        buffer = []
+        with open(self.path, encoding="utf-8") as f:
+            for item in iter_json_array(f):
+                try:
+                    key, value = project(item, self.fields, self.normalize)
+                except (ValueError, TypeError, AttributeError):
+                    key = None
+                if key is None:
+                    self.skipped += 1
+                    continue
+                # Tabs and newlines would break the run file line format
+                key = key.replace("\t", " ").replace("\n", " ")
+                buffer.append((key, self.seen, value))
+                self.seen += 1
+                if len(buffer) >= self.run_items:
+                    self.spill(buffer)
+        if buffer:
+            self.spill(buffer)
+        return self
+
+    def __iter__(self):
+        """(product_id, projection JSON) in product_id order, one per product"""
+        files = [open(path, encoding="utf-8") for path in self.runs]
+        try:
+            lines = heapq.merge(*files)
+            previous = None
+            for line in lines:
+                key, _, value = line.rstrip("\n").split("\t", 2)
+                if key == previous:
+                    self.duplicates += 1
+                    continue
+                previous = key
+                self.products += 1
+                yield key, value
+        finally:
+            for f in files:
+                f.close()
+
+    def cleanup(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+def field_delta(name, old, new):
+    """Per-field change description, or None if the values are equivalent"""
+    if name in LIST_FIELDS:
+        old_set, new_set = set(old or ()), set(new or ())
+        if old_set == new_set:
+            return None
+        return {"added": sorted(new_set - old_set), "removed": sorted(old_set - new_set)}
+    if old == new:
+        return None
+    change = {"old": old, "new": new}
+    if name in NUMERIC_FIELDS and old is not None and new is not None:
+        change["delta"] = round(new - old, 4)
+        if old:
+            change["pct"] = round((new - old) / old * 100, 2)
+    return change
+
+
+def diff_sorted(old, new):
+    """Merge-join two sorted (product_id, projection) streams
+
+    Yields ("added", id, new values), ("removed", id, old values) and
+    ("changed", id, {field: delta}). Unchanged products are recognised by
+    comparing the projection strings and never decoded.
+    """
+    sentinel = (None, None)
+    old_iter, new_iter = iter(old), iter(new)
+    old_key, old_value = next(old_iter, sentinel)
+    new_key, new_value = next(new_iter, sentinel)
+
+    while old_key is not None or new_key is not None:
+        if new_key is None or (old_key is not None and old_key < new_key):
+            yield "removed", old_key, json.loads(old_value)
+            old_key, old_value = next(old_iter, sentinel)
+        elif old_key is None or new_key < old_key:
+            yield "added", new_key, json.loads(new_value)
+            new_key, new_value = next(new_iter, sentinel)
+        else:
+            if old_value != new_value:
+                before, after = json.loads(old_value), json.loads(new_value)
+                changes = {}
+                for name in {**before, **after}:
+                    delta = field_delta(name, before.get(name), after.get(name))
+                    if delta is not None:
+                        changes[name] = delta
+                if changes:
+                    yield "changed", new_key, changes
+            old_key, old_value = next(old_iter, sentinel)
+            new_key, new_value = next(new_iter, sentinel)
@@ -0,0 +1,212 @@
+import os
+import json
+import time
+from datetime import datetime
+import scrapy
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider
+from myntra_crawler.catalog_index import read_records
+from myntra_crawler.items import ProductDeltaItem
+from myntra_crawler.jsonstream import StreamedResponse
+from myntra_crawler.polling import load_tracked, open_poll_store
+from myntra_crawler.records import product_record
+from myntra_crawler.spiders.myntra_api_products import MyntraAPIProductsSpider
+
+
+class MyntraAPIPollSpider(MyntraAPIProductsSpider):
+    """Polls a set of tracked products between full crawls, yielding only what changed
+
+    Each round fetches the search pages holding the products that are due, as
+    remembered by the PollStore, and every tracked product on a fetched page is
+    compared with its last values. Products not located yet (or moved) are
+    searched for page by page within their brand shard. Rounds keep running
+    until poll_for seconds have passed (0 polls until the crawl is stopped).
+    """
+
+    name = "myntra_api_poll"
+
+    def __init__(self, track=None, poll_for=0, category=None, base_url=None, *args, **kwargs):
+        super(MyntraAPIPollSpider, self).__init__(category, 0, base_url, *args, **kwargs)
+        if not track:
+            raise ValueError("myntra_api_poll needs track=<file of product ids>")
+        self.track = track
+        self.poll_for = float(poll_for)
+        self.started = time.time()
+        self.store = None
+        self.timer = None
+        self.rounds = 0
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(MyntraAPIPollSpider, cls).from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
+        crawler.signals.connect(spider.spider_closed, signal=signals.spider_closed)
+        return spider
+
+    def start_requests(self):
+        self.store = open_poll_store(self.settings)
+        product_ids = load_tracked(self.track)
+
+        # Products the catalog index already knows start with a shard and a baseline
+        known = {}
+        index_path = self.settings.get("CATALOG_INDEX_PATH")
+        new_ids = [product_id for product_id in product_ids if product_id not in self.store.products]
+        if new_ids and index_path and os.path.exists(index_path):
+            known = read_records(index_path, new_ids)
+        added = self.store.track(product_ids, self.category, known)
+        self.logger.info(
+            f"🎯 Polling {len(self.store)} products ({added} new, {len(known)} found in the catalog index)"
+        )
+        if not len(self.store):
+            return
+
+        yield self.make_session_request(self.category)
+
+    def parse_category_and_then_api(self, response):
+        self.logger.info(f"✅ Got session cookies from {response.url}")
+        self.session_established = True
+        yield from self.poll_round()
+
+    def poll_round(self):
+        """Requests for the pages holding every product that is due now"""
+        due = self.store.due()
+        if not due:
+            return
+        rows = self.page_size.rows_for(0)
+        pages, locate = self.store.plan(due, rows)
+        self.rounds += 1
+        self.crawler.stats.inc_value("poll/rounds")
+        self.logger.info(
+            f"🔁 Round {self.rounds}: {len(due)} due products on {len(pages)} pages, "
+            f"{sum(len(ids) for ids in locate.values())} to locate in {len(locate)} shards"
+        )
+        for (shard, offset), product_ids in pages.items():
+            yield self.make_poll_request(shard, offset, rows, product_ids)
+        for shard, product_ids in locate.items():
+            yield self.make_poll_request(shard, 0, rows, product_ids, locate=True)
+
+    def make_poll_request(self, shard, offset, rows, product_ids, locate=False):
+        category, filters = shard[0], json.loads(shard[1])
+        return scrapy.Request(
+            url=self.search_url(category, offset, rows, filters),
+            callback=self.parse_poll_page,
+            errback=self.poll_failed,
+            meta={
+                "category": category,
+                "filters": filters,
+                "offset": offset,
+                "rows": rows,
+                "expected": product_ids,
+                "locate": locate,
+                "step": "poll_locate" if locate else "poll_page",
+            },
+            headers=self.get_api_headers(),
+            dont_filter=True,
+        )
+
+    def parse_poll_page(self, response):
+        """Compare the tracked products on a page; expected ones not found are missed"""
+        meta = response.meta
+        if response.status != 200:
+            self.logger.error(f"❌ Poll page returned status {response.status}")
+            self.crawler.stats.inc_value("poll/failed")
+            self.store.failed(meta["expected"])
+            return
+
+        category, filters, offset = meta["category"], meta["filters"], meta["offset"]
+        stats = self.crawler.stats
+        stats.inc_value("poll/locate_pages" if meta["locate"] else "poll/pages")
+        now = time.time()
+        polled_at = datetime.now().isoformat()
+        expected = set(meta["expected"])
+
+        stream = StreamedResponse(response.text)
+        for position, product_data in enumerate(stream):
+            item = self.create_product_item_from_api(product_data, category)
+            if not item or str(item.get("product_id")) not in self.store.active:
+                continue
+            try:
+                record = product_record(item)
+            except (ValueError, TypeError):
+                continue
+            expected.discard(record.product_id)
+            stats.inc_value("poll/observed")
+            changes = self.store.observe(record, category, filters, offset + position, now)
+            if changes:
+                stats.inc_value("poll/changed")
+                yield ProductDeltaItem(
+                    product_id=record.product_id,
+                    category=category,
+                    changes=changes,
+                    polled_at=polled_at,
+                )
+
+        # Pages are planned at the tuned page size, so a capped page teaches it too
+        total = stream.meta.get("totalCount")
+        next_offset = offset + stream.count
+        remaining = next_offset < total if isinstance(total, int) else stream.count > 0
+        self.page_size.observe(meta["rows"], stream.count, remaining)
+
+        if meta["locate"]:
+            # Keep paging through the shard while some products are still unaccounted for
+            pages = next_offset // meta["rows"]
+            if expected and remaining and pages < self.settings.getint("POLL_LOCATE_PAGES", 20):
+                yield self.make_poll_request(
+                    (category, json.dumps(filters, sort_keys=True)),
+                    next_offset,
+                    meta["rows"],
+                    sorted(expected),
+                    locate=True,
+                )
+                return
+        for product_id in expected:
+            stats.inc_value("poll/missed")
+            self.store.missed(product_id, relocate=not meta["locate"], now=now)
+
+    def poll_failed(self, failure):
+        # Back off the products until their next poll rather than refetch at once
+        self.logger.error(f"❌ Poll request failed: {failure.value}")
+        self.crawler.stats.inc_value("poll/failed")
+        self.store.failed(failure.request.meta["expected"])
+
+    def spider_idle(self, spider):
+        """Between rounds: wait until the next product is due, or finish after poll_for"""
+        self.store.flush()
+        next_due = self.store.next_due()
+        if next_due is None:
+            return
+        now = time.time()
+        wait = max(0.0, next_due - now)
+        if self.poll_for:
+            deadline = self.started + self.poll_for
+            if now >= deadline:
+                return
+            wait = min(wait, deadline - now)
+
+        if self.timer is None or not self.timer.active():
+            from twisted.internet import reactor
+
+            self.timer = reactor.callLater(wait, self.schedule_round)
+        raise DontCloseSpider
+
+    def schedule_round(self):
+        if self.poll_for and time.time() >= self.started + self.poll_for:
+            return
+        for request in self.poll_round():
+            self.crawler.engine.crawl(request)
+
+    def spider_closed(self, spider):
+        if self.timer is not None and self.timer.active():
+            self.timer.cancel()
+        if self.store is None:
+            return
+        stats = self.store.stats()
+        self.store.close()
+        requests = sum(
+            self.crawler.stats.get_value(key, 0) for key in ("poll/pages", "poll/locate_pages")
+        )
+        self.logger.info(
+            f"🎯 {self.rounds} rounds, {requests} requests: {stats['polls']} polls of "
+            f"{stats['tracked']} products ({stats['located']} located), {stats['changes']} changed, "
+            f"median interval {stats['median_interval_s'] or 0:.0f}s"
+        )
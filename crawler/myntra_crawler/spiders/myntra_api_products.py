@@ -1,8 +1,11 @@
 import scrapy
 import json
 import time
-from urllib.parse import urljoin, urlparse, parse_qs
+from urllib.parse import urlencode, urljoin, urlparse, parse_qs
 from myntra_crawler.items import ProductItem
+from myntra_crawler.jsonstream import StreamedResponse
+from myntra_crawler.pagesize import DEFAULT_ROWS, PageSizeTuner
+from myntra_crawler.partitions import filter_params
 
 
 class MyntraAPIProductsSpider(scrapy.Spider):
@@ -10,6 +13,7 @@ class MyntraAPIProductsSpider(scrapy.Spider):
 
     name = "myntra_api_products"
     allowed_domains = ["myntra.com"]
+    base_url = "https://www.myntra.com"
 
     # Real API endpoints discovered from network tab
     api_endpoints = {
@@ -39,11 +43,28 @@ class MyntraAPIProductsSpider(scrapy.Spider):
         },
     }
 
-    def __init__(self, category=None, max_pages=5, *args, **kwargs):
+    def __init__(self, category=None, max_pages=5, base_url=None, *args, **kwargs):
         super(MyntraAPIProductsSpider, self).__init__(*args, **kwargs)
         self.max_pages = int(max_pages)
         self.category = category or "men-clothing"
         self.pages_scraped = 0
+        self.session_established = False
+        self.tuner = None
+
+        # Point the spider at another host, e.g. the local mock gateway
+        if base_url:
+            self.base_url = base_url.rstrip("/")
+            self.allowed_domains = [urlparse(self.base_url).hostname]
+            self.api_endpoints = {"search": f"{self.base_url}/gateway/v2/search"}
+
+    @property
+    def page_size(self):
+        """Page size tuner for the search endpoint, created once settings are bound"""
+        if self.tuner is None:
+            self.tuner = PageSizeTuner.from_settings(
+                self.api_endpoints["search"], getattr(self, "settings", None)
+            )
+        return self.tuner
 
     def start_requests(self):
         """Generate initial requests - first visit main page to get session cookies"""
@@ -56,13 +77,39 @@ class MyntraAPIProductsSpider(scrapy.Spider):
             )
             return
 
-        # First visit the category page to establish session and get cookies
-        category_url = f"https://www.myntra.com/{self.category}"
+        # Workers get their offsets from the shared queue instead
+        if self.settings.get("WORK_QUEUE_PATH"):
+            return
+
+        # max_pages counts pages of the default size, whatever size is requested
+        yield self.make_session_request(self.category, 0, self.max_pages * DEFAULT_ROWS)
 
-        yield scrapy.Request(
+    def requests_for_unit(self, unit):
+        """Requests for one work unit: an offset range of a category's search results"""
+        category = unit["category"]
+        offset = unit["offset"]
+        filters = unit.get("filters")
+        if not self.session_established:
+            yield self.make_session_request(category, offset, unit["stop_offset"], filters)
+        else:
+            yield self.make_search_request(
+                category, offset, offset // DEFAULT_ROWS + 1, unit["stop_offset"], filters
+            )
+
+    def make_session_request(self, category, offset=0, stop_offset=None, filters=None):
+        """Visit the category page first to establish session and get cookies"""
+        category_url = f"{self.base_url}/{category}"
+
+        return scrapy.Request(
             url=category_url,
             callback=self.parse_category_and_then_api,
-            meta={"category": self.category},
+            meta={
+                "category": category,
+                "offset": offset,
+                "stop_offset": stop_offset,
+                "filters": filters,
+            },
+            dont_filter=True,
             headers={
                 "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
                 "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -80,30 +127,71 @@ class MyntraAPIProductsSpider(scrapy.Spider):
         self.logger.info(f"✅ Got session cookies from {response.url}")
         self.logger.info(f"🍪 Cookies: {len(response.request.cookies)} found")
 
-        # Now make the API request with the session cookies
-        search_url = self.api_endpoints.get("search")
-        if search_url:
-            # Construct full URL with category
-            full_url = f"{search_url}/{category}"
-            url_with_params = (
-                f"{full_url}?rows=50&o=0&plaEnabled=true&xdEnabled=false&pincode=400018"
-            )
+        self.session_established = True
 
-            yield scrapy.Request(
-                url=url_with_params,
-                callback=self.parse_search_api,
-                meta={"page": 1, "category": category, "offset": 0},
-                headers=self.get_api_headers(),
-                dont_filter=True,
+        # Now make the API request with the session cookies
+        if self.api_endpoints.get("search"):
+            offset = response.meta.get("offset", 0)
+            yield self.make_search_request(
+                category,
+                offset,
+                offset // DEFAULT_ROWS + 1,
+                response.meta.get("stop_offset"),
+                response.meta.get("filters"),
             )
         else:
             self.logger.error("❌ Search API endpoint not configured")
 
+    def make_search_request(self, category, offset, page, stop_offset=None, filters=None):
+        """Build a search API request for one page of results, optionally of one shard"""
+        rows = self.page_size.rows_for(offset, stop_offset)
+        return scrapy.Request(
+            url=self.search_url(category, offset, rows, filters),
+            callback=self.parse_search_api,
+            errback=self.search_failed,
+            meta={
+                "page": page,
+                "category": category,
+                "offset": offset,
+                "stop_offset": stop_offset,
+                "filters": filters,
+                "rows": rows,
+            },
+            headers=self.get_api_headers(),
+            dont_filter=True,
+        )
+
+    def search_url(self, category, offset, rows, filters=None):
+        """Search API URL for `rows` results from offset, optionally of one shard"""
+        url = (
+            f"{self.api_endpoints['search']}/{category}"
+            f"?rows={rows}&o={offset}&plaEnabled=true&xdEnabled=false&pincode=400018"
+        )
+        if filters:
+            url += "&" + urlencode(filter_params(filters))
+        return url
+
+    def search_failed(self, failure):
+        """Retry a search page with a smaller page size if the size was rejected"""
+        response = getattr(failure.value, "response", None)
+        meta = failure.request.meta
+        if response is None or response.status not in (400, 413, 422):
+            self.logger.error(f"❌ Search request failed: {failure.value}")
+            return
+        rows = self.page_size.reject(meta["rows"])
+        if rows is None:
+            self.logger.error(f"❌ API rejected {meta['rows']} rows ({response.status})")
+            return
+        self.logger.info(f"📏 API rejected {meta['rows']} rows, retrying with {rows}")
+        yield self.make_search_request(
+            meta["category"], meta["offset"], meta["page"], meta["stop_offset"], meta["filters"]
+        )
+
     def get_api_headers(self):
         """Get headers that mimic browser API requests"""
         return {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-            "Referer": f"https://www.myntra.com/{self.category}",
+            "Referer": f"{self.base_url}/{self.category}",
             "x-myntra-app": "deviceID=972653e0-8e3e-4062-99dd-0be09569eced;customerID=;reqChannel=web;appFamily=MyntraRetailWeb;",
         }
 
@@ -117,60 +205,60 @@ class MyntraAPIProductsSpider(scrapy.Spider):
             return
 
         try:
-            data = json.loads(response.text)
             page = response.meta["page"]
             category = response.meta["category"]
 
             self.logger.info(f"✅ API Response Status: {response.status}")
-            self.logger.info(f"📦 API Response keys: {list(data.keys())}")
 
             # Save raw response for debugging
             debug_filename = f"api_debug_response_page_{page}.json"
-            with open(debug_filename, "w") as f:
-                json.dump(data, f, indent=2)
+            with open(debug_filename, "wb") as f:
+                f.write(response.body)
             self.logger.info(f"💾 Saved debug response to: {debug_filename}")
 
-            # The exact structure depends on Myntra's API response
-            # Common patterns to look for:
-            products = self.extract_products_from_api_response(data)
+            # Products are decoded one at a time and yielded as soon as each is
+            # complete, so only one product is held in memory at once and
+            # pipelines see the first items before the page is fully parsed.
+            # The product list is looked for under the common keys
+            # (PRODUCT_LIST_KEYS); everything else lands in stream.meta.
+            stream = StreamedResponse(response.text)
+            for product_data in stream:
+                item = self.create_product_item_from_api(product_data, category)
+                if item:
+                    yield item
 
-            if not products:
+            self.logger.info(f"📦 API Response keys: {list(stream.meta)}")
+            if not stream.count:
                 self.logger.warning(
                     f"⚠️  No products found in API response for page {page}"
                 )
-                self.logger.warning(f"🔍 Available keys: {list(data.keys())}")
+                self.logger.warning(f"🔍 Available keys: {list(stream.meta)}")
                 return
 
-            self.logger.info(f"✅ Found {len(products)} products on page {page}")
-
-            # Process each product
-            for product_data in products:
-                # Extract product details directly from API response
-                item = self.create_product_item_from_api(product_data, category)
-                if item:
-                    yield item
+            self.logger.info(
+                f"✅ Found {stream.count} products in key '{stream.list_key}' on page {page}"
+            )
 
-            # Handle pagination using offset
+            # Handle pagination using offset; the next page starts after the
+            # products actually served, which may be fewer than requested
             self.pages_scraped += 1
-            if self.pages_scraped < self.max_pages and self.has_more_pages(data):
-                current_offset = response.meta.get("offset", 0)
-                next_offset = current_offset + 50  # rows per page
-                search_url = self.api_endpoints.get("search")
-                full_url = f"{search_url}/{category}"
-
-                # Add params to URL for pagination
-                url_with_params = f"{full_url}?rows=50&o={next_offset}&plaEnabled=true&xdEnabled=false&pincode=400018"
-
-                yield scrapy.Request(
-                    url=url_with_params,
-                    callback=self.parse_search_api,
-                    meta={
-                        "page": page + 1,
-                        "category": category,
-                        "offset": next_offset,
-                    },
-                    headers=self.get_api_headers(),
-                    dont_filter=True,
+            current_offset = response.meta.get("offset", 0)
+            next_offset = current_offset + stream.count
+            stop_offset = response.meta.get("stop_offset")
+            if stop_offset is None:
+                stop_offset = self.max_pages * DEFAULT_ROWS
+
+            total = stream.meta.get("totalCount")
+            if isinstance(total, int):
+                remaining = next_offset < total
+            else:
+                remaining = self.has_more_pages(stream.meta, stream.count)
+            self.page_size.observe(
+                response.meta.get("rows", DEFAULT_ROWS), stream.count, remaining
+            )
+            if next_offset < stop_offset and remaining:
+                yield self.make_search_request(
+                    category, next_offset, page + 1, stop_offset, response.meta.get("filters")
                 )
 
         except json.JSONDecodeError as e:
@@ -180,46 +268,16 @@ class MyntraAPIProductsSpider(scrapy.Spider):
             self.logger.error(f"💥 Error parsing API response: {e}")
             self.logger.error(f"📄 Raw response: {response.text[:500]}")
 
-    def extract_products_from_api_response(self, data):
-        """Extract products list from API response"""
-        # This needs to be customized based on actual API response structure
-
-        # Common patterns in e-commerce APIs:
-        possible_keys = [
-            "products",
-            "items",
-            "data",
-            "results",
-            "listings",
-            "productList",
-        ]
-
-        for key in possible_keys:
-            if key in data and isinstance(data[key], list):
-                self.logger.info(f"🎯 Found products in key: '{key}'")
-                return data[key]
-
-        # If data itself is a list
-        if isinstance(data, list):
-            self.logger.info(f"🎯 Data is directly a list with {len(data)} items")
-            return data
-
-        # Log available keys for debugging
-        if isinstance(data, dict):
-            self.logger.warning(
-                f"🔍 Available keys in API response: {list(data.keys())}"
-            )
-
-        return []
-
-    def has_more_pages(self, data):
-        """Check if there are more pages available"""
+    def has_more_pages(self, meta, product_count):
+        """Check if there are more pages, from the response's non-product fields"""
         # Common pagination indicators:
-        pagination_keys = ["hasNext", "hasMore", "totalPages", "nextPage", "pagination"]
+        pagination_keys = [
+            "hasNext", "hasMore", "hasNextPage", "totalPages", "nextPage", "pagination",
+        ]
 
         for key in pagination_keys:
-            if key in data:
-                value = data[key]
+            if key in meta:
+                value = meta[key]
                 if isinstance(value, bool):
                     return value
                 elif isinstance(value, dict) and "hasNext" in value:
@@ -228,8 +286,7 @@ class MyntraAPIProductsSpider(scrapy.Spider):
                     return self.pages_scraped < value
 
         # Fallback: check if we got any products (if yes, might have more)
-        products = self.extract_products_from_api_response(data)
-        return len(products) > 0
+        return product_count > 0
 
     def create_product_item_from_api(self, product_data, category):
         """Create ProductItem from API response data"""
@@ -270,7 +327,7 @@ class MyntraAPIProductsSpider(scrapy.Spider):
             # Construct product URL if we have product ID
             if item.get("product_id"):
                 item["product_url"] = (
-                    f"https://www.myntra.com/product/{item['product_id']}"
+                    f"{self.base_url}/product/{item['product_id']}"
                 )
 
             # Store raw API response for debugging
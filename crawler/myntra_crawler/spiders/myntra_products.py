@@ -4,12 +4,17 @@ import re
 from urllib.parse import urljoin, urlparse, parse_qs
 from myntra_crawler.items import ProductItem
 
+# Fields a listing-only item must carry; products missing one get a PDP request
+LISTING_REQUIRED_FIELDS = ("name", "brand", "price")
+PAGE_STATE_MARKER = "window.__myx"
+
 
 class MyntraProductsSpider(scrapy.Spider):
     """3P Crawler: Scrapes public product data from Myntra"""
 
     name = "myntra_products"
     allowed_domains = ["myntra.com"]
+    base_url = "https://www.myntra.com"
 
     # Start URLs for different categories
     start_urls = [
@@ -26,17 +31,45 @@ class MyntraProductsSpider(scrapy.Spider):
         "RANDOMIZE_DOWNLOAD_DELAY": 0.5,
     }
 
-    def __init__(self, category=None, max_pages=5, *args, **kwargs):
+    def __init__(
+        self,
+        category=None,
+        max_pages=5,
+        base_url=None,
+        listing_only=False,
+        listing_fields=None,
+        *args,
+        **kwargs,
+    ):
         super(MyntraProductsSpider, self).__init__(*args, **kwargs)
         self.max_pages = int(max_pages)
         self.pages_scraped = {}
 
+        # Emit items straight from category pages instead of fetching every PDP
+        self.listing_only = str(listing_only).lower() in ("1", "true", "yes")
+        if isinstance(listing_fields, str):
+            listing_fields = [f.strip() for f in listing_fields.split(",") if f.strip()]
+        self.listing_fields = tuple(listing_fields or LISTING_REQUIRED_FIELDS)
+
+        # Point the spider at another host, e.g. the local mock gateway
+        if base_url:
+            self.base_url = base_url.rstrip("/")
+            self.allowed_domains = [urlparse(self.base_url).hostname]
+            self.start_urls = [
+                url.replace(MyntraProductsSpider.base_url, self.base_url)
+                for url in self.start_urls
+            ]
+
         # If specific category is provided, override start_urls
         if category:
-            self.start_urls = [f"https://www.myntra.com/{category}"]
+            self.start_urls = [f"{self.base_url}/{category}"]
 
     def start_requests(self):
         """Generate initial requests"""
+        # Workers get their pages from the shared queue instead
+        if self.settings.get("WORK_QUEUE_PATH"):
+            return
+
         for url in self.start_urls:
             category = url.split("/")[-1]
             self.pages_scraped[category] = 0
@@ -45,25 +78,41 @@ class MyntraProductsSpider(scrapy.Spider):
                 url=url, callback=self.parse_category_page, meta={"category": category}
             )
 
+    def requests_for_unit(self, unit):
+        """Requests for one work unit: a run of listing pages or a batch of product URLs"""
+        category = unit["category"]
+        if unit["kind"] == "pdp_batch":
+            for url in unit["urls"]:
+                yield self.make_product_request(url, category)
+            return
+
+        self.pages_scraped.setdefault(category, 0)
+        for page in unit["pages"]:
+            yield scrapy.Request(
+                url=f"{self.base_url}/{category}?p={page}",
+                callback=self.parse_category_page,
+                meta={"category": category, "follow_pagination": False},
+            )
+
     def parse_category_page(self, response):
         """Parse category page to extract product URLs"""
         category = response.meta["category"]
 
-        # Extract product URLs using CSS selectors (based on Myntra's structure)
-        product_links = response.css('a[href*="/buy/"]::attr(href)').getall()
+        if self.listing_only:
+            yield from self.parse_listing_products(response, category)
+        else:
+            # Extract product URLs using CSS selectors (based on Myntra's structure)
+            product_links = response.css('a[href*="/buy/"]::attr(href)').getall()
 
-        # Clean and convert to absolute URLs
-        for link in product_links:
-            if link:
-                product_url = urljoin(response.url, link)
-                yield scrapy.Request(
-                    url=product_url,
-                    callback=self.parse_product,
-                    meta={"category": category},
-                )
+            # Clean and convert to absolute URLs
+            for link in product_links:
+                if link:
+                    yield self.make_product_request(urljoin(response.url, link), category)
 
         # Handle pagination
         self.pages_scraped[category] += 1
+        if not response.meta.get("follow_pagination", True):
+            return
         if self.pages_scraped[category] < self.max_pages:
             # Look for next page link
             next_page = response.css('a[aria-label="Next"]::attr(href)').get()
@@ -75,6 +124,141 @@ class MyntraProductsSpider(scrapy.Spider):
                     meta={"category": category},
                 )
 
+    def make_product_request(self, product_url, category):
+        """PDP request tagged with its product id, which the dupefilter keys on"""
+        return scrapy.Request(
+            url=product_url,
+            callback=self.parse_product,
+            meta={"category": category, "product_id": self.extract_product_id(product_url)},
+        )
+
+    def parse_listing_products(self, response, category):
+        """Items from the listing itself; PDP requests only for incomplete products"""
+        stats = self.crawler.stats if getattr(self, "crawler", None) else None
+
+        # Product id -> absolute PDP URL, from the cards' links
+        links = {}
+        for link in response.css('a[href*="/buy/"]::attr(href)').getall():
+            if link:
+                product_url = urljoin(response.url, link)
+                links[self.extract_product_id(product_url)] = product_url
+
+        products = self.extract_page_state_products(response)
+        if products:
+            items = [
+                self.create_item_from_listing_state(product, category, links, response)
+                for product in products
+            ]
+        else:
+            items = [
+                self.create_item_from_listing_card(card, category, response)
+                for card in response.css("li.product-base")
+            ]
+        items = [item for item in items if item.get("product_id")]
+
+        if not items:
+            # Unknown listing layout: behave like a full crawl for this page
+            for product_url in links.values():
+                yield self.make_product_request(product_url, category)
+            return
+
+        for item in items:
+            missing = [f for f in self.listing_fields if item.get(f) in (None, "", [])]
+            if missing:
+                if stats:
+                    stats.inc_value("listing_only/detail_requests")
+                yield self.make_product_request(item["product_url"], category)
+            else:
+                if stats:
+                    stats.inc_value("listing_only/items")
+                yield item
+
+    def extract_page_state_products(self, response):
+        """Products from the page-state JSON Myntra embeds in listing pages"""
+        script = response.xpath(
+            f'//script[contains(text(), "{PAGE_STATE_MARKER}")]/text()'
+        ).get()
+        if not script:
+            return []
+        try:
+            state = json.loads(script.split("=", 1)[1].strip().rstrip(";"))
+            products = state["searchData"]["results"]["products"]
+        except (IndexError, KeyError, TypeError, json.JSONDecodeError):
+            return []
+        return products if isinstance(products, list) else []
+
+    def create_item_from_listing_state(self, product, category, links, response):
+        """ProductItem from one page-state product entry"""
+        product_id = str(product.get("productId", ""))
+        landing = product.get("landingPageUrl")
+        product_url = links.get(product_id) or (
+            f"{self.base_url}/{landing}" if landing else f"{self.base_url}/{product_id}"
+        )
+
+        images = [img.get("src") for img in product.get("images") or [] if img.get("src")]
+        if not images and product.get("searchImage"):
+            images = [product["searchImage"]]
+        sizes = product.get("sizes") or ""
+        colour = product.get("primaryColour")
+
+        item = ProductItem()
+        item["product_id"] = product_id
+        item["product_url"] = product_url
+        item["category"] = category
+        item["name"] = product.get("productName", "")
+        item["brand"] = product.get("brand", "")
+        # price is what the shopper pays and discount_price the MRP, as on PDPs
+        item["price"] = product.get("price", "")
+        item["discount_price"] = product.get("mrp") or product.get("price", "")
+        item["rating"] = product.get("rating", "")
+        item["rating_count"] = product.get("ratingCount", "")
+        item["images"] = images
+        item["sizes"] = [size.strip() for size in sizes.split(",") if size.strip()]
+        item["colors"] = [colour] if colour else []
+        item["raw_data"] = {"source": "listing", "url": response.url, "status": response.status}
+        return item
+
+    def create_item_from_listing_card(self, card, category, response):
+        """ProductItem from the markup of one listing card"""
+        link = card.css('a[href*="/buy/"]::attr(href)').get()
+        product_url = urljoin(response.url, link) if link else ""
+        product_id = card.attrib.get("id") or (
+            self.extract_product_id(product_url) if product_url else ""
+        )
+        if not product_url and product_id:
+            # Same fallback as create_item_from_listing_state: the PDP by id alone
+            product_url = f"{self.base_url}/{product_id}"
+
+        brand = card.css("h3.product-brand::text").get(default="").strip()
+        name = card.css("h4.product-product::text").get(default="").strip()
+        selling = card.css(".product-discountedPrice::text").get() or card.css(
+            ".product-price span::text"
+        ).get(default="")
+        mrp = card.css(".product-strike::text").get(default="")
+        sizes = card.css(".product-sizeInventoryPresent::text").get(default="")
+
+        item = ProductItem()
+        item["product_id"] = product_id
+        item["product_url"] = product_url
+        item["category"] = category
+        item["name"] = f"{brand} {name}".strip()
+        item["brand"] = brand
+        item["price"] = self.extract_price(selling)
+        item["discount_price"] = self.extract_price(mrp) or self.extract_price(selling)
+        item["rating"] = self.extract_rating(
+            card.css(".product-ratingsContainer span::text").get(default="")
+        )
+        item["rating_count"] = self.extract_rating_count(
+            "".join(card.css(".product-ratingsCount::text").getall())
+        )
+        item["images"] = [
+            urljoin(response.url, img) for img in card.css("img::attr(src)").getall() if img
+        ]
+        item["sizes"] = [size.strip() for size in sizes.split(",") if size.strip()]
+        item["colors"] = []
+        item["raw_data"] = {"source": "listing", "url": response.url, "status": response.status}
+        return item
+
     def parse_product(self, response):
         """Parse individual product page"""
         category = response.meta["category"]
@@ -181,16 +365,21 @@ class MyntraProductsSpider(scrapy.Spider):
 
     def extract_product_id(self, url):
         """Extract product ID from URL"""
+        # Query strings and fragments are tracking variants of the same page
+        path = urlparse(url).path.rstrip("/")
         try:
             # Myntra URLs typically have format: /buy/product-name/12345
-            parts = url.split("/")
+            # or /tshirts/brand/product-name/12345/buy
+            parts = path.split("/")
             if "buy" in parts:
                 idx = parts.index("buy")
                 if idx + 2 < len(parts):
                     return parts[idx + 2]
-            return url.split("/")[-1]
+                if idx == len(parts) - 1 and idx > 0:
+                    return parts[idx - 1]
+            return parts[-1]
         except:
-            return url.split("/")[-1]
+            return path.split("/")[-1]
 
     def extract_price(self, price_text):
         """Extract numeric price from text"""
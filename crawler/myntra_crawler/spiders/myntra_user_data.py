@@ -1,7 +1,9 @@
 import scrapy
 import json
 import time
+import hashlib
 from datetime import datetime
+from urllib.parse import urlparse
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
@@ -15,19 +17,33 @@ class MyntraUserDataSpider(scrapy.Spider):
 
     name = "myntra_user_data"
     allowed_domains = ["myntra.com"]
+    base_url = "https://www.myntra.com"
 
     custom_settings = {
         "DOWNLOAD_DELAY": 3,
         "RANDOMIZE_DOWNLOAD_DELAY": 1,
     }
 
-    def __init__(self, email=None, password=None, headless=True, *args, **kwargs):
+    def __init__(
+        self, email=None, password=None, headless=True, base_url=None, *args, **kwargs
+    ):
         super(MyntraUserDataSpider, self).__init__(*args, **kwargs)
         self.email = email
         self.password = password
+        # Orders are tagged with a hash of the login instead of the email itself
+        self.user_id = (
+            hashlib.sha256(email.strip().lower().encode("utf-8")).hexdigest()[:16]
+            if email
+            else None
+        )
         self.headless = headless.lower() == "true"
         self.driver = None
 
+        # Point the spider at another host, e.g. the local mock gateway
+        if base_url:
+            self.base_url = base_url.rstrip("/")
+            self.allowed_domains = [urlparse(self.base_url).hostname]
+
         if not self.email or not self.password:
             self.logger.error("Email and password are required for user data spider")
             raise ValueError("Email and password are required")
@@ -39,7 +55,7 @@ class MyntraUserDataSpider(scrapy.Spider):
         if self.login():
             # After successful login, start scraping order history
             yield scrapy.Request(
-                url="https://www.myntra.com/checkout/orders",
+                url=f"{self.base_url}/checkout/orders",
                 callback=self.parse_orders_page,
                 dont_filter=True,
             )
@@ -74,7 +90,7 @@ class MyntraUserDataSpider(scrapy.Spider):
             self.logger.info("Starting login process...")
 
             # Navigate to login page
-            self.driver.get("https://www.myntra.com/login")
+            self.driver.get(f"{self.base_url}/login")
             time.sleep(3)
 
             # Wait for login form
@@ -135,7 +151,7 @@ class MyntraUserDataSpider(scrapy.Spider):
         """Parse orders page using Selenium"""
         try:
             # Navigate to orders page using Selenium
-            self.driver.get("https://www.myntra.com/checkout/orders")
+            self.driver.get(f"{self.base_url}/checkout/orders")
             time.sleep(5)
 
             # Scroll to load more orders
@@ -207,6 +223,7 @@ class MyntraUserDataSpider(scrapy.Spider):
                 By.CSS_SELECTOR, '.order-id, [data-testid="order-id"]'
             )
             item["order_id"] = order_id_elem.text.strip() if order_id_elem else ""
+            item["user_id"] = self.user_id
 
             # Extract product name
             product_name_elem = order_element.find_element(
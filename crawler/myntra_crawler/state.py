@@ -0,0 +1,81 @@
+from twisted.internet.defer import succeed
+from scrapy.core.downloader.handlers.http11 import HTTP11DownloadHandler
+
+
+class WarmState:
+    """Objects kept alive across crawls run inside one long-lived process
+
+    Passed to every crawl through the WARM_STATE setting. Scrapy deep-copies
+    settings for each crawler, so copying deliberately returns the same object.
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self.versions = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __copy__(self):
+        return self
+
+    def __repr__(self):
+        return f"WarmState({sorted(self.objects)})"
+
+    def get(self, key, factory, version=None):
+        """Return the object stored under key, building it with factory on first use
+
+        An object stored with a different version (e.g. the mtime of the file
+        it was built from) is replaced, so stale copies don't pile up.
+        """
+        if key in self.objects and self.versions.get(key) == version:
+            self.hits += 1
+            return self.objects[key]
+        self.misses += 1
+        # Drop the stale object before building its replacement
+        self.pop(key)
+        value = factory()
+        self.objects[key] = value
+        self.versions[key] = version
+        return value
+
+    def pop(self, key, default=None):
+        self.versions.pop(key, None)
+        return self.objects.pop(key, default)
+
+    def describe(self):
+        """Short summary of what is being kept warm, for status output"""
+        summary = {}
+        for key, value in self.objects.items():
+            try:
+                summary[key] = f"{type(value).__name__}[{len(value)}]"
+            except TypeError:
+                summary[key] = type(value).__name__
+        return summary
+
+
+def get_warm_state(crawler):
+    """Return the process-wide warm state, or a per-crawler one outside the daemon"""
+    state = crawler.settings.get("WARM_STATE")
+    if state is None:
+        state = getattr(crawler, "warm_state", None)
+        if state is None:
+            state = WarmState()
+            crawler.warm_state = state
+    return state
+
+
+class PersistentHTTPDownloadHandler(HTTP11DownloadHandler):
+    """HTTP/1.1 handler whose keep-alive pool outlives the crawl that created it"""
+
+    def __init__(self, settings, crawler):
+        super().__init__(settings, crawler)
+        own_pool = self._pool
+        self._pool = get_warm_state(crawler).get("http_pool", lambda: own_pool)
+
+    def close(self):
+        # Cached connections stay open for the next crawl; the daemon closes
+        # the pool itself on shutdown
+        return succeed(None)
@@ -0,0 +1,87 @@
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+
+# Request.meta keys used to propagate trace context between callbacks
+TRACE_ID = "trace_id"
+TRACE_PARENT = "trace_parent"
+TRACE_HOP = "trace_hop"
+TRACE_ENQUEUED_AT = "trace_enqueued_at"
+TRACE_DOWNLOAD_START = "trace_download_start"
+TRACE_DOWNLOAD_END = "trace_download_end"
+TRACE_RETRIES_SEEN = "trace_retries_seen"
+
+
+class Tracer:
+    """Writes request-chain spans (schedule, download, retry, parse) to a JSONL file"""
+
+    def __init__(self, output_dir="data/traces"):
+        self.output_dir = output_dir
+        self.filename = None
+        self.file = None
+        self.spans_written = 0
+
+    def open(self, name):
+        os.makedirs(self.output_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.filename = f"{self.output_dir}/{name}_{timestamp}.jsonl"
+        self.file = open(self.filename, "w", encoding="utf-8")
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    @staticmethod
+    def new_id():
+        return uuid.uuid4().hex[:16]
+
+    def record(self, trace_id, name, start, end, hop="", parent_id=None, **attrs):
+        """Write one finished span and return its id"""
+        span_id = attrs.pop("span_id", None) or self.new_id()
+        if not self.file:
+            return span_id
+
+        span = {
+            "trace_id": trace_id,
+            "span_id": span_id,
+            "parent_id": parent_id,
+            "name": name,
+            "hop": hop,
+            "start": round(start, 6),
+            "end": round(end, 6),
+            "duration_ms": round((end - start) * 1000, 3),
+        }
+        if attrs:
+            span["attrs"] = attrs
+
+        self.file.write(json.dumps(span, ensure_ascii=False) + "\n")
+        self.spans_written += 1
+        return span_id
+
+    def start_trace(self, request):
+        """Attach trace context to a request that does not carry one yet"""
+        if TRACE_ID not in request.meta:
+            request.meta[TRACE_ID] = self.new_id()
+        request.meta.setdefault(TRACE_ENQUEUED_AT, time.time())
+        return request.meta[TRACE_ID]
+
+
+def hop_name(request):
+    """Name of the hop a request belongs to: explicit step, else its callback"""
+    if request.meta.get(TRACE_HOP):
+        return request.meta[TRACE_HOP]
+    if request.meta.get("step"):
+        return request.meta["step"]
+    return getattr(request.callback, "__name__", "parse")
+
+
+def get_tracer(crawler):
+    """Return the tracer attached to a crawler, creating it on first use"""
+    tracer = getattr(crawler, "tracer", None)
+    if tracer is None:
+        tracer = Tracer(crawler.settings.get("TRACING_DIR", "data/traces"))
+        crawler.tracer = tracer
+    return tracer
@@ -0,0 +1,243 @@
+import glob
+import json
+import os
+import time
+import multiprocessing
+from datetime import datetime
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+from myntra_crawler.catalog_index import CatalogIndex, index_file
+from myntra_crawler.jsonstream import iter_json_array
+from myntra_crawler.matching import NearDuplicateIndex, match_file
+from myntra_crawler.pricehistory import PriceHistory, record_file
+from myntra_crawler.workqueue import WorkQueue
+
+API_ROWS = 50  # Search API page size used by the API spider
+
+DEFAULT_CATEGORIES = [
+    "men-clothing",
+    "women-clothing",
+    "men-footwear",
+    "women-footwear",
+    "men-accessories",
+    "women-accessories",
+]
+
+
+def plan_units(spider_name, categories, max_pages, unit_pages=5, urls=None):
+    """Split a crawl into independent work units"""
+    units = []
+
+    if urls:
+        # Product detail pages from a previous listing crawl, in batches
+        batch = unit_pages * API_ROWS
+        for start in range(0, len(urls), batch):
+            units.append(
+                {
+                    "kind": "pdp_batch",
+                    "category": categories[0] if categories else "unknown",
+                    "urls": urls[start : start + batch],
+                }
+            )
+        return units
+
+    for category in categories:
+        for first in range(1, max_pages + 1, unit_pages):
+            last = min(first + unit_pages, max_pages + 1)
+            if spider_name == "myntra_api_products":
+                units.append(
+                    {
+                        "kind": "search",
+                        "category": category,
+                        "offset": (first - 1) * API_ROWS,
+                        "stop_offset": (last - 1) * API_ROWS,
+                    }
+                )
+            else:
+                units.append(
+                    {
+                        "kind": "listing",
+                        "category": category,
+                        "pages": list(range(first, last)),
+                    }
+                )
+    return units
+
+
+def plan_shard_units(shards, unit_pages=5):
+    """Search units for partitioned categories: {category: [(filters, count)]}
+
+    Each shard is paginated over offsets [0, count) in runs of unit_pages pages,
+    so large shards are still spread over several workers.
+    """
+    units = []
+    unit_rows = unit_pages * API_ROWS
+    for category, category_shards in shards.items():
+        for filters, count in category_shards:
+            for offset in range(0, count, unit_rows):
+                units.append(
+                    {
+                        "kind": "search",
+                        "category": category,
+                        "filters": filters,
+                        "offset": offset,
+                        "stop_offset": min(offset + unit_rows, count),
+                    }
+                )
+    return units
+
+
+def run_worker(worker_id, spider_name, spider_kwargs, queue_path, overrides=None):
+    """Entry point of one worker process"""
+    settings = get_project_settings()
+    for name, value in (overrides or {}).items():
+        settings.set(name, value, priority="cmdline")
+
+    settings.set("WORK_QUEUE_PATH", queue_path, priority="cmdline")
+    settings.set("WORKER_ID", str(worker_id), priority="cmdline")
+    # Cost records of all workers are grouped by the queue they drained
+    run_id = os.path.splitext(os.path.basename(queue_path))[0]
+    settings.set("CRAWL_RUN_ID", run_id, priority="cmdline")
+    # Pacing is enforced by the shared budget, not per process
+    settings.set("DOWNLOAD_DELAY", 0, priority="cmdline")
+    settings.set("AUTOTHROTTLE_ENABLED", False, priority="cmdline")
+    # Workers would clobber one shared feed file; their parts are merged instead
+    settings.set("FEEDS", {}, priority="cmdline")
+    # The catalog index, price history and near-duplicate groups each have a
+    # single writer; the merged output is matched, indexed and recorded once
+    # all workers are done
+    settings.set("CATALOG_INDEX_PATH", None, priority="cmdline")
+    settings.set("PRICE_HISTORY_PATH", None, priority="cmdline")
+    settings.set("NEAR_DUPLICATES_PATH", None, priority="cmdline")
+    # A worker's own groups would only be overwritten by the batch match
+    settings.set("NEAR_DUPLICATES_ENABLED", False, priority="cmdline")
+
+    # Each worker gets its own metrics port next to the configured one
+    port = settings.getint("METRICS_PORT")
+    if port:
+        settings.set("METRICS_PORT", port + int(worker_id), priority="cmdline")
+
+    process = CrawlerProcess(settings)
+    process.crawl(spider_name, worker_id=worker_id, **spider_kwargs)
+    process.start()
+
+
+def run_workers(
+    spider_name, spider_kwargs, units, workers, overrides=None, data_dir="data"
+):
+    """Enqueue units, run worker processes until the queue drains, merge outputs"""
+    os.makedirs(data_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    queue_path = os.path.join(data_dir, f"workqueue_{spider_name}_{timestamp}.sqlite")
+    started = time.time()
+
+    queue = WorkQueue(queue_path)
+    queue.put_many(units)
+    print(f"📋 Queued {len(units)} work units in {queue_path}")
+
+    processes = []
+    for worker_id in range(workers):
+        process = multiprocessing.Process(
+            target=run_worker,
+            args=(worker_id, spider_name, spider_kwargs, queue_path, overrides),
+            name=f"crawler-worker-{worker_id}",
+        )
+        process.start()
+        processes.append(process)
+    print(f"👷 Started {workers} workers")
+
+    for process in processes:
+        process.join()
+        if process.exitcode:
+            print(f"⚠️  {process.name} exited with code {process.exitcode}")
+
+    stats = queue.stats()
+    queue.close()
+    for state, counts in sorted(stats.items()):
+        print(f"   {state:<8} {counts['units']:>6} units {counts['items']:>9} items")
+    if any(state != "done" for state in stats):
+        print("⚠️  Some units were not completed, see the queue file for details")
+
+    output = merge_outputs(spider_name, started, data_dir)
+    settings = get_project_settings()
+    for name, value in (overrides or {}).items():
+        settings.set(name, value, priority="cmdline")
+    if output and settings.getbool("NEAR_DUPLICATES_ENABLED"):
+        match_output(output, settings)
+    index_path = settings.get("CATALOG_INDEX_PATH")
+    if output and index_path:
+        index = CatalogIndex(index_path)
+        count = index_file(index, output)
+        index.close()
+        print(f"🔎 Indexed {count} products into {index_path}")
+    history_path = settings.get("PRICE_HISTORY_PATH")
+    if output and history_path:
+        history = PriceHistory(history_path)
+        count = record_file(history, output)
+        history.close()
+        print(f"📈 Recorded {count} products into the price history at {history_path}")
+    print(f"⏱️  Finished in {time.time() - started:.1f}s")
+    return output
+
+
+def match_output(output, settings):
+    """Tag the merged output with near-duplicate groups, as a single crawl would"""
+    path = settings.get("NEAR_DUPLICATES_PATH")
+    max_products = settings.getint("NEAR_DUPLICATES_MAX_PRODUCTS", 100000)
+    index = NearDuplicateIndex(
+        threshold=settings.getfloat("NEAR_DUPLICATES_THRESHOLD", 0.8),
+        max_products=max_products or None,
+    )
+    if path and os.path.exists(path):
+        index.load(path)
+    count, duplicates = match_file(index, output, settings.getbool("NEAR_DUPLICATES_DROP"))
+    if path:
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        index.save(path)
+    print(f"🧩 Matched {count} products, {duplicates} near duplicates")
+
+
+def merge_outputs(spider_name, since, data_dir="data", key="product_id"):
+    """Stream worker part files into one JSON array, keeping the first copy of each item"""
+    parts = [
+        path
+        for path in sorted(glob.glob(os.path.join(data_dir, f"{spider_name}_*_w*.json")))
+        if os.path.getmtime(path) >= since
+    ]
+    if not parts:
+        print("⚠️  No worker output to merge")
+        return None
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = os.path.join(data_dir, f"{spider_name}_{timestamp}.json")
+    seen = set()
+    count = 0
+    duplicates = 0
+
+    with open(filename, "w", encoding="utf-8") as out:
+        for part in parts:
+            with open(part, encoding="utf-8") as f:
+                for item in iter_json_array(f):
+                    item_key = item.get(key)
+                    if item_key is not None:
+                        if item_key in seen:
+                            duplicates += 1
+                            continue
+                        seen.add(item_key)
+
+                    text = json.dumps(item, indent=4, ensure_ascii=False)
+                    out.write(",\n    " if count else "[\n    ")
+                    out.write(text.replace("\n", "\n    "))
+                    count += 1
+        out.write("\n]" if count else "[]")
+
+    for part in parts:
+        os.remove(part)
+
+    print(
+        f"💾 Merged {len(parts)} worker files into {filename}: "
+        f"{count} items, {duplicates} duplicates dropped"
+    )
+    return filename
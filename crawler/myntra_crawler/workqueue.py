@@ -0,0 +1,163 @@
+import json
+import sqlite3
+import time
+
+
+class WorkUnit:
+    """A claimed unit of crawl work"""
+
+    def __init__(self, unit_id, payload, attempts):
+        self.id = unit_id
+        self.payload = payload
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"WorkUnit({self.id}, {self.payload})"
+
+
+class WorkQueue:
+    """SQLite-backed work queue and request budget shared by crawler processes
+
+    Units are leased rather than popped: a worker that dies or stalls loses its
+    lease and any idle worker can steal the unit once the lease expires.
+    """
+
+    def __init__(self, path, timeout=30):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS units (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payload TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                owner TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                items INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS units_state ON units (state, lease_until);
+            CREATE TABLE IF NOT EXISTS budget (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL
+            );
+            """
+        )
+
+    def close(self):
+        self.conn.close()
+
+    def put_many(self, payloads):
+        """Enqueue unit payloads (JSON-serialisable dicts)"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        self.conn.executemany(
+            "INSERT INTO units (payload) VALUES (?)",
+            [(json.dumps(payload),) for payload in payloads],
+        )
+        self.conn.execute("COMMIT")
+
+    def claim(self, owner, lease_seconds=300, max_attempts=3):
+        """Lease the next pending unit, or steal one whose lease expired"""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                """
+                SELECT id, payload, attempts FROM units
+                WHERE (state = 'pending' OR (state = 'leased' AND lease_until < ?))
+                  AND attempts < ?
+                ORDER BY state = 'leased', id
+                LIMIT 1
+                """,
+                (now, max_attempts),
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+
+            unit_id, payload, attempts = row
+            self.conn.execute(
+                """
+                UPDATE units SET state = 'leased', owner = ?, lease_until = ?,
+                       attempts = attempts + 1
+                WHERE id = ?
+                """,
+                (owner, now + lease_seconds, unit_id),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        return WorkUnit(unit_id, json.loads(payload), attempts + 1)
+
+    def renew(self, unit, owner, lease_seconds=300):
+        """Extend the lease of a unit still being worked on"""
+        self.conn.execute(
+            "UPDATE units SET lease_until = ? WHERE id = ? AND owner = ? AND state = 'leased'",
+            (time.time() + lease_seconds, unit.id, owner),
+        )
+
+    def complete(self, unit, owner, items=0):
+        self.conn.execute(
+            "UPDATE units SET state = 'done', items = ?, lease_until = NULL "
+            "WHERE id = ? AND owner = ?",
+            (items, unit.id, owner),
+        )
+
+    def release(self, unit, owner):
+        """Hand an unfinished unit back to the queue"""
+        self.conn.execute(
+            "UPDATE units SET state = 'pending', owner = NULL, lease_until = NULL "
+            "WHERE id = ? AND owner = ? AND state = 'leased'",
+            (unit.id, owner),
+        )
+
+    def has_unfinished(self, max_attempts=3):
+        """True while any unit is pending or leased and may still be retried"""
+        row = self.conn.execute(
+            "SELECT COUNT(*) FROM units WHERE state != 'done' AND attempts < ?",
+            (max_attempts,),
+        ).fetchone()
+        return row[0] > 0
+
+    def stats(self):
+        rows = self.conn.execute(
+            "SELECT state, COUNT(*), SUM(items) FROM units GROUP BY state"
+        ).fetchall()
+        return {state: {"units": count, "items": items or 0} for state, count, items in rows}
+
+    def acquire_token(self, name, rate, burst=1.0):
+        """Take one request token from a shared bucket
+
+        Returns 0 when a token was taken, otherwise the seconds to wait before
+        trying again. The bucket refills at `rate` tokens/s across all processes.
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT tokens, updated FROM budget WHERE name = ?", (name,)
+            ).fetchone()
+            tokens, updated = row if row else (burst, now)
+            tokens = min(burst, tokens + (now - updated) * rate)
+
+            if tokens >= 1.0:
+                tokens -= 1.0
+                wait = 0.0
+            else:
+                wait = (1.0 - tokens) / rate
+
+            self.conn.execute(
+                "INSERT OR REPLACE INTO budget (name, tokens, updated) VALUES (?, ?, ?)",
+                (name, tokens, now),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        return wait
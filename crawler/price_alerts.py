@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Price Alerts for Myntra crawls
+Manages the watchlist of price alert rules, checks crawl outputs against it
+and reads (or acknowledges) the alerts waiting in the outbox
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+from datetime import datetime
+
+from myntra_crawler.alerts import AlertEngine, AlertIndex, AlertOutbox, load_rules
+from myntra_crawler.catalog_index import stored_record
+from myntra_crawler.jsonstream import iter_json_array
+from myntra_crawler.records import product_record
+
+DEFAULT_WATCHLIST = "data/watchlist.jsonl"
+DEFAULT_OUTBOX = "data/alerts_outbox.sqlite"
+
+
+def add_rule(watchlist, args):
+    rule = {
+        "rule_id": args.rule_id or uuid.uuid4().hex[:12],
+        "user_id": args.user,
+        "brand": args.brand,
+        "category": args.category,
+        "size": args.size,
+        "max_price": args.max_price,
+    }
+    directory = os.path.dirname(watchlist)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(watchlist, "a", encoding="utf-8") as f:
+        f.write(json.dumps({k: v for k, v in rule.items() if v is not None}) + "\n")
+    print(f"🔔 Added rule {rule['rule_id']} to {watchlist}")
+    return 0
+
+
+def check_outputs(watchlist, outbox_path, paths, normalize=False):
+    """Run crawl output files through the alert engine, as the pipeline would"""
+    started = time.time()
+    index = AlertIndex(load_rules(watchlist))
+    print(f"📋 Indexed {len(index)} rules in {len(index.buckets)} buckets ({time.time() - started:.1f}s)")
+    if not len(index):
+        print(f"❌ No rules in {watchlist}")
+        return 1
+
+    engine = AlertEngine(index, AlertOutbox(outbox_path))
+    products = 0
+    started = time.time()
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for item in iter_json_array(f):
+                try:
+                    engine.process(product_record(item) if normalize else stored_record(item))
+                except (ValueError, TypeError):
+                    continue
+                products += 1
+    engine.outbox.close()
+    elapsed = time.time() - started
+    print(
+        f"🔔 {products} products, {engine.matched} rule matches, "
+        f"{engine.outbox.queued} alerts queued ({products / elapsed if elapsed else 0:.0f} products/s)"
+    )
+    return 0
+
+
+def show_outbox(outbox_path, limit, ack):
+    if not os.path.exists(outbox_path):
+        print(f"❌ No outbox at {outbox_path}")
+        return 1
+    outbox = AlertOutbox(outbox_path)
+    alerts = outbox.undelivered(limit)
+    print(f"\n📬 {len(alerts)} undelivered alerts")
+    print("=" * 86)
+    for alert in alerts:
+        product = alert["product"]
+        print(
+            f"{datetime.fromtimestamp(alert['created_at']).strftime('%Y-%m-%d %H:%M')}  "
+            f"{str(alert['user_id'])[:12]:<12} {alert['rule_id'][:12]:<12} "
+            f"₹{alert['price'] / 100:>8,.0f}  {product['brand'][:14]:<14} {product['name'][:26]}"
+        )
+    if ack and alerts:
+        outbox.mark_delivered([(alert["rule_id"], alert["product_id"]) for alert in alerts])
+        print(f"✅ Marked {len(alerts)} alerts delivered")
+    outbox.close()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage Myntra price alerts")
+    parser.add_argument(
+        "--watchlist", default=DEFAULT_WATCHLIST, help=f"Rules file (default: {DEFAULT_WATCHLIST})"
+    )
+    parser.add_argument(
+        "--outbox", default=DEFAULT_OUTBOX, help=f"Outbox database (default: {DEFAULT_OUTBOX})"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add_cmd = commands.add_parser("add", help="Add a watch rule")
+    add_cmd.add_argument("--user", required=True, help="User the alert is for")
+    add_cmd.add_argument("--brand", help="Brand, e.g. Nike")
+    add_cmd.add_argument("--category", help="Category, e.g. men-clothing")
+    add_cmd.add_argument("--size", help="Size that must be available, e.g. M")
+    add_cmd.add_argument("--max-price", type=float, help="Alert at or below this price (rupees)")
+    add_cmd.add_argument("--rule-id", help="Rule id (default: random)")
+
+    check_cmd = commands.add_parser("check", help="Match crawl output files against the rules")
+    check_cmd.add_argument("files", nargs="+", help="Crawl output JSON files")
+    check_cmd.add_argument(
+        "--normalize",
+        action="store_true",
+        help="Normalize raw items from dumps written before typed records",
+    )
+
+    outbox_cmd = commands.add_parser("outbox", help="List undelivered alerts")
+    outbox_cmd.add_argument("--limit", type=int, default=50, help="Alerts to show")
+    outbox_cmd.add_argument("--ack", action="store_true", help="Mark the listed alerts delivered")
+
+    args = parser.parse_args()
+
+    if args.command == "add":
+        return add_rule(args.watchlist, args)
+    if args.command == "check":
+        return check_outputs(args.watchlist, args.outbox, args.files, args.normalize)
+    return show_outbox(args.outbox, args.limit, args.ack)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
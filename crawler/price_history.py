@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Price History for Myntra crawls
+Records crawl outputs into the append-only price history store and queries it:
+the history of one product, products whose price dropped within a window,
+compaction and store statistics
+"""
+
+import os
+import sys
+import glob
+import time
+import re
+import argparse
+from datetime import datetime
+
+from myntra_crawler.pricehistory import MISSING, PriceHistory, record_file
+
+DEFAULT_STORE = "data/price_history"
+WORKER_PART_RE = re.compile(r"_w\d+\.json$")
+
+
+def format_price(paise):
+    return f"₹{paise / 100:,.0f}" if paise != MISSING else "-"
+
+
+def open_store(path):
+    if not os.path.exists(os.path.join(path, "manifest.json")):
+        print(f"❌ No price history at {path}, run a crawl or `price_history.py record` first")
+        return None
+    return PriceHistory(path)
+
+
+def record(path, paths, normalize=False):
+    """Record crawl output files (default: every products file in data/, oldest first)"""
+    if not paths:
+        paths = sorted(glob.glob("data/myntra_*products_*.json"), key=os.path.getmtime)
+        paths = [p for p in paths if not WORKER_PART_RE.search(p)]
+    if not paths:
+        print("❌ No crawl output files found")
+        return 1
+
+    history = PriceHistory(path)
+    started = time.time()
+    for output in paths:
+        before = history.stats()["observations"]
+        count = record_file(history, output, normalize=normalize)
+        stored = history.stats()["observations"] - before
+        print(f"📦 {output}: {count} products, {stored} changes stored")
+    history.close()
+    print(f"📈 {path} tracks {len(history)} products ({time.time() - started:.1f}s)")
+    return 0
+
+
+def show_product(path, product_id):
+    history = open_store(path)
+    if history is None:
+        return 1
+    rows = history.history(product_id)
+    if not len(rows):
+        print(f"❌ No history for product {product_id}")
+        return 1
+
+    print(f"\n📈 Product {product_id}: {len(rows)} observations")
+    print("=" * 64)
+    print(f"{'time':<17} {'price':>10} {'discount':>10} {'rating':>7} {'ratings':>9}")
+    for row in rows:
+        rating = f"{row['rating'] / 100:.1f}" if row["rating"] != MISSING else "-"
+        count = row["rating_count"] if row["rating_count"] != MISSING else "-"
+        print(
+            f"{datetime.fromtimestamp(row['time']).strftime('%Y-%m-%d %H:%M'):<17} "
+            f"{format_price(row['price']):>10} {format_price(row['discount_price']):>10} "
+            f"{rating:>7} {count:>9}"
+        )
+    return 0
+
+
+def show_drops(path, days, min_drop, limit):
+    history = open_store(path)
+    if history is None:
+        return 1
+    started = time.time()
+    product_ids, old, new = history.price_drops(time.time() - days * 86400, min_drop / 100)
+    elapsed = (time.time() - started) * 1000
+
+    print(
+        f"\n💸 {len(product_ids)} of {len(history)} products dropped {min_drop:g}%+ "
+        f"in {days:g} days ({elapsed:.0f} ms)"
+    )
+    print("=" * 52)
+    drops = sorted(zip(product_ids, old, new), key=lambda d: d[2] / d[1])
+    for product_id, before, after in drops[:limit]:
+        print(
+            f"{product_id:<16} {format_price(before):>10} -> {format_price(after):>10} "
+            f"({(after - before) / before:+.0%})"
+        )
+    return 0
+
+
+def show_stats(path):
+    history = open_store(path)
+    if history is None:
+        return 1
+    for name, value in history.stats().items():
+        print(f"{name:<18} {value:>12}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the Myntra price history")
+    parser.add_argument(
+        "--store", default=DEFAULT_STORE, help=f"Store directory (default: {DEFAULT_STORE})"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_cmd = commands.add_parser("record", help="Record crawl output JSON files")
+    record_cmd.add_argument("files", nargs="*", help="Output files, oldest first (default: data/*products*.json)")
+    record_cmd.add_argument(
+        "--normalize",
+        action="store_true",
+        help="Normalize raw items from dumps written before typed records",
+    )
+
+    product_cmd = commands.add_parser("product", help="Price history of one product")
+    product_cmd.add_argument("product_id")
+
+    drops_cmd = commands.add_parser("drops", help="Products whose price dropped recently")
+    drops_cmd.add_argument("--days", type=float, default=7, help="Window in days (default: 7)")
+    drops_cmd.add_argument("--min-drop", type=float, default=20, help="Minimum drop in percent")
+    drops_cmd.add_argument("--limit", type=int, default=20, help="Biggest drops to list")
+
+    commands.add_parser("compact", help="Merge all segments into one")
+    commands.add_parser("stats", help="Show store size")
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        return record(args.store, args.files, args.normalize)
+    if args.command == "product":
+        return show_product(args.store, args.product_id)
+    if args.command == "drops":
+        return show_drops(args.store, args.days, args.min_drop, args.limit)
+    if args.command == "compact":
+        history = open_store(args.store)
+        if history is None:
+            return 1
+        history.compact()
+        print(f"🗜️  Compacted into {history.stats()['segment_bytes']} bytes")
+        return 0
+    return show_stats(args.store)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,40 +10,232 @@ from scrapy.crawler import CrawlerProcess
 from scrapy.utils.project import get_project_settings
 
 
-def run_products_crawler(category=None, max_pages=5, use_api=False):
-    """Run the 3P products crawler"""
+def get_crawler_settings(profile=False, overrides=None):
+    """Load project settings and apply per-run overrides"""
 
     settings = get_project_settings()
-    process = CrawlerProcess(settings)
+    if profile:
+        settings.set("PROFILE_ENABLED", True, priority="cmdline")
+    for override in overrides or []:
+        name, _, value = override.partition("=")
+        settings.set(name.strip(), value, priority="cmdline")
+    return settings
+
+
+def run_products_crawler(
+    category=None,
+    max_pages=5,
+    use_api=False,
+    profile=False,
+    base_url=None,
+    overrides=None,
+    workers=1,
+    unit_pages=5,
+    urls_file=None,
+    rate=None,
+    listing_only=False,
+    partition=False,
+    shard_max=None,
+    poll=None,
+    poll_for=0,
+):
+    """Run the 3P products crawler"""
+
+    if poll:
+        run_poll_crawler(poll, poll_for, category, base_url, profile, overrides)
+        return
 
     spider_kwargs = {"max_pages": max_pages}
     if category:
         spider_kwargs["category"] = category
+    if base_url:
+        spider_kwargs["base_url"] = base_url
+    if listing_only:
+        spider_kwargs["listing_only"] = True
 
     # Choose between API spider and HTML spider
     spider_name = "myntra_api_products" if use_api else "myntra_products"
+
+    if workers > 1 or partition:
+        run_parallel_products_crawler(
+            spider_name,
+            spider_kwargs,
+            workers,
+            unit_pages,
+            urls_file,
+            rate,
+            profile,
+            overrides,
+            partition,
+            shard_max,
+        )
+        return
+
+    settings = get_crawler_settings(profile=profile, overrides=overrides)
+    process = CrawlerProcess(settings)
     process.crawl(spider_name, **spider_kwargs)
     process.start()
 
 
-def run_user_data_crawler(email, password, headless=True):
+def run_parallel_products_crawler(
+    spider_name,
+    spider_kwargs,
+    workers,
+    unit_pages,
+    urls_file,
+    rate,
+    profile,
+    overrides,
+    partition=False,
+    shard_max=None,
+):
+    """Split the crawl into work units and run them across worker processes"""
+    from myntra_crawler.workers import (
+        DEFAULT_CATEGORIES,
+        plan_shard_units,
+        plan_units,
+        run_workers,
+    )
+
+    category = spider_kwargs.get("category")
+    if category:
+        categories = [category]
+    elif spider_name == "myntra_api_products":
+        categories = ["men-clothing"]  # Same default as the API spider
+    else:
+        categories = DEFAULT_CATEGORIES
+
+    urls = None
+    if urls_file:
+        with open(urls_file, encoding="utf-8") as f:
+            urls = [line.strip() for line in f if line.strip()]
+
+    if partition:
+        units = plan_shard_units(
+            plan_partitions(categories, spider_kwargs.get("base_url"), shard_max, overrides),
+            unit_pages,
+        )
+    else:
+        units = plan_units(
+            spider_name, categories, spider_kwargs["max_pages"], unit_pages, urls
+        )
+
+    worker_overrides = {}
+    if profile:
+        worker_overrides["PROFILE_ENABLED"] = True
+    if rate is not None:
+        worker_overrides["SHARED_REQUESTS_PER_SECOND"] = rate
+    for override in overrides or []:
+        name, _, value = override.partition("=")
+        worker_overrides[name.strip()] = value
+
+    run_workers(spider_name, spider_kwargs, units, workers, worker_overrides)
+
+
+def run_poll_crawler(track, poll_for=0, category=None, base_url=None, profile=False, overrides=None):
+    """Poll the tracked products' listing pages, emitting only changed fields"""
+
+    spider_kwargs = {"track": track, "poll_for": poll_for}
+    if category:
+        spider_kwargs["category"] = category
+    if base_url:
+        spider_kwargs["base_url"] = base_url
+
+    settings = get_crawler_settings(profile=profile, overrides=overrides)
+    process = CrawlerProcess(settings)
+    process.crawl("myntra_api_poll", **spider_kwargs)
+    process.start()
+
+
+def plan_partitions(categories, base_url=None, shard_max=None, overrides=None):
+    """Probe the search API and split each category into disjoint shards"""
+    from myntra_crawler.partitions import MAX_SHARD_RESULTS, PartitionPlanner, describe
+
+    settings = get_crawler_settings(overrides=overrides)
+    planner = PartitionPlanner(
+        base_url or "https://www.myntra.com",
+        max_results=shard_max or MAX_SHARD_RESULTS,
+        delay=settings.getfloat("DOWNLOAD_DELAY"),
+    )
+    shards = {}
+    for category in categories:
+        shards[category] = planner.plan(category)
+        covered = sum(count for _, count in shards[category])
+        total = planner.totals[category]
+        print(
+            f"🧩 {category}: {len(shards[category])} shards covering {covered:,} of "
+            f"{total:,} products ({covered / total if total else 1:.1%})"
+        )
+        oversized = [f for f, count in shards[category] if count > planner.max_results]
+        for filters in oversized:
+            print(f"⚠️  Shard {describe(filters)} cannot be split below {planner.max_results}")
+    print(f"🔍 Planned with {planner.probes} probe requests")
+    return shards
+
+
+def run_user_data_crawler(
+    email, password, headless=True, profile=False, base_url=None, overrides=None
+):
     """Run the 2P user data crawler"""
 
     if not email or not password:
         print("Error: Email and password are required for user data crawler")
         return
 
-    settings = get_project_settings()
+    settings = get_crawler_settings(profile=profile, overrides=overrides)
     process = CrawlerProcess(settings)
 
-    process.crawl("myntra_user_data", email=email, password=password, headless=headless)
+    spider_kwargs = {"email": email, "password": password, "headless": headless}
+    if base_url:
+        spider_kwargs["base_url"] = base_url
+
+    process.crawl("myntra_user_data", **spider_kwargs)
     process.start()
 
 
+def run_catalog_api(host=None, port=None, overrides=None):
+    """Serve the local catalog over HTTP until interrupted"""
+    import logging
+    from myntra_crawler.catalog_api import CatalogStore, make_server
+
+    settings = get_crawler_settings(overrides=overrides)
+    index_path = settings.get("CATALOG_INDEX_PATH")
+    if not index_path or not os.path.exists(index_path):
+        print(f"Error: No catalog index at {index_path}, run a crawl or `catalog_search.py build` first")
+        sys.exit(1)
+    logging.basicConfig(
+        level=settings.get("LOG_LEVEL"),
+        format="%(asctime)s [%(name)s] %(levelname)s: %(message)s",
+    )
+
+    store = CatalogStore(
+        index_path,
+        settings.get("PRICE_HISTORY_PATH"),
+        product_cache=settings.getint("SERVE_PRODUCT_CACHE"),
+        query_cache=settings.getint("SERVE_QUERY_CACHE"),
+        reload_seconds=settings.getfloat("SERVE_RELOAD_SECONDS"),
+    )
+    store.watch()
+    host = host or settings.get("SERVE_HOST")
+    port = port or settings.getint("SERVE_PORT")
+    server = make_server(store, host, port)
+    print(f"🚀 Serving {len(store.snapshot):,} products on http://{host}:{port}")
+    print("📖 GET /products/<id>, /products?brand=&category=&size=&q=, /changes?minutes=, /stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+    finally:
+        store.stop()
+        server.server_close()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Run Myntra Crawlers")
     parser.add_argument(
-        "crawler_type", choices=["products", "user_data"], help="Type of crawler to run"
+        "crawler_type",
+        choices=["products", "user_data", "serve"],
+        help="Type of crawler to run, or serve to start the local catalog read API",
     )
 
     # Products crawler arguments
@@ -58,6 +250,53 @@ def main():
         action="store_true",
         help="Use API-based crawler instead of HTML parsing",
     )
+    parser.add_argument(
+        "--listing-only",
+        action="store_true",
+        help="Build items from category pages, fetching PDPs only for incomplete products",
+    )
+    parser.add_argument(
+        "--partition",
+        action="store_true",
+        help="Split categories into brand/price shards crawled in parallel (API crawler)",
+    )
+    parser.add_argument(
+        "--shard-max",
+        type=int,
+        help="Largest shard result count before it is subdivided (default 5000)",
+    )
+    parser.add_argument(
+        "--poll",
+        metavar="IDS_FILE",
+        help="Poll the products listed in this file for changes instead of crawling (API crawler)",
+    )
+    parser.add_argument(
+        "--poll-for",
+        type=float,
+        default=0,
+        help="Stop polling after this many seconds (default: until interrupted)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Crawl with N processes sharing a work queue and request budget",
+    )
+    parser.add_argument(
+        "--unit-pages",
+        type=int,
+        default=5,
+        help="Pages per work unit when running with --workers",
+    )
+    parser.add_argument(
+        "--urls-file",
+        help="Crawl product pages listed in this file (one URL per line) with --workers",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="Total requests/second shared by all workers (default SHARED_REQUESTS_PER_SECOND)",
+    )
 
     # User data crawler arguments
     parser.add_argument(
@@ -73,6 +312,29 @@ def main():
         help="Run browser in headless mode",
     )
 
+    # Catalog read API arguments
+    parser.add_argument("--host", help="Address the read API listens on (default SERVE_HOST)")
+    parser.add_argument("--port", type=int, help="Port of the read API (default SERVE_PORT)")
+
+    # Diagnostics
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Capture sampled profiles of callbacks and pipelines into data/profiles/",
+    )
+    parser.add_argument(
+        "--base-url",
+        help="Crawl another host instead of www.myntra.com (e.g. http://127.0.0.1:8800)",
+    )
+    parser.add_argument(
+        "-s",
+        "--set",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="Override a Scrapy setting for this run (may be repeated)",
+    )
+
     args = parser.parse_args()
 
     # Ensure we're in the right directory
@@ -86,22 +348,63 @@ def main():
         if args.category:
             print(f"Category: {args.category}")
         print(f"Max pages: {args.max_pages}")
+        if args.base_url:
+            print(f"Base URL: {args.base_url}")
+        if args.workers > 1:
+            print(f"Workers: {args.workers}")
+        if args.urls_file and (args.api or args.workers < 2):
+            print("Error: --urls-file needs the HTML crawler with --workers")
+            sys.exit(1)
+        if args.listing_only and args.api:
+            print("Error: --listing-only applies to the HTML crawler only")
+            sys.exit(1)
+        if args.partition and not args.api:
+            print("Error: --partition needs the API crawler (--api)")
+            sys.exit(1)
+        if args.poll and (not args.api or args.workers > 1 or args.partition):
+            print("Error: --poll needs the API crawler (--api) in a single process")
+            sys.exit(1)
 
         run_products_crawler(
-            category=args.category, max_pages=args.max_pages, use_api=args.api
+            category=args.category,
+            max_pages=args.max_pages,
+            use_api=args.api,
+            profile=args.profile,
+            base_url=args.base_url,
+            overrides=args.set,
+            workers=args.workers,
+            unit_pages=args.unit_pages,
+            urls_file=args.urls_file,
+            rate=args.rate,
+            listing_only=args.listing_only,
+            partition=args.partition,
+            shard_max=args.shard_max,
+            poll=args.poll,
+            poll_for=args.poll_for,
         )
 
+    elif args.crawler_type == "serve":
+        run_catalog_api(host=args.host, port=args.port, overrides=args.set)
+
     elif args.crawler_type == "user_data":
         if not args.email or not args.password:
             print("Error: --email and --password are required for user_data crawler")
             sys.exit(1)
+        if args.workers > 1:
+            print("Error: --workers is not supported for the user_data crawler")
+            sys.exit(1)
 
         print(f"Starting user data crawler...")
         print(f"Email: {args.email}")
         print(f"Headless: {args.headless}")
 
         run_user_data_crawler(
-            email=args.email, password=args.password, headless=args.headless
+            email=args.email,
+            password=args.password,
+            headless=args.headless,
+            profile=args.profile,
+            base_url=args.base_url,
+            overrides=args.set,
         )
 
 
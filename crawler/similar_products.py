@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Similar Products for Myntra crawls
+Builds the product similarity index from the catalog index and recommends
+products similar to a user's order history
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from myntra_crawler.catalog_index import CatalogIndex
+from myntra_crawler.profiles import load_orders
+from myntra_crawler.similar import SimilarProducts
+
+DEFAULT_INDEX = "data/catalog_index.sqlite"
+DEFAULT_MODEL = "data/similar_products.npz"
+BATCH_SIZE = 10000
+
+
+def build(index_path, model_path, rebuild=False):
+    """Add new catalog products and re-add changed ones (all of them with --rebuild)"""
+    if not os.path.exists(index_path):
+        print(f"❌ No catalog index at {index_path}, run `catalog_search.py build` first")
+        return 1
+
+    if os.path.exists(model_path) and not rebuild:
+        engine = SimilarProducts.load(model_path)
+    else:
+        engine = SimilarProducts()
+
+    started = time.time()
+    index = CatalogIndex(index_path)
+    batch = []
+    added = replaced = 0
+    for record in index.iter_records():
+        batch.append(record)
+        if len(batch) == BATCH_SIZE:
+            new, changed = engine.update(batch)
+            added, replaced = added + new, replaced + changed
+            batch = []
+    if batch:
+        new, changed = engine.update(batch)
+        added, replaced = added + new, replaced + changed
+    index.close()
+
+    engine.save(model_path)
+    print(
+        f"🧭 Added {added} products and updated {replaced} changed ones, {model_path} holds "
+        f"{len(engine)} ({time.time() - started:.1f}s)"
+    )
+    return 0
+
+
+def load_model(model_path):
+    if not os.path.exists(model_path):
+        print(f"❌ No model at {model_path}, run `similar_products.py build` first")
+        return None
+    return SimilarProducts.load(model_path)
+
+
+def recommend(model_path, orders_path, k):
+    engine = load_model(model_path)
+    if engine is None:
+        return 1
+
+    orders = load_orders(orders_path)
+    by_order = {order.order_id: order for order in orders}
+    started = time.perf_counter()
+    results = engine.recommend(orders, k)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    print(f"\n🛍️  {len(results)} recommendations from {len(orders)} orders ({elapsed_ms:.1f} ms)")
+    print("=" * 86)
+    for product_id, score, order_id in results:
+        order = by_order[order_id]
+        print(f"{product_id:<12} {score:>6.3f}  like {order.brand} {order.product_name[:48]}")
+    return 0
+
+
+def similar(index_path, model_path, product_ids, k):
+    engine = load_model(model_path)
+    if engine is None or not os.path.exists(index_path):
+        return 1
+
+    index = CatalogIndex(index_path)
+    records = [index.get(product_id) for product_id in product_ids]
+    index.close()
+    missing = [pid for pid, record in zip(product_ids, records) if record is None]
+    if missing:
+        print(f"❌ Not in the catalog index: {', '.join(missing)}")
+        return 1
+
+    started = time.perf_counter()
+    results = engine.query(records, k)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    for record, hits in zip(records, results):
+        print(f"\n🔗 {record.product_id} {record.brand} {record.name[:48]}")
+        for product_id, score in hits:
+            print(f"   {product_id:<12} {score:>6.3f}")
+    print(f"\n({elapsed_ms:.1f} ms)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recommend similar Myntra products")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Similarity model file")
+    parser.add_argument("--index", default=DEFAULT_INDEX, help="Catalog index file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_cmd = commands.add_parser("build", help="Vectorize products from the catalog index")
+    build_cmd.add_argument("--rebuild", action="store_true", help="Start from scratch")
+
+    recommend_cmd = commands.add_parser("recommend", help="Recommend from an order history")
+    recommend_cmd.add_argument("orders", help="myntra_user_data output file")
+    recommend_cmd.add_argument("-k", type=int, default=10, help="Recommendations")
+
+    similar_cmd = commands.add_parser("similar", help="Products similar to given ids")
+    similar_cmd.add_argument("product_ids", nargs="+")
+    similar_cmd.add_argument("-k", type=int, default=10, help="Results per product")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        return build(args.index, args.model, args.rebuild)
+    if args.command == "recommend":
+        return recommend(args.model, args.orders, args.k)
+    return similar(args.index, args.model, args.product_ids, args.k)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Snapshot diff for Myntra crawl outputs
+Compares two product crawl outputs of any size: both are streamed, sorted by
+product_id on disk and merge-joined into added, removed and changed products
+with per-field deltas, written as JSONL
+"""
+
+import os
+import sys
+import glob
+import json
+import heapq
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from myntra_crawler.snapshots import DIFF_FIELDS, RUN_ITEMS, SortedSnapshot, diff_sorted
+
+
+def latest_outputs(data_dir="data", count=2):
+    """The newest merged products outputs (worker part files excluded), oldest first"""
+    paths = [
+        path
+        for path in glob.glob(os.path.join(data_dir, "myntra_*products_*.json"))
+        if "_w" not in os.path.basename(path)
+    ]
+    return sorted(paths, key=os.path.getmtime)[-count:]
+
+
+def sort_snapshot(path, fields, run_items, tmp_dir, normalize):
+    return SortedSnapshot(path, fields, run_items, tmp_dir, normalize).sort()
+
+
+def price_change(changes):
+    """Relative change of the price a shopper pays, if it changed"""
+    for name in ("price", "discount_price"):
+        if name in changes and "pct" in changes[name]:
+            return changes[name]["pct"]
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two product crawl outputs")
+    parser.add_argument("old", nargs="?", help="Older output (default: second newest in data/)")
+    parser.add_argument("new", nargs="?", help="Newer output (default: newest in data/)")
+    parser.add_argument("-o", "--output", help="JSONL diff file (default: data/snapshot_diff_<ts>.jsonl)")
+    parser.add_argument(
+        "--fields", default=",".join(DIFF_FIELDS), help="Comma-separated fields to compare"
+    )
+    parser.add_argument(
+        "--run-items", type=int, default=RUN_ITEMS, help="Products sorted in memory per run file"
+    )
+    parser.add_argument("--tmp-dir", help="Directory for sorted run files (default: system temp)")
+    parser.add_argument(
+        "--normalize", action="store_true", help="Normalize raw (pre-records) outputs first"
+    )
+    parser.add_argument("--show", type=int, default=10, help="Number of biggest price drops to print")
+    args = parser.parse_args()
+
+    if args.old and args.new:
+        old_path, new_path = args.old, args.new
+    else:
+        outputs = latest_outputs()
+        if len(outputs) < 2:
+            print("❌ Need two crawl outputs: pass them explicitly or crawl twice first")
+            return 1
+        old_path, new_path = outputs
+    fields = [name.strip() for name in args.fields.split(",") if name.strip()]
+    output = args.output or os.path.join(
+        "data", f"snapshot_diff_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    )
+
+    print(f"📂 Old: {old_path}")
+    print(f"📂 New: {new_path}")
+    start = time.time()
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        jobs = [
+            pool.submit(sort_snapshot, path, fields, args.run_items, args.tmp_dir, args.normalize)
+            for path in (old_path, new_path)
+        ]
+        old, new = [job.result() for job in jobs]
+    print(f"🗂️  Sorted {old.seen} + {new.seen} products into {len(old.runs)} + {len(new.runs)} runs in {time.time() - start:.1f}s")
+
+    counts = {"added": 0, "removed": 0, "changed": 0}
+    drops = rises = 0
+    biggest = []
+    try:
+        directory = os.path.dirname(output)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(output, "w", encoding="utf-8") as out:
+            for change, product_id, values in diff_sorted(old, new):
+                counts[change] += 1
+                key = "fields" if change == "changed" else "record"
+                out.write(
+                    json.dumps({"change": change, "product_id": product_id, key: values}, ensure_ascii=False)
+                    + "\n"
+                )
+                if change != "changed":
+                    continue
+                pct = price_change(values)
+                if pct is None:
+                    continue
+                if pct < 0:
+                    drops += 1
+                    heapq.heappush(biggest, (-pct, product_id))
+                    if len(biggest) > args.show:
+                        heapq.heappop(biggest)
+                elif pct > 0:
+                    rises += 1
+    finally:
+        old.cleanup()
+        new.cleanup()
+
+    print(f"\n📊 {old.products} -> {new.products} products ({old.duplicates + new.duplicates} duplicates, {old.skipped + new.skipped} without product_id skipped)")
+    print(f"   ➕ added:   {counts['added']:>10}")
+    print(f"   ➖ removed: {counts['removed']:>10}")
+    print(f"   ✏️  changed: {counts['changed']:>10} ({drops} price drops, {rises} price rises)")
+    if biggest and args.show:
+        print("\n💸 Biggest price drops:")
+        for pct, product_id in sorted(biggest, reverse=True):
+            print(f"   {product_id:<16} -{pct:.1f}%")
+    print(f"\n💾 Diff written to {output} in {time.time() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
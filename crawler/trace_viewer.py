@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Trace Viewer for Myntra crawls
+Turns the JSONL span files written by the tracing middlewares into per-hop
+latency breakdowns, a list of the slowest request chains and per-trace waterfalls
+"""
+
+import os
+import sys
+import glob
+import json
+import argparse
+from collections import defaultdict
+
+SPAN_ORDER = ["schedule", "retry", "download", "parse"]
+
+
+def load_spans(path):
+    """Load spans from a JSONL trace file"""
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                spans.append(json.loads(line))
+    return spans
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, int(round(q * len(values))) - 1))
+    return values[index]
+
+
+def print_hop_breakdown(spans):
+    """Print latency statistics per hop and span type"""
+    durations = defaultdict(list)
+    hop_order = []
+    for span in sorted(spans, key=lambda s: s["start"]):
+        if span["hop"] not in hop_order:
+            hop_order.append(span["hop"])
+        durations[(span["hop"], span["name"])].append(span["duration_ms"])
+
+    print("\n📊 PER-HOP LATENCY (ms)")
+    print("=" * 86)
+    print(
+        f"{'hop':<22} {'span':<10} {'count':>7} {'mean':>10} {'p50':>10} {'p95':>10} {'max':>10}"
+    )
+    print("-" * 86)
+    for hop in hop_order:
+        for name in SPAN_ORDER:
+            values = sorted(durations.get((hop, name), []))
+            if not values:
+                continue
+            print(
+                f"{hop[:22]:<22} {name:<10} {len(values):>7} "
+                f"{sum(values) / len(values):>10.1f} {percentile(values, 0.5):>10.1f} "
+                f"{percentile(values, 0.95):>10.1f} {values[-1]:>10.1f}"
+            )
+
+
+def summarize_traces(spans):
+    """Group spans into chains and compute total time and retries per trace"""
+    traces = defaultdict(list)
+    for span in spans:
+        traces[span["trace_id"]].append(span)
+
+    summaries = []
+    for trace_id, trace_spans in traces.items():
+        start = min(s["start"] for s in trace_spans)
+        end = max(s["end"] for s in trace_spans)
+        summaries.append(
+            {
+                "trace_id": trace_id,
+                "total_ms": (end - start) * 1000,
+                "spans": len(trace_spans),
+                "retries": sum(1 for s in trace_spans if s["name"] == "retry"),
+                "items": sum(s.get("attrs", {}).get("items", 0) for s in trace_spans),
+            }
+        )
+    return sorted(summaries, key=lambda t: t["total_ms"], reverse=True)
+
+
+def print_slowest_traces(spans, limit):
+    summaries = summarize_traces(spans)
+    print(f"\n🐢 SLOWEST {min(limit, len(summaries))} OF {len(summaries)} TRACES")
+    print("=" * 86)
+    for trace in summaries[:limit]:
+        print(
+            f"{trace['trace_id']}  total: {trace['total_ms']:>10.1f} ms  "
+            f"spans: {trace['spans']:>4}  retries: {trace['retries']:>3}  items: {trace['items']:>5}"
+        )
+
+
+def print_waterfall(spans, trace_id):
+    """Print every span of one trace on a shared timeline"""
+    trace_spans = sorted(
+        (s for s in spans if s["trace_id"] == trace_id), key=lambda s: s["start"]
+    )
+    if not trace_spans:
+        print(f"❌ Trace {trace_id} not found")
+        return
+
+    origin = trace_spans[0]["start"]
+    print(f"\n🧵 TRACE {trace_id}")
+    print("=" * 86)
+    for span in trace_spans:
+        offset = (span["start"] - origin) * 1000
+        attrs = span.get("attrs", {})
+        detail = ", ".join(
+            f"{k}={v}" for k, v in attrs.items() if k not in ("url",)
+        )
+        print(
+            f"+{offset:>10.1f} ms  {span['hop'][:20]:<20} {span['name']:<9} "
+            f"{span['duration_ms']:>9.1f} ms  {detail}"
+        )
+
+
+def latest_trace_file(directory):
+    files = glob.glob(os.path.join(directory, "*.jsonl"))
+    return max(files, key=os.path.getmtime) if files else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze crawl trace spans")
+    parser.add_argument(
+        "trace_file",
+        nargs="?",
+        help="JSONL span file (defaults to the newest file in data/traces/)",
+    )
+    parser.add_argument("--trace", help="Print the waterfall of a single trace id")
+    parser.add_argument(
+        "--slowest", type=int, default=10, help="Number of slowest traces to list"
+    )
+    args = parser.parse_args()
+
+    path = args.trace_file or latest_trace_file("data/traces")
+    if not path or not os.path.exists(path):
+        print("❌ No trace file found. Run a crawl with TRACING_ENABLED = True first")
+        sys.exit(1)
+
+    spans = load_spans(path)
+    print(f"📂 Loaded {len(spans)} spans from {path}")
+
+    if args.trace:
+        print_waterfall(spans, args.trace)
+        return
+
+    print_hop_breakdown(spans)
+    print_slowest_traces(spans, args.slowest)
+
+
+if __name__ == "__main__":
+    main()
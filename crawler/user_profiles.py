@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+User Profiles for Myntra crawls
+Folds order history output into persistent per-user profiles and shows brand and
+category affinities, sizes, price bands and rating sentiment
+"""
+
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+
+from myntra_crawler.profiles import HALF_LIFE_DAYS, ProfileStore, load_orders
+
+DEFAULT_STORE = "data/user_profiles.sqlite"
+
+
+def format_date(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d") if timestamp else "-"
+
+
+def ingest(store, paths, user_id=None):
+    for path in paths:
+        orders = load_orders(path)
+        added = sum(store.add_order(order, user_id) for order in orders)
+        print(f"📦 {path}: {added} new of {len(orders)} orders")
+    store.flush()
+    return 0
+
+
+def show(store, user_id, as_json=False):
+    profile = store.get(user_id)
+    if not profile.orders:
+        print(f"❌ No orders for user {user_id}")
+        return 1
+
+    summary = store.summary(user_id)
+    if as_json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+        return 0
+
+    print(f"\n👤 {user_id}: {summary['orders']} orders, ₹{summary['spend'] / 100:,.0f} spent")
+    print(f"   {format_date(summary['first_order'])} → {format_date(summary['last_order'])}")
+    for title, key in (("Brands", "brands"), ("Categories", "categories")):
+        print(f"\n{title} (decayed share):")
+        for name, share in summary[key]:
+            print(f"   {name:<30} {share:>6.1%}")
+
+    print("\nSizes:")
+    for category, sizes in summary["size_distribution"].items():
+        counts = ", ".join(f"{size} ×{count}" for size, count in sorted(sizes.items()))
+        print(f"   {category or '-':<30} {counts}")
+
+    print("\nPrice bands:")
+    for band, count in sorted(
+        summary["price_bands"].items(), key=lambda pair: int(pair[0].split("-")[0].rstrip("+"))
+    ):
+        print(f"   ₹{band:<29} {count:>6}")
+
+    if summary["rating_mean"] is not None:
+        print(
+            f"\nRatings: mean {summary['rating_mean']:.2f}, "
+            f"sentiment {summary['sentiment']:+.2f}, {summary['reviews']} reviews"
+        )
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-user profiles from Myntra orders")
+    parser.add_argument("--store", default=DEFAULT_STORE, help="Profile store file")
+    parser.add_argument(
+        "--half-life",
+        type=float,
+        default=HALF_LIFE_DAYS,
+        help=f"Days for an order's affinity weight to halve (default: {HALF_LIFE_DAYS})",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_cmd = commands.add_parser("ingest", help="Add orders from output files")
+    ingest_cmd.add_argument("files", nargs="+", help="myntra_user_data output files")
+    ingest_cmd.add_argument("--user", help="User id for orders that carry none")
+
+    show_cmd = commands.add_parser("show", help="Show one profile")
+    show_cmd.add_argument("user_id")
+    show_cmd.add_argument("--json", action="store_true", help="Print the summary as JSON")
+
+    commands.add_parser("list", help="List profiled users")
+
+    args = parser.parse_args()
+
+    if args.command != "ingest" and not os.path.exists(args.store):
+        print(f"❌ No profile store at {args.store}")
+        return 1
+
+    store = ProfileStore(args.store, args.half_life)
+    try:
+        if args.command == "ingest":
+            return ingest(store, args.files, args.user)
+        if args.command == "show":
+            return show(store, args.user_id, args.json)
+        for user_id in store.user_ids():
+            print(f"{user_id:<20} {store.get(user_id).orders:>6} orders")
+        return 0
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())